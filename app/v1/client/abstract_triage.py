@@ -0,0 +1,305 @@
+import asyncio
+import json
+import logging
+import re
+from app.v1.client.openai_chat import (
+    CHARS_PER_TOKEN,
+    TOKENS_PER_MESSAGE,
+    get_openai_chat_client,
+)
+from app.v1.schemas.openai_chat import ChatRequest
+from app.v1.utils.config import load_config
+from app.v1.utils.metrics import track_stage
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TRIAGE_SETTINGS = {
+    "enabled": False,
+    "min_score": 0.5,
+    "prompt_token_budget": 6000,
+    "max_articles_per_prompt": 40,
+    "max_abstract_characters": 2000,
+    "linger_seconds": 0.5,
+}
+
+TRIAGE_SYSTEM_MESSAGE = (
+    "You triage research papers for a literature search. For each numbered "
+    "paper, rate how relevant its title and abstract are to the search query, "
+    "from 0 (unrelated) to 10 (directly on topic). Reply with only a JSON "
+    'object mapping each paper number to its score, for example {"1": 8, "2": 0}.'
+)
+# Completion tokens for one '"12": 7, ' entry of the reply, with headroom
+TOKENS_PER_SCORE = 8
+
+MARKUP_PATTERN = re.compile(r"<[^>]+>")
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+class AbstractTriage:
+    """
+    Scores abstracts against a query with the chat model, packing many
+    abstracts into each prompt, so only relevant papers are downloaded
+    """
+
+    def __init__(self, chat_client=None, triage_config=None):
+        if triage_config is None:
+            triage_config = load_config().get("triage", {})
+        settings = {**DEFAULT_TRIAGE_SETTINGS, **triage_config}
+
+        self.enabled = settings["enabled"]
+        self.min_score = settings["min_score"]
+        self.prompt_token_budget = settings["prompt_token_budget"]
+        self.max_articles_per_prompt = settings["max_articles_per_prompt"]
+        self.max_abstract_characters = settings["max_abstract_characters"]
+        self.linger_seconds = settings["linger_seconds"]
+        self.chat_client = chat_client
+
+    def _get_chat_client(self):
+        # Created on first use, since it needs the Azure OpenAI settings
+        if self.chat_client is None:
+            self.chat_client = get_openai_chat_client()
+        return self.chat_client
+
+    def format_article(self, number, article):
+        title = article.get("title") or []
+        if isinstance(title, str):
+            title = [title]
+        abstract = MARKUP_PATTERN.sub(" ", article.get("abstract") or "")
+        abstract = WHITESPACE_PATTERN.sub(" ", abstract).strip()
+
+        return (
+            f"[{number}] {' '.join(title)}\n"
+            f"{abstract[: self.max_abstract_characters] or '(no abstract)'}"
+        )
+
+    def estimate_article_tokens(self, article):
+        return len(self.format_article(0, article)) // CHARS_PER_TOKEN + 2
+
+    def estimate_base_tokens(self, query):
+        """Estimated tokens of a prompt before any article is added"""
+        return (
+            len(TRIAGE_SYSTEM_MESSAGE) + len(query)
+        ) // CHARS_PER_TOKEN + 2 * TOKENS_PER_MESSAGE
+
+    def pack(self, query, articles):
+        """
+        Split articles into prompts of at most prompt_token_budget estimated
+        tokens and max_articles_per_prompt articles, keeping their order
+
+        Returns:
+            list: Lists of articles, one per prompt
+        """
+        base_tokens = self.estimate_base_tokens(query)
+
+        packs = []
+        pack = []
+        pack_tokens = base_tokens
+        for article in articles:
+            tokens = self.estimate_article_tokens(article)
+            if pack and (
+                pack_tokens + tokens > self.prompt_token_budget
+                or len(pack) >= self.max_articles_per_prompt
+            ):
+                packs.append(pack)
+                pack = []
+                pack_tokens = base_tokens
+            pack.append(article)
+            pack_tokens += tokens
+
+        if pack:
+            packs.append(pack)
+        return packs
+
+    def build_prompt(self, query, articles):
+        papers = "\n\n".join(
+            self.format_article(number, article)
+            for number, article in enumerate(articles, 1)
+        )
+        return f"Query: {query}\n\n{papers}"
+
+    @staticmethod
+    def parse_scores(response, count):
+        """
+        Read the model's {"number": score} reply
+
+        Returns:
+            list: Score from 0 to 1 for each of count papers, or None where
+            the reply left one out
+
+        Raises:
+            ValueError: If the reply has no JSON object
+        """
+        start, end = response.find("{"), response.rfind("}")
+        if start == -1 or end < start:
+            raise ValueError(f"Triage reply is not a JSON object: {response[:100]}")
+        data = json.loads(response[start : end + 1])
+
+        scores = [None] * count
+        for key, value in data.items():
+            try:
+                index = int(key) - 1
+                score = float(value)
+            except (TypeError, ValueError):
+                continue
+            if 0 <= index < count:
+                scores[index] = min(max(score / 10, 0.0), 1.0)
+        return scores
+
+    async def score(self, query, articles):
+        """
+        Score articles against query, sending every prompt at once and
+        leaving the chat client's limits to pace them. Each article gets a
+        relevance_score, or a triage_error when its prompt failed.
+        """
+        packs = self.pack(query, articles)
+        if not packs:
+            return articles
+
+        try:
+            results = await self._get_chat_client().achat_batch(
+                [
+                    ChatRequest(
+                        system_message=TRIAGE_SYSTEM_MESSAGE,
+                        user_message=self.build_prompt(query, pack),
+                    )
+                    for pack in packs
+                ],
+                max_tokens=max(len(pack) for pack in packs) * TOKENS_PER_SCORE + 16,
+            )
+        except Exception as e:
+            results = [{"response": None, "error": str(e)} for _ in packs]
+
+        for pack, result in zip(packs, results):
+            try:
+                if result["error"]:
+                    raise Exception(result["error"])
+                scores = self.parse_scores(result["response"] or "", len(pack))
+            except Exception as e:
+                logger.warning(f"Error triaging {len(pack)} abstracts: {e}")
+                for article in pack:
+                    article["triage_error"] = str(e)
+                continue
+
+            for article, score in zip(pack, scores):
+                article["relevance_score"] = score
+
+        return articles
+
+    def is_relevant(self, article):
+        """
+        Whether an article should be downloaded. Articles that were not
+        scored are, so a triage failure never loses papers.
+        """
+        score = article.get("relevance_score")
+        return score is None or score >= self.min_score
+
+    async def triage(self, query, articles):
+        """
+        Returns:
+            list: The articles relevant to query, in input order
+        """
+        if not articles:
+            return []
+
+        with track_stage("triage"):
+            await self.score(query, articles)
+        return [article for article in articles if self.is_relevant(article)]
+
+    def batcher(self, query):
+        return TriageBatcher(self, query)
+
+
+class TriageBatcher:
+    """
+    Collects articles that arrive one at a time, e.g. from a pipeline stage,
+    into prompts. A prompt is sent once it is full or linger_seconds after
+    its first article arrived, whichever comes first.
+    """
+
+    def __init__(self, triage, query):
+        self.triage = triage
+        self.query = query
+        self.pending = []
+        # The system message and query count against every prompt's budget
+        self.base_tokens = triage.estimate_base_tokens(query)
+        self.pending_tokens = self.base_tokens
+        self.timer = None
+        self.tasks = set()
+
+    async def score(self, article):
+        """
+        Returns:
+            dict: The article, once its prompt has been answered
+        """
+        await self.submit(article)
+        return article
+
+    def submit(self, article):
+        """
+        Add an article to the pending prompt without waiting for it
+
+        Returns:
+            asyncio.Future: Done once the article's prompt has been answered
+        """
+        tokens = self.triage.estimate_article_tokens(article)
+        if self.pending and (
+            self.pending_tokens + tokens > self.triage.prompt_token_budget
+            or len(self.pending) >= self.triage.max_articles_per_prompt
+        ):
+            self.flush()
+
+        future = asyncio.get_running_loop().create_future()
+        self.pending.append((article, future))
+        self.pending_tokens += tokens
+        if self.timer is None:
+            self.timer = asyncio.get_running_loop().call_later(
+                self.triage.linger_seconds, self.flush
+            )
+        return future
+
+    def flush(self):
+        """Send the pending articles as one prompt"""
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        if not self.pending:
+            return
+
+        batch = self.pending
+        self.pending = []
+        self.pending_tokens = self.base_tokens
+
+        def release(task):
+            self.tasks.discard(task)
+            for _, future in batch:
+                if not future.done():
+                    future.set_result(None)
+
+        task = asyncio.create_task(self._score([article for article, _ in batch]))
+        self.tasks.add(task)
+        task.add_done_callback(release)
+
+    async def _score(self, articles):
+        with track_stage("triage"):
+            await self.triage.score(self.query, articles)
+
+    def close(self):
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        for task in self.tasks:
+            task.cancel()
+
+
+# Global triage, sharing the chat client's rate limits across searches
+abstract_triage = None
+
+
+def get_abstract_triage():
+    """
+    Returns the process-wide abstract triage, creating it if needed
+    """
+    global abstract_triage
+    if abstract_triage is None:
+        abstract_triage = AbstractTriage()
+    return abstract_triage
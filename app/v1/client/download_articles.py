@@ -1,27 +1,72 @@
 import os
 import asyncio
-import aiohttp
+from contextlib import aclosing
 from doi2pdf import doi2pdf
 from dotenv import load_dotenv
-from app.v1.utils.constants import USER_AGENT_TEMPLATE
+from app.v1.utils.constants import CROSSREF_MAX_ROWS, USER_AGENT_TEMPLATE
 from app.v1.schemas.download_articles import (
     CrossRefParams,
     ArticleResponse,
     ArticleInput,
+    ArticleStreamSummary,
 )
-from app.v1.utils.utils import create_ssl_context
+import functools
+import hashlib
+from functools import lru_cache
 import tempfile
-from app.v1.utils.storage import AzureBlobStorageClient
-from app.v1.utils.utils import create_file_name
+import time
+from app.v1.utils.storage import get_async_storage_client
+from app.v1.utils.utils import (
+    create_blob_name,
+    create_chunks_blob_name,
+    filter_valid_results,
+    hash_content,
+    is_pdf,
+    normalize_doi,
+)
+from app.v1.utils.config import load_config
+from app.v1.utils.crossref_parser import CrossrefItemsParser
+from app.v1.utils.http_sessions import get_http_session_pool
+from app.v1.utils.cache import CACHE_MISS, get_cache
+from app.v1.utils.pipeline import run_pipeline
+from app.v1.utils.resilience import first_success
+from app.v1.utils.text_extraction import get_text_extractor
+from app.v1.utils.search_index import get_search_index
+from app.v1.utils.dedup import get_deduplicator
+from app.v1.client.abstract_triage import get_abstract_triage
+from app.v1.utils.metrics import (
+    BYTES_DOWNLOADED,
+    BYTES_UPLOADED,
+    UPSTREAM_REQUESTS,
+    track_stage,
+    track_upstream,
+)
 import logging
 
 
 class ExtractResearchArticles:
-    def __init__(self):
+    def __init__(
+        self,
+        http_session_pool=None,
+        crossref_cache=None,
+        unpaywall_cache=None,
+        azure_client=None,
+        text_extractor=None,
+        search_index=None,
+        deduplicator=None,
+        triage=None,
+    ):
         load_dotenv()
 
         self._configure_from_env()
-        self.azure_client = AzureBlobStorageClient()
+        self.http_session_pool = http_session_pool or get_http_session_pool()
+        self.crossref_cache = crossref_cache or get_cache("crossref")
+        self.unpaywall_cache = unpaywall_cache or get_cache("unpaywall")
+        self.azure_client = azure_client or get_async_storage_client()
+        self.text_extractor = text_extractor or get_text_extractor()
+        self.search_index = search_index or get_search_index()
+        self.deduplicator = deduplicator or get_deduplicator()
+        self.triage = triage or get_abstract_triage()
         self.logger = logging.getLogger(__name__)
 
     def _configure_from_env(self):
@@ -44,6 +89,15 @@ class ExtractResearchArticles:
         self.output_directory = os.getenv("JOURNAL_ARTICLE_DIRECTORY")
         self.user_agent = USER_AGENT_TEMPLATE.format(email=self.email)
 
+        articles_config = load_config().get("articles", {})
+        self.open_access_concurrency = articles_config.get(
+            "open_access_concurrency", 10
+        )
+        self.upload_block_size = articles_config.get("upload_block_size", 4194304)
+        self.download_concurrency = articles_config.get("download_concurrency", 8)
+        self.pipeline_queue_size = articles_config.get("pipeline_queue_size", 50)
+        self.pdf_hedge_delay = articles_config.get("pdf_hedge_delay")
+
     def _get_crossref_headers(self):
         """Return headers for Crossref API requests"""
         return {"User-Agent": self.user_agent}
@@ -52,46 +106,165 @@ class ExtractResearchArticles:
         """Generate the appropriate Unpaywall URL for a given DOI"""
         return f"{self.unpaywall_base_url}/{doi}?email={self.email}"
 
-    async def get_dois_from_crossref(self, query, max_articles):
-        crossref_connector = create_ssl_context()
+    async def get_dois_from_crossref(self, query, max_articles, use_cache=True):
+        return [
+            article
+            async for article in self.iter_crossref_articles(
+                query, max_articles, use_cache=use_cache
+            )
+        ]
+
+    async def iter_crossref_articles(self, query, max_articles, use_cache=True):
+        """
+        Yield Crossref articles as each page body is parsed, so later stages
+        can start before the search finishes. The full list is cached once
+        every page has been read.
+
+        Near-duplicates, within the results and of papers stored earlier, are
+        dropped before they are yielded; see _deduplicate.
+        """
+        params = CrossRefParams(
+            query=query, rows=min(max_articles, CROSSREF_MAX_ROWS)
+        ).model_dump(exclude_none=True)
+        cache_key = self.crossref_cache.make_key(
+            params["query"], params["filter"], max_articles
+        )
 
-        params = CrossRefParams(query=query, rows=max_articles).model_dump()
-        headers = self._get_crossref_headers()
+        # Results beyond one page are fetched with Crossref's deep-paging cursor
+        if max_articles > CROSSREF_MAX_ROWS:
+            params["cursor"] = "*"
+
+        dedup_session = self.deduplicator.session() if self.deduplicator else None
 
         try:
-            async with aiohttp.ClientSession(connector=crossref_connector) as session:
-                async with session.get(
-                    self.crossref_base_url, params=params, headers=headers
-                ) as response:
-                    response.raise_for_status()
-                    data = await response.json()
-                    return self.extract_article_info(data)
+            # Time spent suspended at yield belongs to the consumer
+            with track_stage("search") as search_timer:
+                if use_cache:
+                    cached_articles = await self.crossref_cache.get(cache_key)
+                    if cached_articles is not CACHE_MISS:
+                        for article in await self._deduplicate(
+                            dedup_session, cached_articles
+                        ):
+                            with search_timer.paused():
+                                yield article
+                        return
+
+                article_list = []
+                while True:
+                    parser = CrossrefItemsParser()
+                    page_size = 0
+                    async for page_articles in self._iter_crossref_page(params, parser):
+                        page_size += len(page_articles)
+                        page_articles = page_articles[
+                            : max_articles - len(article_list)
+                        ]
+                        article_list.extend(page_articles)
+                        for article in await self._deduplicate(
+                            dedup_session, page_articles
+                        ):
+                            with search_timer.paused():
+                                yield article
+
+                    next_cursor = parser.close().get("next-cursor")
+                    if (
+                        "cursor" not in params
+                        or not page_size
+                        or not next_cursor
+                        or len(article_list) >= max_articles
+                    ):
+                        break
+                    params["cursor"] = next_cursor
+
+                await self.crossref_cache.set(cache_key, article_list)
 
         except Exception as e:
             error_type = type(e).__name__
             self.logger.warning(f"Error fetching DOIs: ({error_type}): {e}")
             raise Exception(f"Error fetching DOIs: {e}")
 
-    async def check_for_open_access(self, article_list):
-        open_article_list = []
-        open_access_connector = create_ssl_context()
+    async def _deduplicate(self, dedup_session, articles):
+        """
+        Drop near-duplicates from a batch of search results, keeping the best
+        version of each paper. Dedup is an optimization, so results are
+        returned as they are if it fails.
+        """
+        if dedup_session is None or not articles:
+            return articles
 
         try:
-            async with aiohttp.ClientSession(
-                connector=open_access_connector
-            ) as session:
-                for article in article_list:
-                    unpaywell_url = self._get_unpaywall_url(article["doi"])
+            with track_stage("dedup"):
+                kept = await asyncio.to_thread(dedup_session.deduplicate, articles)
+        except Exception as e:
+            error_type = type(e).__name__
+            self.logger.warning(f"Error deduplicating articles: ({error_type}): {e}")
+            return articles
 
-                    is_open_access = await self.check_article_access(
-                        session, unpaywell_url
-                    )
-                    if is_open_access:
-                        open_article_list.append(article)
+        if len(kept) < len(articles):
+            self.logger.info(
+                f"Dropped {len(articles) - len(kept)} near-duplicate articles"
+            )
+        return kept
+
+    async def remember_articles(self, articles):
+        """
+        Keep the signatures of stored papers, so later searches resolve new
+        copies of them to the stored version
+        """
+        if self.deduplicator is None:
+            return
+
+        try:
+            await asyncio.to_thread(self.deduplicator.remember, articles)
+        except Exception as e:
+            error_type = type(e).__name__
+            self.logger.warning(f"Error saving article signatures: ({error_type}): {e}")
+
+    async def _iter_crossref_page(self, params, parser):
+        """
+        Fetch one page of Crossref results, parsing items as the body streams
+        in, then yield them in batches. parser.close() returns the page's
+        message afterwards.
+
+        The whole body is read before the first yield, so a slow consumer
+        never holds the connection, its limiter slot or the request timeout.
+        """
+        batches = []
+        with track_upstream("crossref"):
+            async with self.http_session_pool.request(
+                "crossref",
+                "GET",
+                self.crossref_base_url,
+                params=params,
+                headers=self._get_crossref_headers(),
+            ) as response:
+                async for chunk in response.content.iter_any():
+                    BYTES_DOWNLOADED.inc(len(chunk), upstream="crossref")
+                    items = parser.feed(chunk)
+                    if items:
+                        batches.append(
+                            self.extract_article_info({"message": {"items": items}})
+                        )
+
+        for batch in batches:
+            yield batch
 
-                if not open_article_list:
-                    self.logger.error("No open-access articles found.")
-                    raise Exception("No open-access articles found.")
+    async def check_for_open_access(self, article_list, use_cache=True):
+        semaphore = asyncio.Semaphore(self.open_access_concurrency)
+
+        try:
+            tasks = [
+                self._check_open_access_for_article(semaphore, article, use_cache)
+                for article in article_list
+            ]
+            await asyncio.gather(*tasks)
+
+            open_article_list = [
+                article for article in article_list if article.get("is_open_access")
+            ]
+
+            if not open_article_list:
+                self.logger.error("No open-access articles found.")
+                raise Exception("No open-access articles found.")
 
             return open_article_list
 
@@ -100,14 +273,68 @@ class ExtractResearchArticles:
             self.logger.error(f"Error checking for open access: ({error_type}): {e}")
             raise Exception(f"Error checking for open access: {e}")
 
-    async def check_article_access(self, session, url):
-        async with session.get(url) as response:
-            try:
-                data = await response.json()
-                return data.get("is_oa")
-            except Exception as e:
-                self.logger.error(f"Error checking for open access: {e}")
-                raise Exception(f"Error checking for open access: {e}")
+    async def _check_open_access_for_article(self, semaphore, article, use_cache=True):
+        """Check one article under the concurrency cap, recording failures on it"""
+        # Timed per article, whether it is checked in a batch or the pipeline
+        with track_stage("open_access"):
+            cache_key = self.unpaywall_cache.make_key(
+                "oa_record", normalize_doi(article["doi"])
+            )
+
+            if use_cache:
+                access_record = await self.unpaywall_cache.get(cache_key)
+                if access_record is not CACHE_MISS:
+                    self._apply_access_record(article, access_record)
+                    return article
+
+            unpaywall_url = self._get_unpaywall_url(article["doi"])
+
+            async with semaphore:
+                try:
+                    access_record = await self.check_article_access(unpaywall_url)
+                    self._apply_access_record(article, access_record)
+                    await self.unpaywall_cache.set(cache_key, access_record)
+                except Exception as e:
+                    article["is_open_access"] = False
+                    article["open_access_error"] = str(e)
+                    self.logger.warning(
+                        f"Open access check failed for doi {article['doi']}: {e}"
+                    )
+
+            return article
+
+    @staticmethod
+    def _apply_access_record(article, access_record):
+        article["is_open_access"] = access_record["is_oa"]
+        article["pdf_urls"] = access_record["pdf_urls"]
+
+    async def check_article_access(self, url):
+        with track_upstream("unpaywall"):
+            # Unpaywall answers unknown DOIs with a 404 and a JSON body
+            async with self.http_session_pool.request(
+                "unpaywall", "GET", url, raise_for_status=False
+            ) as response:
+                try:
+                    data = await response.json()
+                    BYTES_DOWNLOADED.inc(
+                        response.content_length or 0, upstream="unpaywall"
+                    )
+                    return self.extract_access_record(data)
+                except Exception as e:
+                    self.logger.error(f"Error checking for open access: {e}")
+                    raise Exception(f"Error checking for open access: {e}")
+
+    def extract_access_record(self, data):
+        """Keep the OA flag and candidate PDF URLs, best location first"""
+        locations = [data.get("best_oa_location")] + (data.get("oa_locations") or [])
+
+        pdf_urls = []
+        for location in locations:
+            pdf_url = (location or {}).get("url_for_pdf")
+            if pdf_url and pdf_url not in pdf_urls:
+                pdf_urls.append(pdf_url)
+
+        return {"is_oa": bool(data.get("is_oa")), "pdf_urls": pdf_urls}
 
     def extract_article_info(self, data):
         try:
@@ -131,20 +358,51 @@ class ExtractResearchArticles:
     async def download_papers(self, open_article_list):
         try:
             for article in open_article_list:
-                article["file_name"] = create_file_name(article["title"][0])
+                article["file_name"] = create_blob_name(article["doi"])
 
-            tasks = [
-                self.download_and_upload_paper(article) for article in open_article_list
-            ]
+            # Skip the download entirely for DOIs that are already stored
+            existing_blob_urls = await self.azure_client.get_existing_blob_urls(
+                [article["file_name"] for article in open_article_list]
+            )
+
+            pending_articles = []
+            for article, blob_url in zip(open_article_list, existing_blob_urls):
+                if isinstance(blob_url, Exception):
+                    self.logger.error(
+                        f"Error checking Azure Blob Storage for doi {article['doi']}: {blob_url}"
+                    )
+                elif blob_url:
+                    article["blob_url"] = blob_url
+                else:
+                    pending_articles.append(article)
+
+            tasks = [self.download_paper(article) for article in pending_articles]
 
             # Process all downloads in parallel
             results = await asyncio.gather(*tasks, return_exceptions=True)
 
-            exported_articles = [article for article in results if article is not None]
+            # Papers that could not be streamed are uploaded as one batch
+            await self.upload_papers_to_azure(
+                [
+                    (article, pdf_content)
+                    for article, pdf_content in filter_valid_results(results)
+                    if pdf_content
+                ]
+            )
+
+            exported_articles = [
+                article for article in open_article_list if article.get("blob_url")
+            ]
 
             if not exported_articles:
                 raise ValueError("No articles downloaded.")
 
+            await self.remember_articles(exported_articles)
+            if self.text_extractor.enabled:
+                await self.extract_articles_text(exported_articles)
+            else:
+                await self.index_articles(exported_articles)
+
             return exported_articles
 
         except Exception as e:
@@ -152,14 +410,194 @@ class ExtractResearchArticles:
             self.logger.error(f"Error downloading papers: ({error_type}): {e}")
             raise Exception(f"Error downloading papers: {e}")
 
+    async def download_papers_as_completed(self, open_article_list):
+        """
+        Download and upload papers concurrently, at most download_concurrency
+        at a time, yielding each one as it finishes
+
+        Yields:
+            tuple: (article, error). error is None when the paper was stored.
+        """
+        # Each download may hold an upload block in memory
+        semaphore = asyncio.Semaphore(self.download_concurrency)
+
+        async def download(article):
+            async with semaphore:
+                result = await self._download_article(article)
+            return await self._process_stored(result)
+
+        tasks = [
+            asyncio.create_task(download(article)) for article in open_article_list
+        ]
+
+        try:
+            for task in asyncio.as_completed(tasks):
+                yield await task
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _download_article(self, article):
+        """
+        Returns:
+            tuple: (article, error). error is None when the paper was stored.
+        """
+        article["file_name"] = create_blob_name(article["doi"])
+        try:
+            if await self.download_and_upload_paper(article) is None:
+                return article, "No PDF content found"
+            return article, None
+        except Exception as e:
+            return article, str(e)
+
+    async def _process_stored(self, result):
+        """
+        Extract the text of a stored paper from an (article, error) download
+        result if enabled, and add the paper to the local search index and
+        the stored signatures
+        """
+        article, error = result
+        if error is None and article.get("blob_url"):
+            await self.remember_articles([article])
+            if self.text_extractor.enabled:
+                await self.extract_article_text(article)
+            else:
+                await self.index_articles([article])
+        return result
+
+    async def index_articles(self, articles, text=None):
+        """
+        Add stored papers to the local search index, if enabled. Indexing
+        failures are logged, since the papers themselves are stored.
+        """
+        if self.search_index is None:
+            return
+
+        def add():
+            for article in articles:
+                self.search_index.add(article, text=text)
+
+        try:
+            with track_stage("index"):
+                await asyncio.to_thread(add)
+        except Exception as e:
+            error_type = type(e).__name__
+            self.logger.warning(f"Error indexing articles: ({error_type}): {e}")
+
+    async def extract_articles_text(self, articles):
+        """
+        Extract text from stored papers, keeping no more PDFs on local disk
+        than there are worker processes to parse them
+        """
+        semaphore = asyncio.Semaphore(self.text_extractor.max_workers)
+
+        async def extract(article):
+            async with semaphore:
+                return await self.extract_article_text(article)
+
+        return await asyncio.gather(*[extract(article) for article in articles])
+
+    async def extract_article_text(self, article):
+        """
+        Extract and chunk a stored paper's text in the worker process pool and
+        store the chunks as JSON beside the PDF. The PDF is read back from
+        Azure to a temporary file, so only the workers hold it in memory.
+
+        Failures are recorded on the article as text_error rather than raised,
+        since the paper itself is already stored.
+        """
+        chunks_blob_name = create_chunks_blob_name(article["file_name"])
+        text = None
+
+        try:
+            with track_stage("text_extraction"):
+                with track_upstream("azure_blob"):
+                    existing_blob_url = await self.azure_client.get_existing_blob_url(
+                        chunks_blob_name
+                    )
+                if existing_blob_url:
+                    article["chunks_blob_url"] = existing_blob_url
+                    await self.index_articles([article])
+                    return article
+
+                start = time.perf_counter()
+                with tempfile.NamedTemporaryFile(
+                    delete=False, suffix=".pdf"
+                ) as temp_file:
+                    temp_path = temp_file.name
+
+                try:
+                    with track_upstream("azure_blob"):
+                        await self.azure_client.download_blob_to_file(
+                            article["file_name"], temp_path
+                        )
+                    downloaded_at = time.perf_counter()
+                    result = await self.text_extractor.process(temp_path)
+                finally:
+                    try:
+                        os.unlink(temp_path)
+                    except OSError as e:
+                        self.logger.warning(
+                            f"Failed to remove temporary file {temp_path}: {e}"
+                        )
+
+                document = {
+                    "doi": article["doi"],
+                    "title": article.get("title"),
+                    "file_name": article["file_name"],
+                    "blob_url": article.get("blob_url"),
+                    "page_count": result["page_count"],
+                    "characters": result["characters"],
+                    "sections": result["sections"],
+                    "chunk_size": self.text_extractor.chunk_size,
+                    "chunk_overlap": self.text_extractor.chunk_overlap,
+                    "chunks": result["chunks"],
+                    "timings": {
+                        "download_seconds": downloaded_at - start,
+                        **result["timings"],
+                        "total_seconds": time.perf_counter() - start,
+                    },
+                }
+
+                with track_upstream("azure_blob"):
+                    article["chunks_blob_url"] = await self.azure_client.upload_json(
+                        document,
+                        chunks_blob_name,
+                        metadata={
+                            "doi": normalize_doi(article["doi"]),
+                            "chunk_count": str(len(result["chunks"])),
+                        },
+                    )
+                article["chunk_count"] = len(result["chunks"])
+                text = result["text"]
+
+        except Exception as e:
+            error_type = type(e).__name__
+            article["text_error"] = str(e)
+            self.logger.warning(
+                f"Error extracting text for doi {article['doi']}: ({error_type}): {e}"
+            )
+
+        await self.index_articles([article], text=text)
+        return article
+
+    def _get_blob_metadata(self, article, pdf_content):
+        return {
+            "doi": normalize_doi(article["doi"]),
+            "content_sha256": hash_content(pdf_content),
+        }
+
     async def upload_to_azure(self, article, pdf_content):
         try:
             # Upload directly from memory
-            blob_url = await asyncio.to_thread(
-                self.azure_client.upload_pdf_from_memory,
-                pdf_content,
-                article["file_name"],
-            )
+            with track_stage("upload"), track_upstream("azure_blob"):
+                blob_url = await self.azure_client.upload_pdf_from_memory(
+                    pdf_content,
+                    article["file_name"],
+                    metadata=self._get_blob_metadata(article, pdf_content),
+                    overwrite=False,
+                )
+            BYTES_UPLOADED.inc(len(pdf_content), destination="azure_blob")
             article["blob_url"] = blob_url
 
             return article
@@ -171,16 +609,97 @@ class ExtractResearchArticles:
             )
             raise Exception(f"Error uploading to Azure Blob Storage: {e}")
 
-    async def download_and_upload_paper(self, article):
+    async def upload_papers_to_azure(self, downloads):
+        """Upload (article, pdf_content) pairs through the batch upload API"""
+        if not downloads:
+            return []
+
+        uploads = [
+            {
+                "file_content": pdf_content,
+                "blob_name": article["file_name"],
+                "metadata": self._get_blob_metadata(article, pdf_content),
+            }
+            for article, pdf_content in downloads
+        ]
+        with track_stage("upload"):
+            blob_urls = await self.azure_client.upload_pdfs(uploads, overwrite=False)
+
+        uploaded_articles = []
+        for (article, pdf_content), blob_url in zip(downloads, blob_urls):
+            if isinstance(blob_url, Exception):
+                UPSTREAM_REQUESTS.inc(upstream="azure_blob", outcome="failure")
+                self.logger.error(
+                    f"Error uploading to Azure Blob Storage for doi {article['doi']}: {blob_url}"
+                )
+                continue
+
+            UPSTREAM_REQUESTS.inc(upstream="azure_blob", outcome="success")
+            BYTES_UPLOADED.inc(len(pdf_content), destination="azure_blob")
+            article["blob_url"] = blob_url
+            uploaded_articles.append(article)
+
+        return uploaded_articles
+
+    async def download_paper(self, article):
+        """
+        Stream the paper into Azure from its open-access locations, falling
+        back to doi2pdf. When the first location has not finished within
+        pdf_hedge_delay seconds, the next one is raced against it.
+
+        Returns:
+            tuple: (article, pdf_content). pdf_content is None when the paper
+            was streamed straight into Azure, and bytes still to be uploaded
+            when it came from the doi2pdf fallback.
+        """
         try:
-            pdf_content = await self.get_pdf_content(article["doi"])
+            with track_stage("download"):
+                blob_url = await first_success(
+                    [
+                        functools.partial(
+                            self.stream_pdf_to_azure, article, pdf_url, attempt
+                        )
+                        for attempt, pdf_url in enumerate(article.get("pdf_urls") or [])
+                    ],
+                    hedge_delay=self.pdf_hedge_delay,
+                )
+                if blob_url:
+                    article["blob_url"] = blob_url
+                    return article, None
+
+                pdf_content = await self.get_pdf_content(article["doi"])
 
             if not pdf_content:
                 self.logger.warning(f"No PDF content found for DOI: {article['doi']}")
                 return None
 
-            # Upload directly from memory
-            article = await self.upload_to_azure(article, pdf_content)
+            return article, pdf_content
+
+        except Exception as e:
+            error_type = type(e).__name__
+            self.logger.error(
+                f"Error downloading paper with doi {article['doi']}: ({error_type}): {e}"
+            )
+            raise Exception(f"Error downloading paper: {e}")
+
+    async def download_and_upload_paper(self, article):
+        try:
+            # Skip the download entirely when this DOI is already stored
+            existing_blob_url = await self.azure_client.get_existing_blob_url(
+                article["file_name"]
+            )
+            if existing_blob_url:
+                article["blob_url"] = existing_blob_url
+                return article
+
+            download = await self.download_paper(article)
+            if download is None:
+                return None
+
+            article, pdf_content = download
+            if pdf_content:
+                # Upload directly from memory
+                article = await self.upload_to_azure(article, pdf_content)
 
             return article
 
@@ -191,6 +710,81 @@ class ExtractResearchArticles:
             )
             raise Exception(f"Error downloading and uploading paper: {e}")
 
+    async def stream_pdf_to_azure(self, article, pdf_url, attempt=0):
+        """
+        Stream a PDF into staged blob blocks, holding at most one block in memory
+
+        Args:
+            attempt (int): Index of this location, which keeps the block IDs
+                of hedged downloads of the same blob apart
+
+        Returns:
+            str | None: URL of the blob, or None if the URL did not serve a PDF
+        """
+        headers = {"User-Agent": self.user_agent}
+        content_hash = hashlib.sha256()
+        block_ids = []
+        buffer = bytearray()
+
+        try:
+            with track_upstream("pdf"):
+                async with self.http_session_pool.request(
+                    "pdf", "GET", pdf_url, headers=headers
+                ) as response:
+                    async for chunk in response.content.iter_chunked(65536):
+                        BYTES_DOWNLOADED.inc(len(chunk), upstream="pdf")
+                        buffer.extend(chunk)
+
+                        # Publisher links often serve an HTML landing page instead
+                        if not block_ids and len(buffer) >= 4 and not is_pdf(buffer):
+                            break
+
+                        if len(buffer) >= self.upload_block_size:
+                            await self._stage_block(
+                                article, attempt, block_ids, content_hash, buffer
+                            )
+                            buffer = bytearray()
+
+            if not block_ids and not is_pdf(buffer):
+                self.logger.warning(
+                    f"URL {pdf_url} for doi {article['doi']} did not return a PDF"
+                )
+                return None
+
+            if buffer:
+                await self._stage_block(
+                    article, attempt, block_ids, content_hash, buffer
+                )
+
+            metadata = {
+                "doi": normalize_doi(article["doi"]),
+                "content_sha256": content_hash.hexdigest(),
+            }
+
+            with track_upstream("azure_blob"):
+                return await self.azure_client.commit_blocks(
+                    article["file_name"], block_ids, metadata=metadata
+                )
+
+        except Exception as e:
+            error_type = type(e).__name__
+            self.logger.warning(
+                f"Error streaming PDF from {pdf_url} for doi {article['doi']}: ({error_type}): {e}"
+            )
+            return None
+
+    async def _stage_block(self, article, attempt, block_ids, content_hash, data):
+        # Azure needs every block ID of a blob to have the same length
+        block_id = f"{attempt % 10}{len(block_ids):07d}"
+        content_hash.update(data)
+
+        with track_upstream("azure_blob"):
+            await self.azure_client.stage_block(
+                article["file_name"], block_id, bytes(data)
+            )
+        BYTES_UPLOADED.inc(len(data), destination="azure_blob")
+        block_ids.append(block_id)
+
     async def get_pdf_content(self, doi):
         """Get the PDF content in memory by first writing to a temporary file"""
 
@@ -201,7 +795,8 @@ class ExtractResearchArticles:
 
             try:
                 # Download to the temporary file
-                await asyncio.to_thread(doi2pdf, doi, output=temp_path)
+                with track_upstream("doi2pdf"):
+                    await asyncio.to_thread(doi2pdf, doi, output=temp_path)
             except Exception as e:
                 self.logger.warning(f"Error downloading PDF for DOI {doi}: {e}")
                 return None
@@ -214,6 +809,7 @@ class ExtractResearchArticles:
             # Read the file content into memory
             with open(temp_path, "rb") as f:
                 content = f.read()
+            BYTES_DOWNLOADED.inc(len(content), upstream="doi2pdf")
 
             try:
                 os.unlink(temp_path)
@@ -229,11 +825,320 @@ class ExtractResearchArticles:
             )
             raise Exception(f"Error downloading PDF content for doi {doi}: {e}")
 
+    async def run_article_pipeline(self, articles, use_cache=True, query=None):
+        """
+        Stream articles through the open-access check and download stages,
+        with abstract triage between them when it is enabled and a query is
+        given, then text extraction and indexing when they are enabled. Each
+        stage has its own worker count and bounded queue, so a DOI is
+        downloaded as soon as its own check returns while the search is
+        still reading results.
+
+        Args:
+            articles (AsyncIterable): Articles, e.g. from iter_crossref_articles
+            query (str | None): Search query the abstracts are triaged against
+
+        Yields:
+            tuple: (article, error) for every article, in completion order.
+            Articles that are not open access, or that triage scored below
+            the threshold, are passed through without a download; check
+            article["is_open_access"] and self.triage.is_relevant(article).
+        """
+        semaphore = asyncio.Semaphore(self.open_access_concurrency)
+        triage_batcher = (
+            self.triage.batcher(query) if self.triage.enabled and query else None
+        )
+
+        async def check_open_access(article):
+            return await self._check_open_access_for_article(
+                semaphore, article, use_cache
+            )
+
+        async def triage(article):
+            # Hand the article on at once, so the batcher fills its prompts
+            # from the articles waiting in the download queue
+            if not article.get("is_open_access"):
+                return article, None
+            return article, triage_batcher.submit(article)
+
+        async def download(article):
+            if not article.get("is_open_access") or not self.triage.is_relevant(
+                article
+            ):
+                return article, None
+            return await self._download_article(article)
+
+        async def download_triaged(item):
+            article, scored = item
+            if scored is not None:
+                await scored
+            return await download(article)
+
+        stages = [(check_open_access, self.open_access_concurrency)]
+        if triage_batcher:
+            # Submitting never waits on the model, so one worker keeps up
+            stages.append((triage, 1))
+            stages.append((download_triaged, self.download_concurrency))
+        else:
+            stages.append((download, self.download_concurrency))
+        if self.text_extractor.enabled:
+            # Each worker waits on one process, so more would only queue
+            stages.append((self._process_stored, self.text_extractor.max_workers))
+        elif self.search_index is not None or self.deduplicator is not None:
+            stages.append((self._process_stored, 1))
+
+        try:
+            async with aclosing(
+                run_pipeline(articles, stages, queue_size=self.pipeline_queue_size)
+            ) as results:
+                async for result in results:
+                    yield result
+        finally:
+            if triage_batcher:
+                triage_batcher.close()
+
     async def search_and_download_open_papers(self, article_input: ArticleInput):
-        article_list = await self.get_dois_from_crossref(**article_input.model_dump())
+        search_order = {}
+
+        async def search():
+            async for article in self.iter_crossref_articles(
+                article_input.query,
+                article_input.max_articles,
+                use_cache=article_input.use_cache,
+            ):
+                search_order[id(article)] = len(search_order)
+                yield article
+
+        open_access = 0
+        relevant = 0
+        downloaded_articles = []
+        async for article, error in self.run_article_pipeline(
+            search(), use_cache=article_input.use_cache, query=article_input.query
+        ):
+            if article.get("is_open_access"):
+                open_access += 1
+                if not self.triage.is_relevant(article):
+                    continue
+                relevant += 1
+                if not error:
+                    downloaded_articles.append(article)
+
+        if not open_access:
+            self.logger.error("No open-access articles found.")
+            raise Exception("No open-access articles found.")
+        if not relevant:
+            self.logger.error("No relevant open-access articles found.")
+            raise Exception("No relevant open-access articles found.")
+        if not downloaded_articles:
+            self.logger.error("No articles downloaded.")
+            raise Exception("No articles downloaded.")
+
+        # Keep Crossref's relevance order rather than completion order
+        return sorted(downloaded_articles, key=lambda a: search_order[id(a)])
+
+    async def search_and_download_batch(self, article_inputs):
+        """
+        Run several searches concurrently, then check and download each DOI
+        once even when several queries returned it
+
+        Returns:
+            list: {"query", "articles", "error"} for each input, in input order
+        """
+        searches = await asyncio.gather(
+            *[
+                self.get_dois_from_crossref(
+                    article_input.query,
+                    article_input.max_articles,
+                    use_cache=article_input.use_cache,
+                )
+                for article_input in article_inputs
+            ],
+            return_exceptions=True,
+        )
+
+        unique_articles = {}
+        for article_list in filter_valid_results(searches):
+            for article in article_list:
+                unique_articles.setdefault(normalize_doi(article["doi"]), article)
+
+        stored_articles = {}
+        relevant_dois = None
+        batch_error = None
+        try:
+            open_article_list = await self.check_for_open_access(
+                list(unique_articles.values()),
+                use_cache=all(
+                    article_input.use_cache for article_input in article_inputs
+                ),
+            )
+            if self.triage.enabled:
+                relevant_dois = await self._triage_batch(
+                    article_inputs, searches, open_article_list
+                )
+                open_article_list = [
+                    article
+                    for article in open_article_list
+                    if any(
+                        normalize_doi(article["doi"]) in dois for dois in relevant_dois
+                    )
+                ]
+            for article in await self.download_papers(open_article_list):
+                stored_articles[normalize_doi(article["doi"])] = article
+        except Exception as e:
+            batch_error = str(e)
+
+        results = []
+        for index, (article_input, article_list) in enumerate(
+            zip(article_inputs, searches)
+        ):
+            if isinstance(article_list, Exception):
+                results.append(
+                    {
+                        "query": article_input.query,
+                        "articles": [],
+                        "error": str(article_list),
+                    }
+                )
+                continue
+
+            dois = dict.fromkeys(
+                normalize_doi(article["doi"]) for article in article_list
+            )
+            if relevant_dois is not None:
+                dois = [doi for doi in dois if doi in relevant_dois[index]]
+            articles = [stored_articles[doi] for doi in dois if doi in stored_articles]
+            results.append(
+                {
+                    "query": article_input.query,
+                    "articles": articles,
+                    "error": None
+                    if articles
+                    else batch_error or "No articles downloaded.",
+                }
+            )
+
+        return results
+
+    async def triage_articles(self, query, articles):
+        """
+        Keep only the articles whose abstracts triage scores as relevant to
+        query; all of them when triage is disabled
+
+        Returns:
+            list: The relevant articles, in input order
+        """
+        if not self.triage.enabled:
+            return articles
+        return await self.triage.triage(query, articles)
+
+    async def _triage_batch(self, article_inputs, searches, open_article_list):
+        """
+        Triage each query's open-access articles against that query. An
+        article shared by several queries is scored once per query, on a
+        copy, and keeps its highest score.
+
+        Returns:
+            list: Set of relevant normalized DOIs for each query
+        """
+        open_articles = {
+            normalize_doi(article["doi"]): article for article in open_article_list
+        }
+
+        async def triage_query(article_input, article_list):
+            if isinstance(article_list, Exception):
+                return set()
+            dois = dict.fromkeys(
+                normalize_doi(article["doi"]) for article in article_list
+            )
+            copies = [dict(open_articles[doi]) for doi in dois if doi in open_articles]
+            relevant = await self.triage_articles(article_input.query, copies)
+            for article in copies:
+                score = article.get("relevance_score")
+                original = open_articles[normalize_doi(article["doi"])]
+                if score is not None and score > (
+                    original.get("relevance_score") or 0.0
+                ):
+                    original["relevance_score"] = score
+            return {normalize_doi(article["doi"]) for article in relevant}
+
+        return await asyncio.gather(
+            *(
+                triage_query(article_input, article_list)
+                for article_input, article_list in zip(article_inputs, searches)
+            )
+        )
+
+    async def stream_open_papers(self, article_input: ArticleInput):
+        """
+        Run the search pipeline and yield each stored article as soon as its
+        upload finishes, followed by a summary record listing failures
+
+        Yields:
+            dict: {"type": "article", "article": ...}, then {"type": "summary", ...}
+        """
+        failures = []
+        articles_found = 0
+        open_access = 0
+        not_relevant = 0
+        downloaded = 0
+
+        try:
+            async with aclosing(
+                self.run_article_pipeline(
+                    self.iter_crossref_articles(
+                        article_input.query,
+                        article_input.max_articles,
+                        use_cache=article_input.use_cache,
+                    ),
+                    use_cache=article_input.use_cache,
+                    query=article_input.query,
+                )
+            ) as results:
+                async for article, error in results:
+                    articles_found += 1
+
+                    if not article.get("is_open_access"):
+                        if article.get("open_access_error"):
+                            failures.append(
+                                {
+                                    "doi": article["doi"],
+                                    "error": article["open_access_error"],
+                                }
+                            )
+                        continue
+
+                    open_access += 1
+                    if not self.triage.is_relevant(article):
+                        not_relevant += 1
+                        continue
+                    if error:
+                        failures.append({"doi": article["doi"], "error": error})
+                        continue
+
+                    downloaded += 1
+                    yield {
+                        "type": "article",
+                        "article": ArticleResponse(**article).model_dump(
+                            mode="json", by_alias=True
+                        ),
+                    }
+
+        except Exception as e:
+            failures.append({"doi": None, "error": str(e)})
 
-        open_article_list = await self.check_for_open_access(article_list)
+        yield ArticleStreamSummary(
+            articles_found=articles_found,
+            open_access=open_access,
+            not_relevant=not_relevant,
+            downloaded=downloaded,
+            failures=failures,
+        ).model_dump()
 
-        downloaded_articles = await self.download_papers(open_article_list)
 
-        return downloaded_articles
+@lru_cache(maxsize=1)
+def get_research_articles_client():
+    """
+    Returns the process-wide client, which shares the pooled HTTP sessions,
+    caches and storage client across requests
+    """
+    return ExtractResearchArticles(http_session_pool=get_http_session_pool())
@@ -1,24 +1,58 @@
-from openai import AzureOpenAI
+from openai import AsyncAzureOpenAI, AzureOpenAI, RateLimitError
+import asyncio
+import httpx
+import logging
 import os
+import time
+import unicodedata
 from dotenv import load_dotenv
-import yaml
+from fastapi import FastAPI
+from app.v1.utils.cache import CACHE_MISS, get_cache
+from app.v1.utils.config import load_config
+from app.v1.utils.metrics import CHAT_TIME_TO_FIRST_TOKEN, track_stage, track_upstream
+from app.v1.utils.rate_limit import AdaptiveConcurrencyLimiter, RateLimiter
+
+logger = logging.getLogger(__name__)
+
+# Rough size of a token in English text, for estimating prompt tokens locally
+CHARS_PER_TOKEN = 4
+# Tokens the chat format adds around each message
+TOKENS_PER_MESSAGE = 4
 
 
 class OpenAIChat:
-    def __init__(self):
+    def __init__(self, openai_config=None, response_cache=None):
         load_dotenv()
 
         self.api_key = os.getenv("AZURE_OPENAI_API_KEY")
         self.endpoint = os.getenv("AZURE_OPENAI_ENDPOINT")
         self.api_version = os.getenv("AZURE_OPENAI_VERSION")
-        config_path = os.path.join("./app/config", "config.yaml")
 
-        with open(config_path, "r") as file:
-            config = yaml.safe_load(file)
+        if openai_config is None:
+            openai_config = load_config()["openai"]
+
+        self.model_name = openai_config["model_name"]
+        self.max_tokens = openai_config["max_tokens"]
+        self.temperature = openai_config["temperature"]
+        self.http_config = openai_config.get("http", {})
+        # Sampling above this temperature is not repeatable, so is never cached
+        self.cache_max_temperature = openai_config.get("cache_max_temperature", 0.2)
+        self.response_cache = response_cache or get_cache("openai")
+
+        rate_limit_config = openai_config.get("rate_limit", {})
+        self.rate_limiter = RateLimiter(
+            requests_per_minute=rate_limit_config.get("requests_per_minute", 60),
+            tokens_per_minute=rate_limit_config.get("tokens_per_minute", 60000),
+        )
+        self.concurrency_limiter = AdaptiveConcurrencyLimiter(
+            max_concurrency=rate_limit_config.get("max_concurrency", 8),
+            min_concurrency=rate_limit_config.get("min_concurrency", 1),
+        )
+        self.rate_limit_retries = rate_limit_config.get("max_retries", 3)
+        self.default_retry_after = rate_limit_config.get("default_retry_after", 1)
 
-        self.model_name = config["openai"]["model_name"]
-        self.max_tokens = config["openai"]["max_tokens"]
-        self.temperature = config["openai"]["temperature"]
+        self.async_client = None
+        self._async_client_loop = None
 
     def initialize_openai_client(self):
         client = AzureOpenAI(
@@ -29,6 +63,55 @@ class OpenAIChat:
 
         return client
 
+    def initialize_async_openai_client(self):
+        """
+        Build the async client on a keep-alive httpx pool, negotiating HTTP/2
+        with the Azure endpoint when it is offered
+        """
+        http_client = httpx.AsyncClient(
+            http2=self.http_config.get("http2", True),
+            limits=httpx.Limits(
+                max_connections=self.http_config.get("max_connections", 100),
+                max_keepalive_connections=self.http_config.get(
+                    "max_keepalive_connections", 20
+                ),
+                keepalive_expiry=self.http_config.get("keepalive_expiry", 30),
+            ),
+            timeout=self.http_config.get("timeout", 60),
+        )
+
+        return AsyncAzureOpenAI(
+            api_version=self.api_version,
+            azure_endpoint=self.endpoint,
+            api_key=self.api_key,
+            max_retries=self.http_config.get("max_retries", 2),
+            http_client=http_client,
+        )
+
+    def get_async_client(self):
+        """
+        Returns the shared async client, creating it if needed
+
+        Returns:
+            AsyncAzureOpenAI: Client bound to the running event loop
+        """
+        loop = asyncio.get_running_loop()
+
+        if self.async_client is None or self._async_client_loop is not loop:
+            self.async_client = self.initialize_async_openai_client()
+            self._async_client_loop = loop
+
+        return self.async_client
+
+    async def close(self):
+        if (
+            self.async_client is not None
+            and self._async_client_loop is asyncio.get_running_loop()
+        ):
+            await self.async_client.close()
+        self.async_client = None
+        self._async_client_loop = None
+
     def construct_model_input(self, system_message: str, user_message: str):
         if system_message is None or user_message is None:
             raise ValueError("Both system_message and user_message are required.")
@@ -49,20 +132,317 @@ class OpenAIChat:
 
         return model_input
 
+    def _get_cache_key(self, model_input, max_tokens=None):
+        """
+        Returns the response cache key for a prompt, or None if responses at
+        the configured temperature are not cacheable
+        """
+        if self.temperature > self.cache_max_temperature:
+            return None
+
+        messages = [
+            {
+                "role": message["role"],
+                "content": unicodedata.normalize("NFC", message["content"])
+                .replace("\r\n", "\n")
+                .strip(),
+            }
+            for message in model_input
+        ]
+
+        return self.response_cache.make_key(
+            "chat",
+            self.model_name,
+            self.temperature,
+            max_tokens or self.max_tokens,
+            messages,
+        )
+
+    async def _get_cached_response(self, model_input, use_cache=True, max_tokens=None):
+        """
+        Returns (cache_key, cached response or CACHE_MISS) for a prompt
+        """
+        cache_key = self._get_cache_key(model_input, max_tokens)
+
+        if not use_cache or not cache_key:
+            return cache_key, CACHE_MISS
+
+        return cache_key, await self.response_cache.get(cache_key)
+
+    def estimate_tokens(self, model_input, max_tokens=None):
+        """
+        Estimate the tokens a request counts against the deployment's quota:
+        the prompt, from message lengths, plus the max_tokens budget
+        """
+        prompt_tokens = sum(
+            len(message["content"]) // CHARS_PER_TOKEN + TOKENS_PER_MESSAGE
+            for message in model_input
+        )
+        return prompt_tokens + (max_tokens or self.max_tokens)
+
+    def _get_retry_after(self, error):
+        """
+        Returns the seconds to wait after a 429, or None for other errors
+        """
+        if not isinstance(error, RateLimitError):
+            return None
+
+        headers = error.response.headers
+        try:
+            if "retry-after-ms" in headers:
+                return float(headers["retry-after-ms"]) / 1000
+            if "retry-after" in headers:
+                return float(headers["retry-after"])
+        except ValueError:
+            pass
+
+        return self.default_retry_after
+
     def chat(self, system_message: str, user_message: str):
         try:
             client = self.initialize_openai_client()
 
             model_input = self.construct_model_input(system_message, user_message)
 
-            response = client.chat.completions.create(
-                messages=model_input,
-                max_completion_tokens=self.max_tokens,
-                temperature=self.temperature,
-                model=self.model_name,
-            )
+            with track_stage("chat"), track_upstream("azure_openai"):
+                response = client.chat.completions.create(
+                    messages=model_input,
+                    max_completion_tokens=self.max_tokens,
+                    temperature=self.temperature,
+                    model=self.model_name,
+                )
 
             return response.choices[0].message.content
 
         except Exception as e:
             raise Exception(f"OpenAI API Error: {str(e)}")
+
+    async def achat(
+        self,
+        system_message: str,
+        user_message: str,
+        use_cache: bool = True,
+        max_retries=None,
+        max_tokens=None,
+    ):
+        """
+        Async version of chat that awaits the completion on the shared client
+        instead of blocking the event loop. Low-temperature responses are
+        served from the response cache unless use_cache is False.
+
+        max_tokens overrides the configured completion budget, e.g. for
+        prompts whose answer grows with their input.
+
+        The original OpenAI error is kept as the raised exception's __cause__.
+        """
+        max_tokens = max_tokens or self.max_tokens
+        try:
+            model_input = self.construct_model_input(system_message, user_message)
+            cache_key, cached_response = await self._get_cached_response(
+                model_input, use_cache, max_tokens
+            )
+            if cached_response is not CACHE_MISS:
+                return cached_response
+
+            client = self.get_async_client()
+            if max_retries is not None:
+                client = client.with_options(max_retries=max_retries)
+
+            with track_stage("chat"), track_upstream("azure_openai"):
+                response = await client.chat.completions.create(
+                    messages=model_input,
+                    max_completion_tokens=max_tokens,
+                    temperature=self.temperature,
+                    model=self.model_name,
+                )
+
+            content = response.choices[0].message.content
+            if cache_key and content is not None:
+                await self.response_cache.set(cache_key, content)
+
+            return content
+
+        except Exception as e:
+            raise Exception(f"OpenAI API Error: {str(e)}") from e
+
+    async def _achat_rate_limited(self, chat_request, max_tokens=None):
+        """
+        Run one batch item under the rate and concurrency limits, backing off
+        and retrying when Azure OpenAI answers 429
+        """
+        model_input = self.construct_model_input(
+            chat_request.system_message, chat_request.user_message
+        )
+        _, cached_response = await self._get_cached_response(
+            model_input, chat_request.use_cache, max_tokens
+        )
+        if cached_response is not CACHE_MISS:
+            return cached_response
+
+        estimated_tokens = self.estimate_tokens(model_input, max_tokens)
+
+        for attempt in range(self.rate_limit_retries + 1):
+            await self.rate_limiter.acquire(estimated_tokens)
+
+            async with self.concurrency_limiter.slot():
+                try:
+                    # Retries are handled here so the limiters see every 429
+                    response = await self.achat(
+                        chat_request.system_message,
+                        chat_request.user_message,
+                        use_cache=False,
+                        max_retries=0,
+                        max_tokens=max_tokens,
+                    )
+                except Exception as e:
+                    retry_after = self._get_retry_after(e.__cause__)
+                    if retry_after is None or attempt == self.rate_limit_retries:
+                        raise
+
+                    logger.warning(
+                        f"Azure OpenAI rate limited, retrying in {retry_after}s"
+                    )
+                    self.concurrency_limiter.on_rate_limited(retry_after)
+                    continue
+
+            self.concurrency_limiter.on_success()
+            return response
+
+    async def achat_batch(self, chat_requests, max_tokens=None):
+        """
+        Run many chat requests concurrently within the configured limits
+
+        Returns:
+            list: {"response", "error"} for each request, in input order
+        """
+        responses = await asyncio.gather(
+            *[
+                self._achat_rate_limited(chat_request, max_tokens)
+                for chat_request in chat_requests
+            ],
+            return_exceptions=True,
+        )
+
+        return [
+            {"response": None, "error": str(response)}
+            if isinstance(response, Exception)
+            else {"response": response, "error": None}
+            for response in responses
+        ]
+
+    async def achat_stream(
+        self, system_message: str, user_message: str, use_cache: bool = True
+    ):
+        """
+        Streams the completion as it is generated
+
+        Closing the generator, e.g. when the HTTP client disconnects, closes
+        the upstream response so the completion stops being generated. A
+        cached response is sent as a single token with no usage.
+
+        Yields:
+            dict: {"type": "token", "content": str} for each content delta,
+                then {"type": "usage", "usage": dict | None}
+        """
+        try:
+            model_input = self.construct_model_input(system_message, user_message)
+            cache_key, cached_response = await self._get_cached_response(
+                model_input, use_cache
+            )
+
+            if cached_response is CACHE_MISS:
+                client = self.get_async_client()
+                start = time.perf_counter()
+
+                with track_upstream("azure_openai"):
+                    stream = await client.chat.completions.create(
+                        messages=model_input,
+                        max_completion_tokens=self.max_tokens,
+                        temperature=self.temperature,
+                        model=self.model_name,
+                        stream=True,
+                        stream_options={"include_usage": True},
+                    )
+
+        except Exception as e:
+            raise Exception(f"OpenAI API Error: {str(e)}")
+
+        if cached_response is not CACHE_MISS:
+            yield {"type": "token", "content": cached_response}
+            yield {"type": "usage", "usage": None}
+            return
+
+        content = []
+        usage = None
+        async with stream:
+            try:
+                async for chunk in stream:
+                    if chunk.usage:
+                        usage = chunk.usage.model_dump(
+                            include={
+                                "prompt_tokens",
+                                "completion_tokens",
+                                "total_tokens",
+                            }
+                        )
+
+                    for choice in chunk.choices:
+                        if choice.delta and choice.delta.content:
+                            if not content:
+                                CHAT_TIME_TO_FIRST_TOKEN.observe(
+                                    time.perf_counter() - start
+                                )
+                            content.append(choice.delta.content)
+                            yield {"type": "token", "content": choice.delta.content}
+
+            except Exception as e:
+                raise Exception(f"OpenAI API Error: {str(e)}")
+
+        # Only completed streams reach here, so partial responses are not cached
+        if cache_key:
+            await self.response_cache.set(cache_key, "".join(content))
+
+        yield {"type": "usage", "usage": usage}
+
+
+# Global chat client shared by every request in the process
+openai_chat_client = None
+
+
+def get_openai_chat_client():
+    """
+    Returns the process-wide chat client, creating it if needed
+    """
+    global openai_chat_client
+    if openai_chat_client is None:
+        openai_chat_client = OpenAIChat()
+    return openai_chat_client
+
+
+async def close_openai_chat_client():
+    """
+    Closes the connection pool held by the process-wide chat client
+    """
+    global openai_chat_client
+    if openai_chat_client is not None:
+        await openai_chat_client.close()
+        openai_chat_client = None
+        logger.info("OpenAI chat client closed")
+
+
+def init_openai_chat(app: FastAPI):
+    """
+    Create the shared chat client on startup and close it on shutdown
+    """
+
+    @app.on_event("startup")
+    async def startup_openai_chat():
+        try:
+            get_openai_chat_client().get_async_client()
+            logger.info("OpenAI chat client initialized")
+        except Exception as e:
+            logger.warning(f"OpenAI chat client not initialized: {e}")
+
+    @app.on_event("shutdown")
+    async def shutdown_openai_chat():
+        await close_openai_chat_client()
@@ -0,0 +1,300 @@
+import asyncio
+import copy
+import datetime
+import logging
+import time
+import uuid
+from fastapi import FastAPI
+from app.v1.client.download_articles import get_research_articles_client
+from app.v1.db.database import get_jobs_collection
+from app.v1.schemas.download_articles import ArticleInput, ArticleResponse
+from app.v1.utils.config import load_config
+
+
+# Seconds to stop writing job state to MongoDB after a write fails
+PERSIST_RETRY_SECONDS = 60
+
+FINISHED_STATUSES = ("completed", "failed")
+
+
+class JobQueueFullError(Exception):
+    pass
+
+
+class SearchJobStore:
+    """
+    Keeps search job state in memory for this process and persists every
+    change to MongoDB, so any worker process can report on a job
+    """
+
+    def __init__(self, collection_getter=None, max_retained=1000):
+        self.collection_getter = collection_getter or get_jobs_collection
+        self.max_retained = max_retained
+        self.jobs = {}
+        self._persist_disabled_until = 0.0
+        self.logger = logging.getLogger(__name__)
+
+    async def _persist(self, func, *args):
+        if time.time() < self._persist_disabled_until:
+            return
+
+        try:
+            collection = self.collection_getter()
+            await asyncio.to_thread(getattr(collection, func), *copy.deepcopy(args))
+        except Exception as e:
+            self._persist_disabled_until = time.time() + PERSIST_RETRY_SECONDS
+            self.logger.warning(f"Failed to persist search job state: {e}")
+
+    def _evict_finished_jobs(self):
+        """Drop the oldest finished jobs from memory; MongoDB keeps them"""
+        finished = [
+            job_id
+            for job_id, job in self.jobs.items()
+            if job["status"] in FINISHED_STATUSES
+        ]
+        for job_id in finished[: max(len(self.jobs) - self.max_retained, 0)]:
+            del self.jobs[job_id]
+
+    async def create(self, article_input: ArticleInput):
+        now = datetime.datetime.utcnow()
+        job = {
+            "_id": str(uuid.uuid4()),
+            "status": "queued",
+            "stage": None,
+            "query": article_input.query,
+            "max_articles": article_input.max_articles,
+            "use_cache": article_input.use_cache,
+            "progress": {
+                "articles_found": 0,
+                "open_access": 0,
+                "downloaded": 0,
+                "failed": 0,
+            },
+            "articles": [],
+            "results": [],
+            "error": None,
+            "created_at": now,
+            "updated_at": now,
+        }
+        self.jobs[job["_id"]] = job
+        await self._persist("insert_one", job)
+        return job
+
+    async def update(self, job_id, **fields):
+        job = self.jobs[job_id]
+        fields["updated_at"] = datetime.datetime.utcnow()
+        job.update(fields)
+        await self._persist("update_one", {"_id": job_id}, {"$set": fields})
+
+        if job["status"] in FINISHED_STATUSES:
+            self._evict_finished_jobs()
+
+    async def record_article(self, job_id, index, article, error=None):
+        """Record the outcome of one article download"""
+        job = self.jobs[job_id]
+        job_article = job["articles"][index]
+        counter = "failed" if error else "downloaded"
+
+        job_article["status"] = counter
+        job_article["blob_url"] = article.get("blob_url")
+        job_article["error"] = error
+        job["progress"][counter] += 1
+        job["updated_at"] = datetime.datetime.utcnow()
+
+        update = {
+            "$set": {
+                f"articles.{index}": job_article,
+                f"progress.{counter}": job["progress"][counter],
+                "updated_at": job["updated_at"],
+            }
+        }
+        if not error:
+            result = ArticleResponse(**article).model_dump()
+            job["results"].append(result)
+            update["$push"] = {"results": result}
+
+        await self._persist("update_one", {"_id": job_id}, update)
+
+    async def get(self, job_id):
+        if job_id in self.jobs:
+            return self.jobs[job_id]
+
+        try:
+            collection = self.collection_getter()
+            return await asyncio.to_thread(collection.find_one, {"_id": job_id})
+        except Exception as e:
+            self.logger.warning(f"Failed to load search job {job_id}: {e}")
+            return None
+
+
+class SearchJobManager:
+    """
+    Runs search-and-download jobs in a bounded pool of background workers
+    """
+
+    def __init__(
+        self,
+        extract_client_factory=get_research_articles_client,
+        job_store=None,
+        jobs_config=None,
+    ):
+        if jobs_config is None:
+            jobs_config = load_config().get("jobs", {})
+
+        self.extract_client_factory = extract_client_factory
+        self.job_store = job_store or SearchJobStore(
+            max_retained=jobs_config.get("max_retained", 1000)
+        )
+        self.max_workers = jobs_config.get("max_workers", 4)
+        self.max_queued = jobs_config.get("max_queued", 100)
+        self.queue = None
+        # Queue slots held by submits that are still creating their job
+        self.reserved_slots = 0
+        self.workers = []
+        self.logger = logging.getLogger(__name__)
+
+    def start(self):
+        if self.workers:
+            return
+
+        self.queue = asyncio.Queue(maxsize=self.max_queued)
+        self.workers = [
+            asyncio.create_task(self._worker()) for _ in range(self.max_workers)
+        ]
+
+    async def stop(self):
+        """
+        Cancel the workers, and mark this process's running and queued jobs
+        failed so clients polling them after a restart get an answer
+        """
+        for worker in self.workers:
+            worker.cancel()
+        await asyncio.gather(*self.workers, return_exceptions=True)
+        self.workers = []
+
+        for job_id, job in list(self.job_store.jobs.items()):
+            if job["status"] not in FINISHED_STATUSES:
+                await self.job_store.update(
+                    job_id, status="failed", stage=None, error="interrupted"
+                )
+
+    async def submit(self, article_input: ArticleInput):
+        """
+        Queue a search-and-download job
+
+        Returns:
+            dict: The new job document
+
+        Raises:
+            JobQueueFullError: If max_queued jobs are already waiting
+        """
+        self.start()
+
+        # Take the slot before awaiting, so concurrent submits cannot fill the
+        # queue while this job is being created
+        if self.queue.qsize() + self.reserved_slots >= self.max_queued:
+            raise JobQueueFullError("Too many search jobs are queued.")
+
+        self.reserved_slots += 1
+        try:
+            job = await self.job_store.create(article_input)
+        finally:
+            self.reserved_slots -= 1
+
+        self.queue.put_nowait((job["_id"], article_input))
+        return job
+
+    async def _worker(self):
+        while True:
+            job_id, article_input = await self.queue.get()
+            try:
+                await self.run_job(job_id, article_input)
+            finally:
+                self.queue.task_done()
+
+    async def run_job(self, job_id, article_input: ArticleInput):
+        job = self.job_store.jobs[job_id]
+
+        try:
+            extract_cls = self.extract_client_factory()
+            await self.job_store.update(job_id, status="running", stage="search")
+
+            article_list = await extract_cls.get_dois_from_crossref(
+                article_input.query,
+                article_input.max_articles,
+                use_cache=article_input.use_cache,
+            )
+            job["progress"]["articles_found"] = len(article_list)
+            await self.job_store.update(
+                job_id, stage="open_access", progress=job["progress"]
+            )
+
+            open_article_list = await extract_cls.check_for_open_access(
+                article_list, use_cache=article_input.use_cache
+            )
+            job["progress"]["open_access"] = len(open_article_list)
+
+            if extract_cls.triage.enabled:
+                await self.job_store.update(
+                    job_id, stage="triage", progress=job["progress"]
+                )
+                open_article_list = await extract_cls.triage_articles(
+                    article_input.query, open_article_list
+                )
+
+            await self.job_store.update(
+                job_id,
+                stage="download",
+                progress=job["progress"],
+                articles=[
+                    {
+                        "doi": article["doi"],
+                        "title": article["title"],
+                        "status": "pending",
+                    }
+                    for article in open_article_list
+                ],
+            )
+
+            indexes = {id(article): i for i, article in enumerate(open_article_list)}
+            async for article, error in extract_cls.download_papers_as_completed(
+                open_article_list
+            ):
+                await self.job_store.record_article(
+                    job_id, indexes[id(article)], article, error
+                )
+
+            status = "completed" if job["progress"]["downloaded"] else "failed"
+            error = None if job["progress"]["downloaded"] else "No articles downloaded."
+            await self.job_store.update(job_id, status=status, stage=None, error=error)
+
+        except Exception as e:
+            self.logger.error(f"Search job {job_id} failed: {e}")
+            await self.job_store.update(
+                job_id, status="failed", stage=None, error=str(e)
+            )
+
+
+# Global job manager shared by every request in the process
+search_job_manager = None
+
+
+def get_search_job_manager():
+    """
+    Returns the process-wide search job manager, creating it if needed
+    """
+    global search_job_manager
+    if search_job_manager is None:
+        search_job_manager = SearchJobManager()
+    return search_job_manager
+
+
+def init_search_jobs(app: FastAPI):
+    """
+    Stop the background job workers on shutdown
+    """
+
+    @app.on_event("shutdown")
+    async def shutdown_search_jobs():
+        if search_job_manager is not None:
+            await search_job_manager.stop()
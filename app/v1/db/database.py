@@ -15,6 +15,8 @@ load_dotenv()
 MONGO_URI = os.getenv("MONGODB_CONNECTION_STRING", "mongodb://localhost:27017/")
 DB_NAME = os.getenv("MONGODB_DB_NAME", "ml-research-agent")
 ERROR_COLLECTION = os.getenv("MONGODB_LOG_COLLECTION", "error-collection")
+CACHE_COLLECTION_PREFIX = os.getenv("MONGODB_CACHE_COLLECTION_PREFIX", "cache-")
+JOBS_COLLECTION = os.getenv("MONGODB_JOBS_COLLECTION", "search-jobs")
 
 # Global client object to maintain connection
 mongo_client = None
@@ -63,6 +65,22 @@ def get_error_collection():
     return database[ERROR_COLLECTION]
 
 
+def get_cache_collection(name):
+    """
+    Returns a reference to the collection backing a named cache
+    """
+    database = get_database()
+    return database[f"{CACHE_COLLECTION_PREFIX}{name}"]
+
+
+def get_jobs_collection():
+    """
+    Returns a reference to the search job collection
+    """
+    database = get_database()
+    return database[JOBS_COLLECTION]
+
+
 def close_mongo_connection():
     """
     Closes the MongoDB connection
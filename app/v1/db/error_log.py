@@ -0,0 +1,191 @@
+import base64
+import datetime
+import json
+import logging
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING
+from app.v1.db.database import ERROR_COLLECTION, get_database, get_error_collection
+from app.v1.utils.config import load_config
+from app.v1.utils.utils import normalize_doi
+
+logger = logging.getLogger(__name__)
+
+# Newest first, with _id breaking ties between records logged in the same instant
+ERROR_SORT = [("timestamp", DESCENDING), ("_id", DESCENDING)]
+
+TTL_INDEX_NAME = "timestamp_ttl"
+
+
+def _set_ttl_index(database, collection, expire_after_seconds):
+    """
+    Create the TTL index, or change its expiry in place with collMod, since
+    create_index with new options fails on an existing index
+    """
+    ttl_index = collection.index_information().get(TTL_INDEX_NAME)
+
+    if ttl_index is None:
+        collection.create_index(
+            "timestamp",
+            expireAfterSeconds=expire_after_seconds,
+            name=TTL_INDEX_NAME,
+        )
+    elif ttl_index.get("expireAfterSeconds") != expire_after_seconds:
+        database.command(
+            "collMod",
+            ERROR_COLLECTION,
+            index={"name": TTL_INDEX_NAME, "expireAfterSeconds": expire_after_seconds},
+        )
+        logger.info(f"Error retention changed to {expire_after_seconds}s")
+
+
+def init_error_collection(logging_config=None, database_getter=None):
+    """
+    Set up retention and query indexes for the error collection.
+
+    Retention is either a capped collection of capped_size_bytes, which must
+    be chosen before the collection exists, or a TTL index that removes
+    records retention_days after they were logged.
+    """
+    if logging_config is None:
+        logging_config = load_config().get("logging", {})
+
+    database = (database_getter or get_database)()
+    capped_size_bytes = logging_config.get("capped_size_bytes")
+
+    if capped_size_bytes and ERROR_COLLECTION not in database.list_collection_names():
+        database.create_collection(
+            ERROR_COLLECTION, capped=True, size=capped_size_bytes
+        )
+
+    collection = database[ERROR_COLLECTION]
+
+    # Serves ERROR_SORT for unfiltered pages, so they read index order
+    # rather than sorting every match
+    collection.create_index(ERROR_SORT)
+
+    # Capped collections cannot have TTL indexes
+    if not capped_size_bytes:
+        retention_days = logging_config.get("retention_days", 30)
+        # Query indexes do not depend on retention, so they are still created
+        # if it cannot be set
+        try:
+            _set_ttl_index(database, collection, int(retention_days * 86400))
+        except Exception as e:
+            logger.warning(f"Failed to set error retention: {e}")
+
+    # Each filter index ends in ERROR_SORT, so filtered pages are in index
+    # order too
+    collection.create_index([("level", ASCENDING), *ERROR_SORT])
+    collection.create_index([("module", ASCENDING), *ERROR_SORT])
+    collection.create_index(
+        [("doi", ASCENDING), *ERROR_SORT],
+        partialFilterExpression={"doi": {"$type": "string"}},
+    )
+
+    logger.info("Error collection indexes initialized")
+
+
+def encode_cursor(document):
+    """Opaque cursor pointing just past a document in ERROR_SORT order"""
+    position = {"t": document["timestamp"].isoformat(), "id": str(document["_id"])}
+    return base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+
+
+def decode_cursor(cursor):
+    """
+    Raises:
+        ValueError: If the cursor was not produced by encode_cursor
+    """
+    try:
+        position = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return (
+            datetime.datetime.fromisoformat(position["t"]),
+            ObjectId(position["id"]),
+        )
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def build_error_filter(start=None, end=None, level=None, module=None, doi=None):
+    query = {}
+
+    if start or end:
+        query["timestamp"] = {}
+        if start:
+            query["timestamp"]["$gte"] = start
+        if end:
+            query["timestamp"]["$lt"] = end
+    if level:
+        query["level"] = level.upper()
+    if module:
+        query["module"] = module
+    if doi:
+        query["doi"] = normalize_doi(doi)
+
+    return query
+
+
+def find_errors(
+    start=None,
+    end=None,
+    level=None,
+    module=None,
+    doi=None,
+    cursor=None,
+    limit=50,
+    collection_getter=None,
+):
+    """
+    Returns one page of error records, newest first, and counts per funcName
+    for everything matching the filters.
+
+    Pages are range queries that continue after the cursor's timestamp and
+    _id, so each page costs the same however deep it is.
+
+    Returns:
+        dict: {"items", "next_cursor", "func_name_counts"}
+    """
+    collection = (collection_getter or get_error_collection)()
+    query = build_error_filter(start, end, level, module, doi)
+
+    page_query = query
+    if cursor:
+        timestamp, object_id = decode_cursor(cursor)
+        page_query = {
+            "$and": [
+                query,
+                {
+                    "$or": [
+                        {"timestamp": {"$lt": timestamp}},
+                        {"timestamp": timestamp, "_id": {"$lt": object_id}},
+                    ]
+                },
+            ]
+        }
+
+    # One extra document shows whether another page exists
+    documents = list(collection.find(page_query).sort(ERROR_SORT).limit(limit + 1))
+    next_cursor = (
+        encode_cursor(documents[limit - 1]) if len(documents) > limit else None
+    )
+
+    func_name_counts = list(
+        collection.aggregate(
+            [
+                {"$match": query},
+                {"$group": {"_id": "$funcName", "count": {"$sum": 1}}},
+                {"$sort": {"count": DESCENDING, "_id": ASCENDING}},
+            ]
+        )
+    )
+
+    return {
+        "items": [
+            {**document, "id": str(document["_id"])} for document in documents[:limit]
+        ],
+        "next_cursor": next_cursor,
+        "func_name_counts": [
+            {"func_name": count["_id"], "count": count["count"]}
+            for count in func_name_counts
+        ],
+    }
@@ -1,6 +1,7 @@
 from fastapi import FastAPI
 from app.v1.db.database import get_mongo_client, close_mongo_connection
-from app.v1.db.mongo_logger import setup_mongo_logging
+from app.v1.db.error_log import init_error_collection
+from app.v1.db.mongo_logger import close_mongo_logging, setup_mongo_logging
 import logging
 
 logger = logging.getLogger(__name__)
@@ -16,6 +17,12 @@ def init_db(app: FastAPI):
         # Initialize MongoDB connection
         get_mongo_client()
 
+        # Create retention and query indexes for logged errors
+        try:
+            init_error_collection()
+        except Exception as e:
+            logger.warning(f"Failed to initialize error collection indexes: {e}")
+
         # Setup MongoDB logging
         setup_mongo_logging()
 
@@ -23,6 +30,9 @@ def init_db(app: FastAPI):
 
     @app.on_event("shutdown")
     async def shutdown_db_client():
+        # Write out queued log records while MongoDB is still connected
+        close_mongo_logging()
+
         # Close MongoDB connection
         close_mongo_connection()
 
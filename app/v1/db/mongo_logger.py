@@ -1,26 +1,83 @@
 import logging
 import datetime
+import json
+import os
+import queue
+import re
+import sys
+import threading
+import time
+from pymongo.errors import BulkWriteError
 from app.v1.db.database import get_error_collection
+from app.v1.utils.config import load_config
+from app.v1.utils.utils import normalize_doi
+
+# DOIs embedded in log messages, e.g. "... for doi 10.1000/xyz: ..."
+DOI_PATTERN = re.compile(r"\b10\.\d{4,9}/\S+")
+
+
+def extract_doi(record):
+    """
+    Returns the normalized DOI a log record is about, taken from a doi extra
+    attribute or found in the message, or None
+    """
+    doi = getattr(record, "doi", None)
+    if doi is None:
+        match = DOI_PATTERN.search(record.getMessage())
+        doi = match.group(0).rstrip(".,:;)]}'\"") if match else None
+    return normalize_doi(doi) if doi else None
 
 
 class MongoDBHandler(logging.Handler):
     """
-    Custom logging handler that writes log records to MongoDB
+    Custom logging handler that writes log records to MongoDB.
+
+    emit only queues the record, so logging never waits on MongoDB. A
+    background thread writes queued records in batches with insert_many, and
+    falls back to a local file while MongoDB is unreachable.
     """
 
-    def __init__(self, level=logging.WARNING):
+    def __init__(
+        self, level=logging.WARNING, logging_config=None, collection_getter=None
+    ):
         super().__init__(level)
 
+        if logging_config is None:
+            logging_config = load_config().get("logging", {})
+
+        self.collection_getter = collection_getter or get_error_collection
+        self.batch_size = logging_config.get("batch_size", 100)
+        self.flush_interval = logging_config.get("flush_interval", 1.0)
+        self.flush_timeout = logging_config.get("flush_timeout", 5.0)
+        # "drop_newest" discards records that arrive while the queue is full,
+        # "drop_oldest" discards the oldest queued record to make room
+        self.overflow_policy = logging_config.get("overflow_policy", "drop_newest")
+        self.fallback_path = logging_config.get(
+            "fallback_path", "./logs/mongo-fallback.log"
+        )
+        self.retry_seconds = logging_config.get("retry_seconds", 60)
+
+        self.queue = queue.Queue(maxsize=logging_config.get("max_queued", 10000))
+        self.dropped = 0
+        self.written = 0
+        self.fallback_written = 0
+        self.failed = 0
+        self._mongo_disabled_until = 0.0
+        self._flush_requested = threading.Event()
+        self._stopping = threading.Event()
+
+        self._flusher = threading.Thread(
+            target=self._run_flusher, name="mongo-log-flusher", daemon=True
+        )
+        self._flusher.start()
+
     def emit(self, record):
         """
-        Write the log record to MongoDB
+        Queue the log record for the background flusher
         Only logs WARNING and ERROR levels
         """
         if record.levelno >= logging.WARNING:  # Only log warnings and errors
             try:
-                # Get the error collection
-                error_collection = get_error_collection()
-
                 # Create a document with only the essential fields
                 log_entry = {
                     "timestamp": datetime.datetime.utcnow(),
@@ -30,23 +87,161 @@ class MongoDBHandler(logging.Handler):
                     "funcName": record.funcName,
                     "lineno": record.lineno,
                     "pathname": record.pathname,
+                    "doi": extract_doi(record),
                 }
+            except Exception:
+                self.handleError(record)
+                return
+
+            self._enqueue(log_entry)
+
+    def _enqueue(self, log_entry):
+        try:
+            self.queue.put_nowait(log_entry)
+            return
+        except queue.Full:
+            pass
+
+        if self.overflow_policy == "drop_oldest":
+            try:
+                self.queue.get_nowait()
+                self.queue.task_done()
+                self.queue.put_nowait(log_entry)
+            except (queue.Empty, queue.Full):
+                pass
+
+        self.dropped += 1
+
+    def stats(self):
+        return {
+            "queued": self.queue.qsize(),
+            "dropped": self.dropped,
+            "written": self.written,
+            "fallback_written": self.fallback_written,
+            "failed": self.failed,
+        }
+
+    def flush(self):
+        """
+        Wait, up to flush_timeout, until every queued record has been written
+        """
+        self._flush_requested.set()
+        deadline = time.monotonic() + self.flush_timeout
+
+        while (
+            self.queue.unfinished_tasks
+            and self._flusher.is_alive()
+            and time.monotonic() < deadline
+        ):
+            time.sleep(0.01)
+
+        self._flush_requested.clear()
+
+    def close(self):
+        self._stopping.set()
+        self._flusher.join(timeout=self.flush_timeout)
+        super().close()
 
-                # Insert the document
-                error_collection.insert_one(log_entry)
+    def _run_flusher(self):
+        while True:
+            batch = self._next_batch()
+
+            if batch:
+                self._write_batch(batch)
+                for _ in batch:
+                    self.queue.task_done()
+            elif self._stopping.is_set():
+                return
+
+    def _next_batch(self):
+        """
+        Collect up to batch_size records, waiting at most flush_interval
+        unless a flush or close has been requested
+        """
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+
+        while len(batch) < self.batch_size:
+            draining = self._flush_requested.is_set() or self._stopping.is_set()
+            remaining = deadline - time.monotonic()
+
+            try:
+                if draining or remaining <= 0:
+                    batch.append(self.queue.get_nowait())
+                else:
+                    # Wake up regularly so flush and close are not delayed
+                    batch.append(self.queue.get(timeout=min(remaining, 0.05)))
+            except queue.Empty:
+                if draining or remaining <= 0:
+                    break
+
+        return batch
+
+    def _write_batch(self, batch):
+        if time.time() >= self._mongo_disabled_until:
+            try:
+                self.collection_getter().insert_many(batch, ordered=False)
+                self.written += len(batch)
+                return
+            except BulkWriteError as e:
+                # MongoDB is reachable and stored the rest of the unordered
+                # batch, so only the rejected records go to the file
+                failed_indexes = {
+                    error["index"] for error in e.details.get("writeErrors", [])
+                }
+                self.written += len(batch) - len(failed_indexes)
+                batch = [
+                    log_entry
+                    for index, log_entry in enumerate(batch)
+                    if index in failed_indexes
+                ]
+                sys.stderr.write(
+                    f"MongoDB rejected {len(batch)} log records, writing them to "
+                    f"{self.fallback_path}: {e}\n"
+                )
+                if not batch:
+                    return
             except Exception as e:
-                # Use a fallback logger in case of MongoDB connection issues
-                fallback = logging.getLogger("fallback")
-                fallback.error(f"Failed to log to MongoDB: {e}")
+                # Logging here would feed back into this handler
+                self._mongo_disabled_until = time.time() + self.retry_seconds
+                sys.stderr.write(
+                    f"Failed to log to MongoDB, writing to {self.fallback_path}: {e}\n"
+                )
+
+        self._write_to_fallback(batch)
+
+    def _write_to_fallback(self, batch):
+        try:
+            directory = os.path.dirname(self.fallback_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+            with open(self.fallback_path, "a") as file:
+                for log_entry in batch:
+                    file.write(json.dumps(log_entry, default=str) + "\n")
+
+            self.fallback_written += len(batch)
+        except Exception as e:
+            self.failed += len(batch)
+            sys.stderr.write(f"Failed to write log fallback file: {e}\n")
+
+
+# Global handler attached to the root logger by setup_mongo_logging
+mongo_handler = None
 
 
 def setup_mongo_logging():
     """
     Set up MongoDB logging for the application
     """
+    global mongo_handler
+
     # Get the root logger
     root_logger = logging.getLogger()
 
+    if mongo_handler is not None:
+        return root_logger
+
     # Create MongoDB handler
     mongo_handler = MongoDBHandler(level=logging.WARNING)
 
@@ -63,3 +258,15 @@ def setup_mongo_logging():
     root_logger.setLevel(logging.WARNING)
 
     return root_logger
+
+
+def close_mongo_logging():
+    """
+    Write out any queued log records and detach the MongoDB handler
+    """
+    global mongo_handler
+    if mongo_handler is not None:
+        logging.getLogger().removeHandler(mongo_handler)
+        mongo_handler.flush()
+        mongo_handler.close()
+        mongo_handler = None
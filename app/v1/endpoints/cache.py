@@ -0,0 +1,9 @@
+from fastapi import APIRouter
+from app.v1.utils.cache import get_cache_stats
+
+router = APIRouter()
+
+
+@router.get("/cache/stats/", tags=["cache"])
+async def cache_stats():
+    return get_cache_stats()
@@ -1,19 +1,47 @@
-from fastapi import APIRouter, HTTPException
-from app.v1.schemas.download_articles import ArticleInput, ArticleResponse
-from app.v1.client.download_articles import ExtractResearchArticles
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from app.v1.schemas.download_articles import (
+    ArticleInput,
+    ArticleResponse,
+    BatchArticleInput,
+    BatchQueryResult,
+)
+from app.v1.client.download_articles import (
+    ExtractResearchArticles,
+    get_research_articles_client,
+)
+from app.v1.utils.streaming import (
+    NDJSON_MEDIA_TYPE,
+    SSE_MEDIA_TYPE,
+    STREAMING_HEADERS,
+    format_ndjson,
+    format_sse,
+)
+from typing import List, Literal
 
 router = APIRouter()
 
 
+def get_extract_client() -> ExtractResearchArticles:
+    try:
+        return get_research_articles_client()
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error searching and downloading articles: {str(e)}",
+        )
+
+
 @router.post(
     "/search_download_articles/",
     tags=["search_download_articles"],
     response_model=List[ArticleResponse],
 )
-async def retrieve_articles(request: ArticleInput) -> List[ArticleResponse]:
+async def retrieve_articles(
+    request: ArticleInput,
+    extract_cls: ExtractResearchArticles = Depends(get_extract_client),
+) -> List[ArticleResponse]:
     try:
-        extract_cls = ExtractResearchArticles()
         results = await extract_cls.search_and_download_open_papers(request)
 
         return results
@@ -22,3 +50,46 @@ async def retrieve_articles(request: ArticleInput) -> List[ArticleResponse]:
             status_code=500,
             detail=f"Error searching and downloading articles: {str(e)}",
         )
+
+
+@router.post(
+    "/search_download_articles/batch/",
+    tags=["search_download_articles"],
+    response_model=List[BatchQueryResult],
+)
+async def retrieve_articles_batch(
+    request: BatchArticleInput,
+    extract_cls: ExtractResearchArticles = Depends(get_extract_client),
+) -> List[BatchQueryResult]:
+    try:
+        return await extract_cls.search_and_download_batch(request.queries)
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error searching and downloading articles: {str(e)}",
+        )
+
+
+@router.post("/search_download_articles/stream/", tags=["search_download_articles"])
+async def stream_articles(
+    request: ArticleInput,
+    format: Literal["ndjson", "sse"] = "ndjson",
+    extract_cls: ExtractResearchArticles = Depends(get_extract_client),
+):
+    """
+    Streams each article as soon as it is stored, in completion order, and
+    ends with a summary record listing failures
+    """
+
+    async def records():
+        async for record in extract_cls.stream_open_papers(request):
+            if format == "sse":
+                yield format_sse(record, event=record["type"])
+            else:
+                yield format_ndjson(record)
+
+    media_type = SSE_MEDIA_TYPE if format == "sse" else NDJSON_MEDIA_TYPE
+
+    return StreamingResponse(
+        records(), media_type=media_type, headers=STREAMING_HEADERS
+    )
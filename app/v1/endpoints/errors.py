@@ -0,0 +1,39 @@
+import asyncio
+from datetime import datetime
+from fastapi import APIRouter, HTTPException, Query
+from app.v1.db.error_log import find_errors
+from app.v1.schemas.errors import ErrorLogPage
+from typing import Optional
+
+router = APIRouter()
+
+
+@router.get("/errors/", tags=["errors"], response_model=ErrorLogPage)
+async def list_errors(
+    start: Optional[datetime] = Query(None, description="Earliest timestamp (UTC)"),
+    end: Optional[datetime] = Query(None, description="Latest timestamp, exclusive"),
+    level: Optional[str] = Query(None, description="e.g. WARNING or ERROR"),
+    module: Optional[str] = None,
+    doi: Optional[str] = None,
+    cursor: Optional[str] = Query(None, description="next_cursor of the last page"),
+    limit: int = Query(50, ge=1, le=500),
+):
+    """
+    Pages through logged warnings and errors, newest first, with counts per
+    funcName for all records matching the filters
+    """
+    try:
+        return await asyncio.to_thread(
+            find_errors,
+            start=start,
+            end=end,
+            level=level,
+            module=module,
+            doi=doi,
+            cursor=cursor,
+            limit=limit,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error querying errors: {str(e)}")
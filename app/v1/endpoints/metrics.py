@@ -0,0 +1,10 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from app.v1.utils.metrics import PROMETHEUS_MEDIA_TYPE, registry
+
+router = APIRouter()
+
+
+@router.get("/metrics", tags=["metrics"], response_class=PlainTextResponse)
+async def metrics():
+    return PlainTextResponse(registry.render(), media_type=PROMETHEUS_MEDIA_TYPE)
@@ -1,15 +1,80 @@
-from fastapi import APIRouter, HTTPException
-from app.v1.client.openai_chat import OpenAIChat
-from app.v1.schemas.openai_chat import ChatRequest, ChatResponse
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from app.v1.client.openai_chat import OpenAIChat, get_openai_chat_client
+from app.v1.schemas.openai_chat import (
+    BatchChatRequest,
+    BatchChatResult,
+    ChatRequest,
+    ChatResponse,
+    ChatStreamDone,
+)
+from app.v1.utils.streaming import SSE_MEDIA_TYPE, STREAMING_HEADERS, format_sse
+from typing import List
 
 router = APIRouter()
 
 
+def get_chat_client() -> OpenAIChat:
+    try:
+        return get_openai_chat_client()
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Error processing chat request: {str(e)}"
+        )
+
+
+async def chat_events(first_record, records):
+    """
+    Formats streamed chat records as server-sent events: one token event per
+    content delta, then a done event shaped like ChatResponse plus usage
+    """
+    content = []
+
+    try:
+        record = first_record
+        while record["type"] == "token":
+            content.append(record["content"])
+            yield format_sse({"content": record["content"]}, event="token")
+            record = await anext(records)
+
+        done = ChatStreamDone(response="".join(content), usage=record["usage"])
+        yield format_sse(done.model_dump(), event="done")
+
+    except Exception as e:
+        yield format_sse(
+            {"detail": f"Error processing chat request: {str(e)}"}, event="error"
+        )
+
+    finally:
+        # Runs on client disconnect too, which closes the upstream call
+        await records.aclose()
+
+
 @router.post("/chat/", tags=["chat"], response_model=ChatResponse)
-async def post_chat(request: ChatRequest):
+async def post_chat(
+    request: ChatRequest, chat_cls: OpenAIChat = Depends(get_chat_client)
+):
     try:
-        chat_cls = OpenAIChat()
-        chat_response = chat_cls.chat(request.system_message, request.user_message)
+        if request.stream:
+            records = chat_cls.achat_stream(
+                request.system_message,
+                request.user_message,
+                use_cache=request.use_cache,
+            )
+            # Wait for the first token so upstream errors still return a 500
+            first_record = await anext(records)
+
+            return StreamingResponse(
+                chat_events(first_record, records),
+                media_type=SSE_MEDIA_TYPE,
+                headers=STREAMING_HEADERS,
+            )
+
+        chat_response = await chat_cls.achat(
+            request.system_message,
+            request.user_message,
+            use_cache=request.use_cache,
+        )
 
         return {"response": chat_response}
 
@@ -17,3 +82,18 @@ async def post_chat(request: ChatRequest):
         raise HTTPException(
             status_code=500, detail=f"Error processing chat request: {str(e)}"
         )
+
+
+@router.post("/chat/batch/", tags=["chat"], response_model=List[BatchChatResult])
+async def post_chat_batch(
+    request: BatchChatRequest, chat_cls: OpenAIChat = Depends(get_chat_client)
+) -> List[BatchChatResult]:
+    try:
+        results = await chat_cls.achat_batch(request.requests)
+
+        return [BatchChatResult(**result) for result in results]
+
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Error processing chat request: {str(e)}"
+        )
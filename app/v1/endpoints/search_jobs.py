@@ -0,0 +1,55 @@
+from fastapi import APIRouter, HTTPException
+from app.v1.client.search_jobs import JobQueueFullError, get_search_job_manager
+from app.v1.schemas.download_articles import ArticleInput, ArticleResponse
+from app.v1.schemas.search_jobs import JobStatusResponse, JobSubmitResponse
+from typing import List
+
+router = APIRouter()
+
+
+async def _get_job(job_id: str):
+    job = await get_search_job_manager().job_store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Search job {job_id} not found")
+    return job
+
+
+@router.post(
+    "/search_download_jobs/",
+    tags=["search_download_jobs"],
+    response_model=JobSubmitResponse,
+    status_code=202,
+)
+async def submit_search_job(request: ArticleInput):
+    try:
+        job = await get_search_job_manager().submit(request)
+
+        return {"job_id": job["_id"], "status": job["status"]}
+    except JobQueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Error submitting search job: {str(e)}"
+        )
+
+
+@router.get(
+    "/search_download_jobs/{job_id}",
+    tags=["search_download_jobs"],
+    response_model=JobStatusResponse,
+)
+async def get_search_job(job_id: str):
+    job = await _get_job(job_id)
+
+    return {"job_id": job["_id"], **job}
+
+
+@router.get(
+    "/search_download_jobs/{job_id}/results",
+    tags=["search_download_jobs"],
+    response_model=List[ArticleResponse],
+)
+async def get_search_job_results(job_id: str) -> List[ArticleResponse]:
+    job = await _get_job(job_id)
+
+    return job["results"]
@@ -0,0 +1,39 @@
+import asyncio
+import time
+from fastapi import APIRouter, HTTPException
+from app.v1.schemas.search_local import LocalSearchInput, LocalSearchResponse
+from app.v1.utils.metrics import track_stage
+from app.v1.utils.search_index import get_search_index
+
+router = APIRouter()
+
+
+@router.post(
+    "/search_local/", tags=["search_local"], response_model=LocalSearchResponse
+)
+async def search_local(request: LocalSearchInput) -> LocalSearchResponse:
+    """
+    Ranks articles that are already stored, without calling Crossref or any
+    other external service
+    """
+    search_index = get_search_index()
+    if search_index is None:
+        raise HTTPException(status_code=503, detail="Local search is disabled")
+
+    try:
+        start = time.perf_counter()
+        with track_stage("search_local"):
+            results = await asyncio.to_thread(
+                search_index.search, request.query, request.limit
+            )
+
+        return LocalSearchResponse(
+            query=request.query,
+            total_documents=search_index.stats()["documents"],
+            took_ms=(time.perf_counter() - start) * 1000,
+            results=results,
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Error searching local articles: {str(e)}"
+        )
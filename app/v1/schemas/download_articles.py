@@ -1,12 +1,14 @@
 from pydantic import BaseModel, Field
-from app.v1.utils.constants import CROSSREF_FILTER
+from app.v1.utils.constants import CROSSREF_FILTER, CROSSREF_SELECT
 from typing import List, Optional
 
 
 class CrossRefParams(BaseModel):
     query: str
     filter: str = Field(default=CROSSREF_FILTER)
+    select: str = Field(default=CROSSREF_SELECT)
     rows: int = 10
+    cursor: Optional[str] = None
 
 
 class ArticleInput(BaseModel):
@@ -14,6 +16,10 @@ class ArticleInput(BaseModel):
     max_articles: int = Field(
         default=10, description="Maximum number of articles retrieved"
     )
+    use_cache: bool = Field(
+        default=True,
+        description="Serve Crossref and Unpaywall metadata from the cache when available",
+    )
 
 
 class ArticleResponse(BaseModel):
@@ -26,7 +32,38 @@ class ArticleResponse(BaseModel):
 
     # Optional fields that might be added later
     file_name: Optional[str] = None
+    blob_url: Optional[str] = None
+    chunks_blob_url: Optional[str] = None
+    chunk_count: Optional[int] = None
+    duplicate_dois: Optional[List[str]] = None
+    relevance_score: Optional[float] = None
 
     class Config:
         populate_by_name = True
         arbitrary_types_allowed = True
+
+
+class ArticleFailure(BaseModel):
+    doi: Optional[str] = Field(None, description="None when the whole search failed")
+    error: str
+
+
+class ArticleStreamSummary(BaseModel):
+    type: str = "summary"
+    articles_found: int
+    open_access: int
+    not_relevant: int = 0
+    downloaded: int
+    failures: List[ArticleFailure]
+
+
+class BatchArticleInput(BaseModel):
+    queries: List[ArticleInput] = Field(
+        description="Queries searched together, sharing open-access checks and downloads"
+    )
+
+
+class BatchQueryResult(BaseModel):
+    query: str
+    articles: List[ArticleResponse]
+    error: Optional[str] = None
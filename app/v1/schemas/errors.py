@@ -0,0 +1,26 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import List, Optional
+
+
+class ErrorLogEntry(BaseModel):
+    id: str
+    timestamp: datetime
+    level: str
+    message: str
+    module: Optional[str] = None
+    funcName: Optional[str] = None
+    lineno: Optional[int] = None
+    pathname: Optional[str] = None
+    doi: Optional[str] = None
+
+
+class FuncNameCount(BaseModel):
+    func_name: Optional[str] = None
+    count: int
+
+
+class ErrorLogPage(BaseModel):
+    items: List[ErrorLogEntry]
+    next_cursor: Optional[str] = None
+    func_name_counts: List[FuncNameCount]
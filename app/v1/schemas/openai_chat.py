@@ -1,14 +1,46 @@
 from pydantic import BaseModel, Field
 import uuid
 from datetime import datetime
+from typing import List, Optional
 
 
 class ChatRequest(BaseModel):
     system_message: str
     user_message: str
+    # Stream tokens as server-sent events instead of one JSON response
+    stream: bool = False
+    use_cache: bool = Field(
+        default=True,
+        description="Serve identical low-temperature prompts from the response cache",
+    )
 
 
 class ChatResponse(BaseModel):
     request_id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     timestamp: datetime = Field(default_factory=datetime.utcnow)
     response: str
+
+
+class ChatUsage(BaseModel):
+    prompt_tokens: int
+    completion_tokens: int
+    total_tokens: int
+
+
+class ChatStreamDone(ChatResponse):
+    """Final event of a streamed chat, carrying the full response and usage"""
+
+    usage: Optional[ChatUsage] = None
+
+
+class BatchChatRequest(BaseModel):
+    requests: List[ChatRequest] = Field(
+        description="Prompts answered concurrently; stream is ignored"
+    )
+
+
+class BatchChatResult(BaseModel):
+    request_id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    timestamp: datetime = Field(default_factory=datetime.utcnow)
+    response: Optional[str] = None
+    error: Optional[str] = None
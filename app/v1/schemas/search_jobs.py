@@ -0,0 +1,38 @@
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import List, Optional
+
+
+class JobArticleStatus(BaseModel):
+    doi: str
+    title: List[str] = Field(default_factory=list)
+    status: str = Field(description="pending, downloaded or failed")
+    blob_url: Optional[str] = None
+    error: Optional[str] = None
+
+
+class JobProgress(BaseModel):
+    articles_found: int = 0
+    open_access: int = 0
+    downloaded: int = 0
+    failed: int = 0
+
+
+class JobSubmitResponse(BaseModel):
+    job_id: str
+    status: str
+
+
+class JobStatusResponse(BaseModel):
+    job_id: str
+    status: str = Field(description="queued, running, completed or failed")
+    stage: Optional[str] = Field(
+        None, description="search, open_access, triage or download while running"
+    )
+    query: str
+    max_articles: int
+    progress: JobProgress
+    articles: List[JobArticleStatus] = Field(default_factory=list)
+    error: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
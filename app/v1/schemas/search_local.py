@@ -0,0 +1,25 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional
+
+
+class LocalSearchInput(BaseModel):
+    query: str = Field(description="Words to rank stored articles against")
+    limit: int = Field(default=10, ge=1, le=100, description="Articles returned")
+
+
+class LocalSearchResult(BaseModel):
+    doi: str
+    title: List[str] = Field(default_factory=list)
+    year_published: Optional[int] = None
+    url: Optional[str] = None
+    blob_url: Optional[str] = None
+    chunks_blob_url: Optional[str] = None
+    has_text: bool = Field(description="Whether the paper's full text was indexed")
+    score: float = Field(description="BM25 relevance to the query")
+
+
+class LocalSearchResponse(BaseModel):
+    query: str
+    total_documents: int
+    took_ms: float
+    results: List[LocalSearchResult]
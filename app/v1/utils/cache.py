@@ -0,0 +1,198 @@
+import asyncio
+import copy
+import datetime
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+import pymongo
+from app.v1.db.database import get_cache_collection
+from app.v1.utils.config import load_config
+
+logger = logging.getLogger(__name__)
+
+# Returned by TwoTierCache.get when a key is absent, since None and False are
+# valid cached values
+CACHE_MISS = object()
+
+# Seconds to stop using the persistent tier after it fails
+PERSISTENT_RETRY_SECONDS = 60
+
+# Seconds a persistent read or write, including server selection, may take
+# before the lookup is treated as a miss
+PERSISTENT_TIMEOUT_SECONDS = 1.0
+
+
+class TwoTierCache:
+    """
+    In-process LRU cache in front of a persistent MongoDB collection.
+    Entries expire after ttl_seconds in both tiers.
+    """
+
+    def __init__(
+        self,
+        name,
+        ttl_seconds,
+        max_entries=1024,
+        persistent=True,
+        collection_getter=None,
+        timeout_seconds=PERSISTENT_TIMEOUT_SECONDS,
+    ):
+        self.name = name
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.persistent = persistent
+        self.timeout_seconds = timeout_seconds
+        self.collection_getter = collection_getter or (
+            lambda: get_cache_collection(name)
+        )
+
+        self._entries = OrderedDict()
+        self._index_ready = False
+        self._persistent_disabled_until = 0.0
+        self.hits = 0
+        self.misses = 0
+        self.persistent_hits = 0
+        self.persistent_errors = 0
+
+    @staticmethod
+    def make_key(*parts):
+        """Build a stable cache key from JSON-serializable parts"""
+        raw_key = json.dumps(parts, sort_keys=True, default=str)
+        return hashlib.sha256(raw_key.encode("utf-8")).hexdigest()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "persistent_hits": self.persistent_hits,
+            "persistent_errors": self.persistent_errors,
+            "memory_entries": len(self._entries),
+        }
+
+    async def get(self, key):
+        """
+        Look a key up in memory, then in the persistent tier
+
+        Returns:
+            A copy of the cached value, or CACHE_MISS
+        """
+        value = self._get_from_memory(key)
+
+        if value is CACHE_MISS and self._persistent_available():
+            value = await self._run_persistent(self._get_from_persistent, key)
+            if value is not CACHE_MISS:
+                self.persistent_hits += 1
+                self._set_in_memory(key, value)
+
+        if value is CACHE_MISS:
+            self.misses += 1
+            return CACHE_MISS
+
+        self.hits += 1
+        return copy.deepcopy(value)
+
+    async def set(self, key, value):
+        self._set_in_memory(key, copy.deepcopy(value))
+
+        if self._persistent_available():
+            await self._run_persistent(self._set_in_persistent, key, value)
+
+    def clear(self):
+        self._entries.clear()
+
+    def _get_from_memory(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return CACHE_MISS
+
+        expires_at, value = entry
+        if expires_at <= time.time():
+            del self._entries[key]
+            return CACHE_MISS
+
+        self._entries.move_to_end(key)
+        return value
+
+    def _set_in_memory(self, key, value):
+        self._entries[key] = (time.time() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _persistent_available(self):
+        return self.persistent and time.time() >= self._persistent_disabled_until
+
+    async def _run_persistent(self, func, *args):
+        try:
+            return await asyncio.to_thread(self._with_timeout, func, *args)
+        except Exception as e:
+            self.persistent_errors += 1
+            self._persistent_disabled_until = time.time() + PERSISTENT_RETRY_SECONDS
+            logger.warning(f"Persistent cache '{self.name}' unavailable: {e}")
+            return CACHE_MISS
+
+    def _with_timeout(self, func, *args):
+        # The shared client waits up to 30s for a server; a cache must not
+        with pymongo.timeout(self.timeout_seconds):
+            return func(*args)
+
+    def _get_collection(self):
+        collection = self.collection_getter()
+        if not self._index_ready:
+            # Let MongoDB remove expired entries on its own
+            collection.create_index("expires_at", expireAfterSeconds=0)
+            self._index_ready = True
+        return collection
+
+    def _get_from_persistent(self, key):
+        document = self._get_collection().find_one(
+            {"_id": key, "expires_at": {"$gt": datetime.datetime.utcnow()}}
+        )
+        if document is None:
+            return CACHE_MISS
+        return document["value"]
+
+    def _set_in_persistent(self, key, value):
+        expires_at = datetime.datetime.utcnow() + datetime.timedelta(
+            seconds=self.ttl_seconds
+        )
+        self._get_collection().replace_one(
+            {"_id": key},
+            {"_id": key, "value": value, "expires_at": expires_at},
+            upsert=True,
+        )
+
+
+# Global cache objects, one per kind of cached data
+caches = {}
+
+
+def get_cache(name):
+    """
+    Returns the process-wide cache for a kind of data, creating it if needed
+    """
+    if name not in caches:
+        cache_config = load_config().get("cache", {})
+        settings = cache_config.get(name, {})
+        caches[name] = TwoTierCache(
+            name,
+            ttl_seconds=settings.get("ttl_seconds", 3600),
+            max_entries=settings.get("max_entries", 1024),
+            persistent=cache_config.get("persistent", True),
+            timeout_seconds=cache_config.get(
+                "timeout_seconds", PERSISTENT_TIMEOUT_SECONDS
+            ),
+        )
+    return caches[name]
+
+
+def get_cache_stats():
+    """
+    Returns hit/miss counters for every cache created in this process
+    """
+    return {name: cache.stats() for name, cache in caches.items()}
@@ -0,0 +1,12 @@
+import os
+from functools import lru_cache
+import yaml
+
+CONFIG_PATH = os.path.join("./app/config", "config.yaml")
+
+
+@lru_cache(maxsize=1)
+def load_config():
+    """Load config.yaml once per process and return the parsed dict"""
+    with open(CONFIG_PATH, "r") as file:
+        return yaml.safe_load(file)
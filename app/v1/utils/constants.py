@@ -1,2 +1,17 @@
 CROSSREF_FILTER = "has-abstract:true,has-full-text:true"
+# Only the fields extract_article_info reads, instead of full work records
+CROSSREF_SELECT = "DOI,title,author,published,URL,abstract"
 USER_AGENT_TEMPLATE = "ResearchAgent/1.0 (mailto:{email})"
+CROSSREF_MAX_ROWS = 1000
+# arXiv, bioRxiv/medRxiv, Research Square, SSRN, Preprints.org, OSF,
+# TechRxiv and Authorea; the published version of a paper is preferred
+PREPRINT_DOI_PREFIXES = (
+    "10.48550/",
+    "10.1101/",
+    "10.21203/",
+    "10.2139/",
+    "10.20944/",
+    "10.31219/",
+    "10.36227/",
+    "10.22541/",
+)
@@ -0,0 +1,147 @@
+import codecs
+import json
+
+
+class CrossrefItemsParser:
+    """
+    Incremental parser for Crossref works responses.
+
+    Each entry of message.items is decoded as soon as its bytes arrive, so
+    the full body is never held in memory at once. The rest of the envelope,
+    e.g. next-cursor, is small and is parsed by close().
+    """
+
+    # Depth of the items array's key: inside the top-level object and message
+    ITEMS_DEPTH = 2
+
+    def __init__(self):
+        self._text_decoder = codecs.getincrementaldecoder("utf-8")()
+        self._json_decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._state = "envelope"
+        self._prefix = []
+        self._suffix = []
+
+        # Scanner state for the envelope before the items array
+        self._scan_position = 0
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._string_start = None
+        self._last_string = None
+        self._awaiting_array = False
+
+    def feed(self, chunk):
+        """
+        Add a chunk of the response body
+
+        Args:
+            chunk (bytes): Next chunk of the body
+
+        Returns:
+            list: Items completed by this chunk
+        """
+        self._buffer += self._text_decoder.decode(chunk)
+        return self._parse()
+
+    def close(self):
+        """
+        Finish parsing once the body has been fully read
+
+        Returns:
+            dict: The message object, without its items
+
+        Raises:
+            ValueError: If the body was truncated or is not a works list
+        """
+        self._buffer += self._text_decoder.decode(b"", final=True)
+        self._parse()
+
+        if self._state != "done":
+            raise ValueError("Crossref response ended before message.items closed")
+
+        self._suffix.append(self._buffer)
+        envelope = json.loads("".join(self._prefix) + "[]" + "".join(self._suffix))
+        return envelope["message"]
+
+    def _parse(self):
+        if self._state == "envelope":
+            self._scan_envelope()
+
+        items = []
+        if self._state == "items":
+            items = self._parse_items()
+
+        return items
+
+    def _scan_envelope(self):
+        """Find the start of the message.items array, tracking JSON strings"""
+        buffer = self._buffer
+
+        for position in range(self._scan_position, len(buffer)):
+            char = buffer[position]
+
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                    self._last_string = buffer[self._string_start : position]
+                continue
+
+            if char == '"':
+                self._in_string = True
+                self._string_start = position + 1
+            elif char == ":":
+                self._awaiting_array = (
+                    self._depth == self.ITEMS_DEPTH and self._last_string == "items"
+                )
+            elif char == "[" and self._awaiting_array:
+                self._prefix.append(buffer[:position])
+                self._buffer = buffer[position + 1 :]
+                self._state = "items"
+                return
+            elif char in "{[":
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+
+            if not char.isspace() and char != ":":
+                self._awaiting_array = False
+
+        self._scan_position = len(buffer)
+
+    def _parse_items(self):
+        items = []
+        position = 0
+        buffer = self._buffer
+
+        while True:
+            while position < len(buffer) and buffer[position] in " \t\r\n,":
+                position += 1
+
+            if position >= len(buffer):
+                break
+
+            if buffer[position] == "]":
+                self._state = "done"
+                position += 1
+                break
+
+            try:
+                item, position = self._json_decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                # The rest of this item has not arrived yet
+                break
+
+            items.append(item)
+
+        self._buffer = buffer[position:]
+
+        if self._state == "done":
+            self._suffix.append(self._buffer)
+            self._buffer = ""
+
+        return items
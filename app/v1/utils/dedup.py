@@ -0,0 +1,455 @@
+"""
+Near-duplicate detection for search results, e.g. the preprint, journal and
+conference versions of one paper, using MinHash signatures and LSH banding.
+
+Each article's normalized title and abstract are cut into character
+shingles, and a signature keeps the minimum of num_perm multiply-shift hashes
+over them. Signatures are split into bands; articles sharing any band are
+candidates, and candidates whose signatures agree on at least threshold of
+their positions (the estimated Jaccard similarity) are duplicates.
+
+Signatures of stored articles are appended to files, so a later search can
+resolve a new copy of a paper to the version already stored.
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+import zlib
+import numpy as np
+from fastapi import FastAPI
+from app.v1.utils.config import load_config
+from app.v1.utils.constants import PREPRINT_DOI_PREFIXES
+from app.v1.utils.utils import file_lock, normalize_doi
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DEDUP_SETTINGS = {
+    "enabled": True,
+    # None keeps signatures in JOURNAL_ARTICLE_DIRECTORY/dedup
+    "path": None,
+    "num_perm": 128,
+    "bands": 16,
+    "shingle_size": 5,
+    "threshold": 0.8,
+    # Shorter titles and abstracts say too little to match on
+    "min_characters": 100,
+}
+
+SIGNATURES_FILE = "signatures.bin"
+ARTICLES_FILE = "articles.jsonl"
+# Held around every write to the two files, whose rows must stay aligned
+# across worker processes
+LOCK_FILE = "dedup.lock"
+# Fields of a stored article kept to stand in for later copies of it
+STORED_FIELDS = ("doi", "title", "author", "year_published", "url", "abstract")
+
+MARKUP_PATTERN = re.compile(r"<[^>]+>")
+NON_WORD_PATTERN = re.compile(r"[\W_]+")
+
+
+def normalize_text(text):
+    """Lowercase words without markup or punctuation, separated by one space"""
+    text = MARKUP_PATTERN.sub(" ", text or "").lower()
+    return NON_WORD_PATTERN.sub(" ", text).strip()
+
+
+def article_text(article):
+    title = article.get("title") or []
+    if isinstance(title, str):
+        title = [title]
+    return normalize_text(" ".join([*title, article.get("abstract") or ""]))
+
+
+def is_preprint(doi):
+    return normalize_doi(doi).startswith(PREPRINT_DOI_PREFIXES)
+
+
+class MinHasher:
+    """Computes MinHash signatures with all permutations hashed at once"""
+
+    def __init__(self, num_perm=128, shingle_size=5, seed=1):
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        rng = np.random.default_rng(seed)
+        # Odd multipliers make (a * x + b) >> 32 a universal hash of 32-bit x
+        self.a = rng.integers(0, 2**63, num_perm, dtype=np.uint64) * 2 + 1
+        self.b = rng.integers(0, 2**63, num_perm, dtype=np.uint64)
+
+    def shingle_hashes(self, text):
+        size = self.shingle_size
+        shingles = {text[i : i + size] for i in range(max(1, len(text) - size + 1))}
+        return np.fromiter(
+            (zlib.crc32(shingle.encode()) for shingle in shingles),
+            dtype=np.uint64,
+            count=len(shingles),
+        )
+
+    def signature(self, text):
+        hashes = self.shingle_hashes(text)
+        # uint64 arithmetic wraps, which is the modulus the hash family needs
+        permuted = (self.a[:, None] * hashes[None, :] + self.b[:, None]) >> np.uint64(
+            32
+        )
+        return permuted.min(axis=1).astype(np.uint32)
+
+    def signatures(self, texts):
+        """
+        Returns:
+            np.ndarray: (len(texts), num_perm) uint32 signatures
+        """
+        signatures = np.empty((len(texts), self.num_perm), dtype=np.uint32)
+        for row, text in enumerate(texts):
+            signatures[row] = self.signature(text)
+        return signatures
+
+
+class LSHIndex:
+    """Buckets signatures by band, so candidates are found without comparing all pairs"""
+
+    def __init__(self, num_perm=128, bands=16, seed=1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.bands = bands
+        self.rows = num_perm // bands
+        rng = np.random.default_rng(seed)
+        self.multipliers = rng.integers(0, 2**63, self.rows, dtype=np.uint64) * 2 + 1
+        self.buckets = {}
+
+    def band_keys(self, signatures):
+        """
+        Returns:
+            np.ndarray: (len(signatures), bands) hashes of each band
+        """
+        bands = signatures.reshape(len(signatures), self.bands, self.rows)
+        return (bands.astype(np.uint64) * self.multipliers).sum(axis=2)
+
+    def add(self, item, keys):
+        for band, key in enumerate(keys.tolist()):
+            self.buckets.setdefault((band, key), []).append(item)
+
+    def candidates(self, keys):
+        found = set()
+        for band, key in enumerate(keys.tolist()):
+            found.update(self.buckets.get((band, key), ()))
+        return found
+
+
+class _UnionFind:
+    def __init__(self, size):
+        self.parents = list(range(size))
+
+    def find(self, item):
+        while self.parents[item] != item:
+            self.parents[item] = self.parents[self.parents[item]]
+            item = self.parents[item]
+        return item
+
+    def union(self, first, second):
+        first, second = self.find(first), self.find(second)
+        if first != second:
+            self.parents[max(first, second)] = min(first, second)
+
+
+class Deduplicator:
+    """
+    Holds the signatures of stored articles. Methods are thread-safe and
+    blocking, so async callers run them with asyncio.to_thread. Several
+    worker processes may share a directory; each sees the others' articles
+    the next time it loads.
+    """
+
+    def __init__(
+        self,
+        directory,
+        num_perm=128,
+        bands=16,
+        shingle_size=5,
+        threshold=0.8,
+        min_characters=100,
+    ):
+        self.directory = directory
+        self.num_perm = num_perm
+        self.bands = bands
+        self.threshold = threshold
+        self.min_characters = min_characters
+        self.hasher = MinHasher(num_perm, shingle_size)
+        self._lock = threading.Lock()
+        with self._file_lock():
+            self._load()
+
+    def _file_lock(self):
+        return file_lock(os.path.join(self.directory, LOCK_FILE))
+
+    def _load(self):
+        self.stored_articles = []
+        articles_path = os.path.join(self.directory, ARTICLES_FILE)
+        if os.path.exists(articles_path):
+            with open(articles_path) as file:
+                for line in file:
+                    try:
+                        self.stored_articles.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        # The last line of a crashed write
+                        break
+
+        signatures_path = os.path.join(self.directory, SIGNATURES_FILE)
+        signatures = np.zeros((0, self.num_perm), dtype=np.uint32)
+        if os.path.exists(signatures_path):
+            signatures = np.fromfile(signatures_path, dtype=np.uint32)
+            signatures = signatures[: len(signatures) // self.num_perm * self.num_perm]
+            signatures = signatures.reshape(-1, self.num_perm)
+
+        # A crash between the two appends leaves one file a row ahead, which
+        # is cut off so later appends stay aligned
+        count = min(len(self.stored_articles), len(signatures))
+        if count < len(self.stored_articles) or count < len(signatures):
+            self.stored_articles = self.stored_articles[:count]
+            signatures = signatures[:count]
+            self._rewrite(self.stored_articles, signatures)
+        self.stored_signatures = signatures
+        self.stored_dois = {article["doi"] for article in self.stored_articles}
+
+        self.stored_index = LSHIndex(self.num_perm, self.bands)
+        for row, keys in enumerate(self.stored_index.band_keys(self.stored_signatures)):
+            self.stored_index.add(row, keys)
+
+    def _rewrite(self, articles, signatures):
+        with open(os.path.join(self.directory, SIGNATURES_FILE), "wb") as file:
+            file.write(signatures.tobytes())
+        with open(os.path.join(self.directory, ARTICLES_FILE), "w") as file:
+            for article in articles:
+                file.write(json.dumps(article) + "\n")
+
+    def similarity(self, first, second):
+        """Estimated Jaccard similarity of two signatures"""
+        return float(np.count_nonzero(first == second)) / self.num_perm
+
+    def remember(self, articles):
+        """
+        Keep the signatures of stored articles, so later copies of them are
+        resolved to the stored version
+
+        Returns:
+            int: Articles that were not already known
+        """
+        with self._lock:
+            new_articles = []
+            texts = []
+            for article in articles:
+                doi = normalize_doi(article["doi"])
+                text = article_text(article)
+                if doi not in self.stored_dois and len(text) >= self.min_characters:
+                    self.stored_dois.add(doi)
+                    new_articles.append(
+                        {
+                            **{field: article.get(field) for field in STORED_FIELDS},
+                            "doi": doi,
+                        }
+                    )
+                    texts.append(text)
+            if not new_articles:
+                return 0
+
+            signatures = self.hasher.signatures(texts)
+
+            # Other workers append to the same files, so both appends happen
+            # under the file lock to keep row N of each file the same article
+            with self._file_lock():
+                with open(os.path.join(self.directory, SIGNATURES_FILE), "ab") as file:
+                    file.write(signatures.tobytes())
+                with open(os.path.join(self.directory, ARTICLES_FILE), "a") as file:
+                    file.write(
+                        "".join(json.dumps(article) + "\n" for article in new_articles)
+                    )
+
+            first_row = len(self.stored_articles)
+            self.stored_articles.extend(new_articles)
+            self.stored_signatures = np.concatenate(
+                [self.stored_signatures, signatures]
+            )
+            for offset, keys in enumerate(self.stored_index.band_keys(signatures)):
+                self.stored_index.add(first_row + offset, keys)
+
+            return len(new_articles)
+
+    def _find_stored(self, signature, keys, doi):
+        """Row of the most similar stored article with another DOI, if any"""
+        best_row, best_similarity = None, self.threshold
+        for row in self.stored_index.candidates(keys):
+            if self.stored_articles[row]["doi"] == doi:
+                continue
+            similarity = self.similarity(signature, self.stored_signatures[row])
+            if similarity >= best_similarity:
+                best_row, best_similarity = row, similarity
+        return best_row
+
+    def session(self):
+        return DedupSession(self)
+
+
+class DedupSession:
+    """
+    Deduplicates the batches of one search, against each other and against
+    stored articles
+    """
+
+    def __init__(self, deduplicator):
+        self.deduplicator = deduplicator
+        self.index = LSHIndex(deduplicator.num_perm, deduplicator.bands)
+        self.kept = []
+        self.kept_signatures = []
+
+    def deduplicate(self, articles):
+        """
+        Keep the best article of each cluster of near-duplicates: the stored
+        version, then a published version over a preprint, then the latest,
+        then the earliest in search order. A cluster that matches an article
+        kept from an earlier batch is dropped. Dropped DOIs are listed on the
+        kept article as duplicate_dois.
+
+        Returns:
+            list: The kept articles, each at the position of the first
+            article of its cluster. A stored article may stand in for its new
+            copies.
+        """
+        if not articles:
+            return []
+
+        deduplicator = self.deduplicator
+        texts = [article_text(article) for article in articles]
+        matchable = [len(text) >= deduplicator.min_characters for text in texts]
+        signatures = deduplicator.hasher.signatures(texts)
+        keys = self.index.band_keys(signatures)
+
+        with deduplicator._lock:
+            clusters = _UnionFind(len(articles))
+            batch_index = LSHIndex(deduplicator.num_perm, deduplicator.bands)
+            for row, row_keys in enumerate(keys):
+                if not matchable[row]:
+                    continue
+                for other in batch_index.candidates(row_keys):
+                    if (
+                        deduplicator.similarity(signatures[row], signatures[other])
+                        >= deduplicator.threshold
+                    ):
+                        clusters.union(row, other)
+                batch_index.add(row, row_keys)
+
+            members = {}
+            for row in range(len(articles)):
+                members.setdefault(clusters.find(row), []).append(row)
+
+            kept = []
+            for rows in members.values():
+                if not matchable[rows[0]]:
+                    kept.append(articles[rows[0]])
+                    continue
+
+                earlier = self._find_kept(signatures, keys, rows)
+                if earlier is not None:
+                    self._mark_duplicates(earlier, [articles[row] for row in rows])
+                    continue
+
+                candidates = [(articles[row], signatures[row], row) for row in rows]
+                for row in rows:
+                    stored_row = deduplicator._find_stored(
+                        signatures[row], keys[row], normalize_doi(articles[row]["doi"])
+                    )
+                    if stored_row is not None:
+                        stored = {
+                            **deduplicator.stored_articles[stored_row],
+                            "file_name": None,
+                        }
+                        signature = deduplicator.stored_signatures[stored_row]
+                        candidates.append((stored, signature, row))
+
+                best, signature, _ = min(
+                    candidates, key=lambda candidate: self._rank(*candidate)
+                )
+                self._mark_duplicates(
+                    best,
+                    [article for article, _, _ in candidates if article is not best],
+                )
+                self._keep(best, signature)
+                kept.append(best)
+
+        return kept
+
+    def _rank(self, article, signature, position):
+        return (
+            normalize_doi(article["doi"]) not in self.deduplicator.stored_dois,
+            is_preprint(article["doi"]),
+            -(article.get("year_published") or 0),
+            position,
+        )
+
+    def _find_kept(self, signatures, keys, rows):
+        for row in rows:
+            for kept_row in self.index.candidates(keys[row]):
+                if (
+                    self.deduplicator.similarity(
+                        signatures[row], self.kept_signatures[kept_row]
+                    )
+                    >= self.deduplicator.threshold
+                ):
+                    return self.kept[kept_row]
+        return None
+
+    def _keep(self, article, signature):
+        self.index.add(len(self.kept), self.index.band_keys(signature[None, :])[0])
+        self.kept.append(article)
+        self.kept_signatures.append(signature)
+
+    @staticmethod
+    def _mark_duplicates(article, duplicates):
+        dois = [
+            duplicate["doi"]
+            for duplicate in duplicates
+            if normalize_doi(duplicate["doi"]) != normalize_doi(article["doi"])
+        ]
+        if dois:
+            article["duplicate_dois"] = list(
+                dict.fromkeys((article.get("duplicate_dois") or []) + dois)
+            )
+
+
+def _default_dedup_path():
+    return os.path.join(os.getenv("JOURNAL_ARTICLE_DIRECTORY", "."), "dedup")
+
+
+# Global deduplicator, so every search sees the same stored signatures
+deduplicator = None
+
+
+def get_deduplicator():
+    """
+    Returns the process-wide deduplicator, loading stored signatures if
+    needed, or None when deduplication is disabled in config.yaml
+    """
+    global deduplicator
+    if deduplicator is None:
+        settings = {**DEFAULT_DEDUP_SETTINGS, **load_config().get("dedup", {})}
+        if not settings["enabled"]:
+            return None
+        deduplicator = Deduplicator(
+            settings["path"] or _default_dedup_path(),
+            num_perm=settings["num_perm"],
+            bands=settings["bands"],
+            shingle_size=settings["shingle_size"],
+            threshold=settings["threshold"],
+            min_characters=settings["min_characters"],
+        )
+    return deduplicator
+
+
+def init_dedup(app: FastAPI):
+    """
+    Load the stored signatures on startup rather than on the first search
+    """
+
+    @app.on_event("startup")
+    async def startup_dedup():
+        get_deduplicator()
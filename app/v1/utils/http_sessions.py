@@ -0,0 +1,278 @@
+import asyncio
+import contextlib
+import logging
+from urllib.parse import urlsplit
+import aiohttp
+from fastapi import FastAPI
+from app.v1.utils.config import load_config
+from app.v1.utils.metrics import (
+    CIRCUIT_REJECTIONS,
+    UPSTREAM_QUEUE_WAIT,
+    UPSTREAM_RETRIES,
+)
+from app.v1.utils.rate_limit import HostRateLimiter, parse_retry_after
+from app.v1.utils.resilience import (
+    IDEMPOTENT_METHODS,
+    RETRY_STATUSES,
+    CircuitBreaker,
+    backoff_delay,
+    is_transient_error,
+)
+from app.v1.utils.utils import create_ssl_context
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POOL_SETTINGS = {
+    "limit": 100,
+    "limit_per_host": 20,
+    "keepalive_timeout": 30,
+    "ttl_dns_cache": 300,
+    # Seconds; timeout_sock_read bounds the wait for each chunk of a body
+    "timeout_total": 60,
+    "timeout_connect": 10,
+    "timeout_sock_read": 30,
+    "max_retries": 2,
+    "backoff_base": 0.2,
+    "backoff_max": 5.0,
+    "breaker_failure_threshold": 5,
+    "breaker_reset_seconds": 30,
+    # Per-host pacing; rate_per_second null leaves the rate unpaced until a
+    # host advertises one
+    "rate_per_second": None,
+    "burst": 1,
+    "max_in_flight": 20,
+}
+
+
+class HTTPSessionPool:
+    """
+    Application-lifetime aiohttp sessions, one per upstream service, so that
+    DNS lookups, TCP connections and TLS handshakes are reused across requests.
+
+    Calls made through request() also get the upstream's timeouts, retries
+    with backoff, and a circuit breaker and rate limiter per host.
+    """
+
+    def __init__(self, pool_config=None):
+        if pool_config is None:
+            pool_config = load_config().get("http", {})
+
+        self.pool_config = pool_config
+        self.sessions = {}
+        self.breakers = {}
+        self.host_limiters = {}
+
+    def _get_settings(self, name):
+        return {
+            **DEFAULT_POOL_SETTINGS,
+            **self.pool_config.get("default", {}),
+            **self.pool_config.get(name, {}),
+        }
+
+    def _create_session(self, name):
+        settings = self._get_settings(name)
+        connector = create_ssl_context(
+            limit=settings["limit"],
+            limit_per_host=settings["limit_per_host"],
+            keepalive_timeout=settings["keepalive_timeout"],
+            ttl_dns_cache=settings["ttl_dns_cache"],
+            use_dns_cache=True,
+        )
+        timeout = aiohttp.ClientTimeout(
+            total=settings["timeout_total"],
+            connect=settings["timeout_connect"],
+            sock_read=settings["timeout_sock_read"],
+        )
+
+        return aiohttp.ClientSession(connector=connector, timeout=timeout)
+
+    def get_session(self, name):
+        """
+        Returns the shared session for an upstream service, creating it if needed
+
+        Args:
+            name (str): Upstream service name, e.g. "crossref" or "unpaywall"
+
+        Returns:
+            aiohttp.ClientSession: Session bound to the running event loop
+        """
+        loop = asyncio.get_running_loop()
+        session, session_loop = self.sessions.get(name, (None, None))
+
+        if session is None or session.closed or session_loop is not loop:
+            session = self._create_session(name)
+            self.sessions[name] = (session, loop)
+
+        return session
+
+    def get_breaker(self, name, host):
+        """Returns the circuit breaker for one host of an upstream service"""
+        breaker = self.breakers.get((name, host))
+        if breaker is None:
+            settings = self._get_settings(name)
+            breaker = self.breakers[(name, host)] = CircuitBreaker(
+                failure_threshold=settings["breaker_failure_threshold"],
+                reset_seconds=settings["breaker_reset_seconds"],
+            )
+        return breaker
+
+    def get_host_limiter(self, name, host):
+        """Returns the rate limiter for one host of an upstream service"""
+        limiter = self.host_limiters.get((name, host))
+        if limiter is None:
+            settings = self._get_settings(name)
+            limiter = self.host_limiters[(name, host)] = HostRateLimiter(
+                rate_per_second=settings["rate_per_second"],
+                burst=settings["burst"],
+                max_in_flight=settings["max_in_flight"],
+            )
+        return limiter
+
+    @contextlib.asynccontextmanager
+    async def request(self, name, method, url, raise_for_status=True, **kwargs):
+        """
+        Make a request on the upstream's session and yield the response.
+
+        Each attempt waits for the host's rate limiter, which holds its slot
+        until the body has been read and adapts to the limits the host
+        advertises. Time spent waiting is recorded per upstream.
+
+        Connection errors, timeouts and retryable statuses are retried with
+        jittered exponential backoff for idempotent methods, up to the
+        upstream's max_retries, until the response headers arrive. The body
+        is read by the caller and is not retried, since part of it may
+        already have been used. Transient failures, including those while
+        reading the body, count towards the host's circuit breaker.
+
+        Args:
+            name (str): Upstream service name, e.g. "crossref" or "pdf"
+            method (str): HTTP method
+            url (str): Request URL
+            raise_for_status (bool): Raise for any error status, not only the
+                retryable ones
+
+        Yields:
+            aiohttp.ClientResponse: The response, released on exit
+
+        Raises:
+            CircuitOpenError: If the host's circuit breaker is open
+        """
+        settings = self._get_settings(name)
+        session = self.get_session(name)
+        host = urlsplit(url).netloc
+        breaker = self.get_breaker(name, host)
+        limiter = self.get_host_limiter(name, host)
+        max_retries = settings["max_retries"] if method in IDEMPOTENT_METHODS else 0
+
+        attempt = 0
+        while True:
+            try:
+                breaker.check(host)
+            except Exception:
+                CIRCUIT_REJECTIONS.inc(upstream=name)
+                raise
+
+            UPSTREAM_QUEUE_WAIT.observe(await limiter.acquire(), upstream=name)
+
+            try:
+                response = await getattr(session, method.lower())(url, **kwargs)
+                limiter.update_from_headers(response.headers)
+                if response.status == 429:
+                    limiter.on_rate_limited(
+                        parse_retry_after(response.headers.get("Retry-After"))
+                    )
+                else:
+                    limiter.on_success()
+
+                if raise_for_status or response.status in RETRY_STATUSES:
+                    try:
+                        response.raise_for_status()
+                    except Exception:
+                        response.release()
+                        raise
+                break
+
+            except asyncio.CancelledError:
+                # Hedged and abandoned calls must not keep the host's slot
+                limiter.release()
+                raise
+            except Exception as e:
+                limiter.release()
+                if not is_transient_error(e):
+                    breaker.record_success()
+                    raise
+
+                # A 429 means the host is up; the limiter already paused it
+                if getattr(e, "status", None) != 429:
+                    breaker.record_failure()
+                if attempt >= max_retries:
+                    raise
+
+                UPSTREAM_RETRIES.inc(upstream=name)
+                await asyncio.sleep(
+                    backoff_delay(
+                        attempt, settings["backoff_base"], settings["backoff_max"]
+                    )
+                )
+                attempt += 1
+
+        try:
+            async with response:
+                yield response
+        except Exception as e:
+            if is_transient_error(e):
+                breaker.record_failure()
+            raise
+        else:
+            breaker.record_success()
+        finally:
+            limiter.release()
+
+    async def close(self):
+        for session, session_loop in self.sessions.values():
+            if not session.closed and session_loop is asyncio.get_running_loop():
+                await session.close()
+        self.sessions = {}
+
+
+# Global pool object shared by every request in the process
+http_session_pool = None
+
+
+def get_http_session_pool():
+    """
+    Returns the process-wide HTTP session pool, creating it if needed
+    """
+    global http_session_pool
+    if http_session_pool is None:
+        http_session_pool = HTTPSessionPool()
+    return http_session_pool
+
+
+async def close_http_session_pool():
+    """
+    Closes every session held by the process-wide HTTP session pool
+    """
+    global http_session_pool
+    if http_session_pool is not None:
+        await http_session_pool.close()
+        http_session_pool = None
+        logger.info("HTTP session pool closed")
+
+
+def init_http_sessions(app: FastAPI):
+    """
+    Open the shared HTTP sessions on startup and close them on shutdown
+    """
+
+    @app.on_event("startup")
+    async def startup_http_sessions():
+        pool = get_http_session_pool()
+        for name in ("crossref", "unpaywall"):
+            pool.get_session(name)
+
+        logger.info("HTTP session pool initialized")
+
+    @app.on_event("shutdown")
+    async def shutdown_http_sessions():
+        await close_http_session_pool()
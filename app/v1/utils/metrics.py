@@ -0,0 +1,282 @@
+import bisect
+import contextlib
+import math
+import time
+
+PROMETHEUS_MEDIA_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds, from cache hits up to slow PDF downloads and completions
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+def _escape_label_value(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labelnames, labelvalues, extra=()):
+    pairs = list(zip(labelnames, labelvalues)) + list(extra)
+    if not pairs:
+        return ""
+    return (
+        "{"
+        + ",".join(f'{name}="{_escape_label_value(value)}"' for name, value in pairs)
+        + "}"
+    )
+
+
+def _format_value(value):
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    """
+    Base for in-process metrics. Values are kept per label combination in a
+    plain dict and are only updated from the event loop thread, so recording
+    is a dict lookup and an addition with no locking.
+    """
+
+    type = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+
+    def _key(self, labels):
+        return tuple(labels[name] for name in self.labelnames)
+
+    def clear(self):
+        self._values.clear()
+
+    def render(self):
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type}",
+        ]
+        for key, value in self._values.items():
+            lines.extend(self._render_value(key, value))
+        return lines
+
+    def _render_value(self, key, value):
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+        ]
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def get(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+
+class Gauge(Metric):
+    type = "gauge"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value, **labels):
+        self._values[self._key(labels)] = value
+
+    def get(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        series = self._values.get(key)
+        if series is None:
+            # Per-bucket counts, then sum and count
+            series = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+
+        series[0][bisect.bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def get_count(self, **labels):
+        series = self._values.get(self._key(labels))
+        return series[2] if series else 0
+
+    def get_sum(self, **labels):
+        series = self._values.get(self._key(labels))
+        return series[1] if series else 0.0
+
+    def _render_value(self, key, series):
+        bucket_counts, total, count = series
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets, bucket_counts):
+            cumulative += bucket_count
+            labels = _format_labels(
+                self.labelnames, key, [("le", _format_value(float(bound)))]
+            )
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+
+        labels = _format_labels(self.labelnames, key)
+        lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+        lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.metrics = {}
+
+    def register(self, metric):
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self):
+        """Returns every metric in the Prometheus text exposition format"""
+        lines = []
+        for metric in self.metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def clear(self):
+        for metric in self.metrics.values():
+            metric.clear()
+
+
+# Global registry shared by every request in the process
+registry = MetricsRegistry()
+
+STAGE_DURATION = registry.histogram(
+    "research_agent_stage_duration_seconds",
+    "Time spent in each pipeline stage",
+    ["stage", "outcome"],
+)
+STAGE_IN_FLIGHT = registry.gauge(
+    "research_agent_stage_in_flight",
+    "Pipeline stage calls currently running",
+    ["stage"],
+)
+UPSTREAM_REQUESTS = registry.counter(
+    "research_agent_upstream_requests_total",
+    "Calls to upstream services by outcome",
+    ["upstream", "outcome"],
+)
+UPSTREAM_DURATION = registry.histogram(
+    "research_agent_upstream_request_duration_seconds",
+    "Latency of calls to upstream services",
+    ["upstream"],
+)
+UPSTREAM_IN_FLIGHT = registry.gauge(
+    "research_agent_upstream_in_flight",
+    "Calls to upstream services currently waiting on a response",
+    ["upstream"],
+)
+UPSTREAM_QUEUE_WAIT = registry.histogram(
+    "research_agent_upstream_queue_wait_seconds",
+    "Time calls waited for their host's rate limiter before being sent",
+    ["upstream"],
+)
+UPSTREAM_RETRIES = registry.counter(
+    "research_agent_upstream_retries_total",
+    "Calls to upstream services retried after a transient failure",
+    ["upstream"],
+)
+CIRCUIT_REJECTIONS = registry.counter(
+    "research_agent_circuit_rejections_total",
+    "Calls failed fast because the host's circuit breaker was open",
+    ["upstream"],
+)
+BYTES_DOWNLOADED = registry.counter(
+    "research_agent_downloaded_bytes_total",
+    "Response body bytes read from upstream services",
+    ["upstream"],
+)
+BYTES_UPLOADED = registry.counter(
+    "research_agent_uploaded_bytes_total",
+    "Bytes written to storage",
+    ["destination"],
+)
+CHAT_TIME_TO_FIRST_TOKEN = registry.histogram(
+    "research_agent_chat_time_to_first_token_seconds",
+    "Time from a streamed chat request to its first token",
+)
+
+
+class StageTimer:
+    def __init__(self, stage):
+        self.stage = stage
+        self.paused_seconds = 0.0
+
+    @contextlib.contextmanager
+    def paused(self):
+        """
+        Leave the enclosed time out of the stage, e.g. while a generator is
+        suspended at a yield waiting for its consumer
+        """
+        STAGE_IN_FLIGHT.dec(stage=self.stage)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.paused_seconds += time.perf_counter() - start
+            STAGE_IN_FLIGHT.inc(stage=self.stage)
+
+
+@contextlib.contextmanager
+def track_stage(stage):
+    """
+    Record the latency, outcome and concurrency of a pipeline stage. Yields
+    a StageTimer whose paused() blocks are not counted.
+    """
+    STAGE_IN_FLIGHT.inc(stage=stage)
+    timer = StageTimer(stage)
+    start = time.perf_counter()
+    outcome = "failure"
+    try:
+        yield timer
+        outcome = "success"
+    finally:
+        STAGE_IN_FLIGHT.dec(stage=stage)
+        STAGE_DURATION.observe(
+            time.perf_counter() - start - timer.paused_seconds,
+            stage=stage,
+            outcome=outcome,
+        )
+
+
+@contextlib.contextmanager
+def track_upstream(upstream):
+    """Record the latency, outcome and concurrency of an upstream call"""
+    UPSTREAM_IN_FLIGHT.inc(upstream=upstream)
+    start = time.perf_counter()
+    outcome = "failure"
+    try:
+        yield
+        outcome = "success"
+    finally:
+        UPSTREAM_IN_FLIGHT.dec(upstream=upstream)
+        UPSTREAM_DURATION.observe(time.perf_counter() - start, upstream=upstream)
+        UPSTREAM_REQUESTS.inc(upstream=upstream, outcome=outcome)
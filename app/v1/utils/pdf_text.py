@@ -0,0 +1,186 @@
+"""
+Text extraction and chunking for stored PDFs. Functions here run in worker
+processes, so this module imports nothing from the app and loads pypdf only
+when a PDF is parsed.
+"""
+
+import re
+import time
+
+# Headings common in research papers, optionally numbered, e.g. "2. Methods"
+HEADING_PATTERN = re.compile(
+    r"^(?:(?:\d+(?:\.\d+)*|[IVX]+)\.?\s+)?"
+    r"(abstract|introduction|background|related work|preliminaries|"
+    r"methods?|methodology|materials and methods|experiments?|"
+    r"experimental setup|results|results and discussion|evaluation|"
+    r"discussion|limitations|conclusions?|future work|acknowledge?ments|"
+    r"references|bibliography|appendix(?:\s+[a-z])?)\s*$",
+    re.IGNORECASE,
+)
+
+
+def _load_pdf_reader(path):
+    try:
+        from pypdf import PdfReader
+    except ImportError as e:
+        raise ImportError(
+            "pypdf is required for text extraction: pip install pypdf"
+        ) from e
+    return PdfReader(path)
+
+
+def _outline_sections(reader, page_offsets):
+    """Sections from the PDF's bookmarks, if it has any"""
+    sections = []
+
+    def walk(entries, level):
+        for entry in entries:
+            if isinstance(entry, list):
+                walk(entry, level + 1)
+                continue
+            try:
+                page = reader.get_destination_page_number(entry)
+            except Exception:
+                continue
+            if page is not None and 0 <= page < len(page_offsets):
+                sections.append(
+                    {
+                        "title": str(entry.title).strip(),
+                        "level": level,
+                        "page": page + 1,
+                        "start": page_offsets[page],
+                    }
+                )
+
+    try:
+        walk(reader.outline, 1)
+    except Exception:
+        return []
+    return sorted(sections, key=lambda section: section["start"])
+
+
+def _heading_sections(text, page_offsets):
+    """Sections found by matching lines that look like standard headings"""
+    sections = []
+    position = 0
+    for line in text.split("\n"):
+        stripped = line.strip()
+        if stripped and len(stripped) <= 60 and HEADING_PATTERN.match(stripped):
+            page = sum(1 for offset in page_offsets if offset <= position)
+            sections.append(
+                {"title": stripped, "level": 1, "page": page, "start": position}
+            )
+        position += len(line) + 1
+    return sections
+
+
+def extract_pdf_text(path):
+    """
+    Extract the text of a PDF, with the start of each page and section
+
+    Returns:
+        dict: {"text", "page_count", "sections"}. Section starts are character
+        offsets into text, taken from the PDF's outline when it has one and
+        from heading-like lines otherwise.
+    """
+    reader = _load_pdf_reader(path)
+    pages = []
+    page_offsets = []
+    length = 0
+
+    for page in reader.pages:
+        try:
+            page_text = page.extract_text() or ""
+        except Exception:
+            page_text = ""
+        page_offsets.append(length)
+        pages.append(page_text)
+        length += len(page_text) + 1
+
+    text = "\n".join(pages)
+    sections = _outline_sections(reader, page_offsets) or _heading_sections(
+        text, page_offsets
+    )
+
+    return {"text": text, "page_count": len(pages), "sections": sections}
+
+
+def chunk_text(text, chunk_size=2000, chunk_overlap=200, sections=()):
+    """
+    Split text into chunks of at most chunk_size characters, each starting
+    chunk_overlap characters before the previous one ended. Chunk ends are
+    moved back to the last whitespace in their final tenth, so words are not
+    cut in half when that can be avoided.
+
+    Returns:
+        list: {"index", "start", "end", "section", "text"} for each chunk
+    """
+    if chunk_overlap >= chunk_size:
+        raise ValueError("chunk_overlap must be smaller than chunk_size")
+
+    chunks = []
+    section_starts = [(section["start"], section["title"]) for section in sections]
+    start = 0
+
+    while start < len(text):
+        end = min(start + chunk_size, len(text))
+        if end < len(text):
+            boundary = text.rfind(" ", end - chunk_size // 10, end)
+            newline = text.rfind("\n", end - chunk_size // 10, end)
+            boundary = max(boundary, newline)
+            if boundary > start:
+                end = boundary
+
+        section = None
+        for section_start, title in section_starts:
+            if section_start > start:
+                break
+            section = title
+
+        chunk = text[start:end].strip()
+        if chunk:
+            chunks.append(
+                {
+                    "index": len(chunks),
+                    "start": start,
+                    "end": end,
+                    "section": section,
+                    "text": chunk,
+                }
+            )
+
+        if end >= len(text):
+            break
+        start = max(end - chunk_overlap, start + 1)
+
+    return chunks
+
+
+def process_pdf(path, chunk_size=2000, chunk_overlap=200):
+    """
+    Extract and chunk one PDF. Runs in a worker process.
+
+    Returns:
+        dict: {"text", "page_count", "characters", "sections", "chunks",
+        "timings"}
+    """
+    start = time.perf_counter()
+    extracted = extract_pdf_text(path)
+    extracted_at = time.perf_counter()
+
+    chunks = chunk_text(
+        extracted["text"], chunk_size, chunk_overlap, extracted["sections"]
+    )
+    chunked_at = time.perf_counter()
+
+    return {
+        "text": extracted["text"],
+        "page_count": extracted["page_count"],
+        "characters": len(extracted["text"]),
+        "sections": extracted["sections"],
+        "chunks": chunks,
+        "timings": {
+            "extract_seconds": extracted_at - start,
+            "chunk_seconds": chunked_at - extracted_at,
+        },
+    }
@@ -0,0 +1,86 @@
+import asyncio
+
+# Follows the last item on each queue
+_DONE = object()
+
+
+class _StageFailure:
+    def __init__(self, error):
+        self.error = error
+
+
+async def run_pipeline(source, stages, queue_size=50):
+    """
+    Stream items from source through stages connected by bounded queues,
+    yielding each result of the last stage as soon as it is ready.
+
+    Each stage is a (handler, concurrency) pair: that many workers take items
+    from the stage's queue and pass `await handler(item)` to the next one, so
+    an item moves on as soon as its own handler returns. A full queue blocks
+    the stage feeding it, which keeps memory flat when a later stage is slow.
+    Handlers should record per-item failures on their result; an exception
+    raised by the source or a handler stops the pipeline and is re-raised.
+
+    Args:
+        source (AsyncIterable): Items for the first stage
+        stages (list): (handler, concurrency) pairs, in order
+        queue_size (int): Capacity of each queue between stages
+
+    Yields:
+        The results of the last stage, in completion order
+    """
+    queues = [asyncio.Queue(maxsize=queue_size) for _ in range(len(stages) + 1)]
+    output = queues[-1]
+
+    async def feed():
+        try:
+            async for item in source:
+                await queues[0].put(item)
+            await queues[0].put(_DONE)
+        except Exception as e:
+            await output.put(_StageFailure(e))
+        finally:
+            # Stop a source that is paused mid-iteration, e.g. reading a response
+            aclose = getattr(source, "aclose", None)
+            if aclose:
+                await aclose()
+
+    async def run_stage(handler, concurrency, inbox, outbox):
+        async def worker():
+            while True:
+                item = await inbox.get()
+                if item is _DONE:
+                    # Leave the marker for this stage's other workers
+                    inbox.put_nowait(_DONE)
+                    return
+                await outbox.put(await handler(item))
+
+        workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+        try:
+            await asyncio.gather(*workers)
+            await outbox.put(_DONE)
+        except Exception as e:
+            await output.put(_StageFailure(e))
+        finally:
+            for task in workers:
+                task.cancel()
+
+    tasks = [asyncio.create_task(feed())] + [
+        asyncio.create_task(run_stage(handler, concurrency, inbox, outbox))
+        for (handler, concurrency), inbox, outbox in zip(
+            stages, queues[:-1], queues[1:]
+        )
+    ]
+
+    try:
+        while True:
+            item = await output.get()
+            if item is _DONE:
+                return
+            if isinstance(item, _StageFailure):
+                raise item.error
+            yield item
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,223 @@
+import asyncio
+import contextlib
+import email.utils
+import logging
+import re
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+# e.g. "1s", "500ms" or "1m" in X-Rate-Limit-Interval
+INTERVAL_PATTERN = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*(ms|s|m|h)?\s*$")
+INTERVAL_UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+
+
+class TokenBucket:
+    """
+    Token bucket refilled continuously at capacity per period.
+
+    Callers reserve their amount up front and wait until the bucket has paid
+    off the debt, so waiters are served in arrival order without a lock.
+    """
+
+    def __init__(self, capacity, period_seconds=60):
+        self.capacity = capacity
+        self.rate = capacity / period_seconds
+        self.tokens = capacity
+        self._updated_at = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self._updated_at) * self.rate
+        )
+        self._updated_at = now
+
+    def set_rate(self, rate, capacity=None):
+        """Change the refill rate, and optionally the capacity, from now on"""
+        self._refill()
+        self.rate = rate
+        if capacity is not None:
+            self.capacity = capacity
+            self.tokens = min(self.tokens, capacity)
+
+    async def acquire(self, amount=1):
+        self._refill()
+        self.tokens -= amount
+
+        if self.tokens < 0:
+            await asyncio.sleep(-self.tokens / self.rate)
+
+
+class RateLimiter:
+    """
+    Requests-per-minute and tokens-per-minute limits, as enforced by Azure
+    OpenAI deployments
+    """
+
+    def __init__(self, requests_per_minute, tokens_per_minute):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+
+    async def acquire(self, tokens):
+        await self.requests.acquire(1)
+        await self.tokens.acquire(tokens)
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    Concurrency cap that halves on rate limiting and grows back by about one
+    slot per limit's worth of successful calls (AIMD)
+    """
+
+    def __init__(self, max_concurrency, min_concurrency=1):
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.limit = float(max_concurrency)
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self.rate_limited = 0
+        self._waiters = deque()
+
+    def _has_capacity(self):
+        return self.in_flight < int(self.limit)
+
+    async def acquire(self):
+        while True:
+            pause = self.paused_until - time.monotonic()
+            if pause > 0:
+                await asyncio.sleep(pause)
+                continue
+
+            if self._has_capacity():
+                self.in_flight += 1
+                return
+
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            finally:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+
+    def release(self):
+        self.in_flight -= 1
+        self._wake_waiters()
+
+    @contextlib.asynccontextmanager
+    async def slot(self):
+        await self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    def on_success(self):
+        self.limit = min(self.max_concurrency, self.limit + 1 / self.limit)
+        self._wake_waiters()
+
+    def on_rate_limited(self, retry_after):
+        """
+        Halve the concurrency cap and hold new calls until retry_after
+        seconds have passed
+        """
+        self.rate_limited += 1
+        self.limit = max(self.min_concurrency, self.limit / 2)
+        self.paused_until = max(self.paused_until, time.monotonic() + retry_after)
+
+    def _wake_waiters(self):
+        available = int(self.limit) - self.in_flight
+        while available > 0 and self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                available -= 1
+
+
+def parse_retry_after(value, default=1.0):
+    """
+    Seconds to wait from a Retry-After header, given as seconds or an HTTP date
+    """
+    if not value:
+        return default
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return default
+    return max(0.0, retry_at - time.time())
+
+
+def parse_interval(value):
+    """Seconds in an X-Rate-Limit-Interval value, or None if unrecognised"""
+    match = INTERVAL_PATTERN.match(value or "")
+    if not match:
+        return None
+    return float(match.group(1)) * INTERVAL_UNITS[match.group(2) or "s"]
+
+
+class HostRateLimiter(AdaptiveConcurrencyLimiter):
+    """
+    Paces requests to one host: at most max_in_flight at once, started no
+    faster than a token bucket of burst requests refilled at rate_per_second.
+
+    The rate follows the X-Rate-Limit-Limit and X-Rate-Limit-Interval headers
+    Crossref sends with every response, and the concurrency cap follows
+    X-Concurrency-Limit, so requests run as fast as the host currently
+    allows. A 429 halves the concurrency cap and pauses the host for its
+    Retry-After, as for Azure OpenAI.
+    """
+
+    def __init__(self, rate_per_second=None, burst=1, max_in_flight=20):
+        super().__init__(max_in_flight, min_concurrency=1)
+        self.burst = burst
+        self.bucket = (
+            TokenBucket(burst, burst / rate_per_second) if rate_per_second else None
+        )
+
+    async def acquire(self):
+        """
+        Wait for a free slot and a token
+
+        Returns:
+            float: Seconds spent waiting
+        """
+        start = time.monotonic()
+        await super().acquire()
+        if self.bucket is not None:
+            try:
+                await self.bucket.acquire()
+            except BaseException:
+                self.release()
+                raise
+        return time.monotonic() - start
+
+    def update_from_headers(self, headers):
+        """Adopt the rate and concurrency limits a host advertises"""
+        limit = headers.get("X-Rate-Limit-Limit")
+        interval = parse_interval(headers.get("X-Rate-Limit-Interval"))
+        if limit and interval:
+            try:
+                rate = float(limit) / interval
+            except ValueError:
+                rate = None
+
+            if rate and (self.bucket is None or self.bucket.rate != rate):
+                capacity = min(self.burst, float(limit))
+                if self.bucket is None:
+                    self.bucket = TokenBucket(capacity, capacity / rate)
+                else:
+                    self.bucket.set_rate(rate, capacity)
+                logger.info(f"Host rate limit set to {rate:g} requests per second")
+
+        concurrency = headers.get("X-Concurrency-Limit")
+        if concurrency and concurrency.isdigit() and int(concurrency) > 0:
+            if int(concurrency) != self.max_concurrency:
+                self.max_concurrency = int(concurrency)
+                self.limit = min(self.limit, self.max_concurrency)
+                logger.info(f"Host concurrency limit set to {concurrency}")
@@ -0,0 +1,140 @@
+import asyncio
+import random
+import time
+import aiohttp
+
+# Statuses worth retrying: rate limiting and server-side failures
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a host whose circuit breaker is open"""
+
+
+def is_transient_error(error):
+    """
+    Whether an upstream failure is worth retrying and counts against the
+    host's circuit breaker. Client errors such as 404 mean the host is up.
+    """
+    if isinstance(error, aiohttp.ClientResponseError):
+        return error.status in RETRY_STATUSES
+    return isinstance(
+        error,
+        (
+            asyncio.TimeoutError,
+            aiohttp.ClientConnectionError,
+            aiohttp.ClientPayloadError,
+        ),
+    )
+
+
+def backoff_delay(attempt, base=0.2, maximum=5.0):
+    """
+    Exponential backoff with full jitter, so clients retrying after the same
+    failure do not retry in lockstep
+
+    Args:
+        attempt (int): Retries already made, starting at 0
+    """
+    return random.uniform(0, min(maximum, base * 2**attempt))
+
+
+class CircuitBreaker:
+    """
+    Fails calls fast once a host has failed failure_threshold times in a row.
+    After reset_seconds calls are let through again; the first success closes
+    the circuit and the first failure reopens it.
+    """
+
+    def __init__(self, failure_threshold=5, reset_seconds=30):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at = None
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at < self.reset_seconds:
+            return "open"
+        return "half_open"
+
+    def check(self, host=None):
+        """
+        Raises:
+            CircuitOpenError: If calls should not be made yet
+        """
+        if self.state == "open":
+            retry_in = self.reset_seconds - (time.monotonic() - self.opened_at)
+            raise CircuitOpenError(
+                f"Circuit open for {host or 'host'}, retry in {retry_in:.1f}s"
+            )
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == "half_open" or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+
+
+async def first_success(attempts, hedge_delay=None):
+    """
+    Run attempts in order until one returns something other than None.
+
+    An attempt that fails or returns None starts the next one straight away.
+    With hedge_delay, the next attempt also starts whenever hedge_delay
+    seconds pass without a result, so a slow server is raced against the
+    next one instead of waited out. The first result wins and the attempts
+    still running are cancelled.
+
+    Args:
+        attempts (list): Zero-argument coroutine functions
+        hedge_delay (float | None): Seconds before hedging, or None to run
+            attempts one at a time
+
+    Returns:
+        The first result, or None if every attempt returned None
+
+    Raises:
+        Exception: The last error, if every attempt failed and one raised
+    """
+    remaining = iter(attempts)
+    pending = set()
+    last_error = None
+
+    def start_next():
+        attempt = next(remaining, None)
+        if attempt is not None:
+            pending.add(asyncio.ensure_future(attempt()))
+
+    start_next()
+    try:
+        while pending:
+            done, _ = await asyncio.wait(
+                pending, timeout=hedge_delay, return_when=asyncio.FIRST_COMPLETED
+            )
+            if not done:
+                start_next()
+                continue
+
+            for task in done:
+                pending.discard(task)
+                if task.exception() is not None:
+                    last_error = task.exception()
+                elif task.result() is not None:
+                    return task.result()
+                start_next()
+
+        if last_error is not None:
+            raise last_error
+        return None
+
+    finally:
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
@@ -0,0 +1,503 @@
+"""
+Local full-text index of stored articles, ranked with BM25.
+
+New documents go to an in-memory buffer that is also appended to
+pending.jsonl, and are written out as an immutable segment once
+flush_documents have been added. A segment is three files: its documents as
+JSON, a JSON dictionary of each term's (offset, count) and a NumPy array of
+(document, term frequency) postings that is memory-mapped on load, so opening
+the index reads only the dictionaries. Segments are merged into one once
+there are more than max_segments.
+
+Re-adding a DOI supersedes its earlier document, e.g. when the extracted text
+of a paper that was indexed by title and abstract arrives.
+
+Worker processes may share a directory. Appends to pending.jsonl and
+flushes are made under a file lock, and a flush first reloads the index from
+disk, so it writes every worker's pending documents and keeps the segments
+other workers wrote. Each worker sees the others' documents from its next
+flush or restart.
+"""
+
+import json
+import logging
+import math
+import os
+import re
+import threading
+from collections import Counter
+import numpy as np
+from fastapi import FastAPI
+from app.v1.utils.config import load_config
+from app.v1.utils.utils import file_lock, normalize_doi
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INDEX_SETTINGS = {
+    "enabled": True,
+    # None keeps the index in JOURNAL_ARTICLE_DIRECTORY/search_index
+    "path": None,
+    "flush_documents": 200,
+    "max_segments": 8,
+    "k1": 1.2,
+    "b": 0.75,
+}
+
+MANIFEST_FILE = "manifest.json"
+PENDING_FILE = "pending.jsonl"
+LOCK_FILE = "index.lock"
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+MARKUP_PATTERN = re.compile(r"<[^>]+>")
+STOPWORDS = frozenset(
+    "an and are as at be by for from has have in is it its of on or our that "
+    "the their this to was we were which with".split()
+)
+
+
+def tokenize(text):
+    """Lowercase word tokens, without markup, stopwords or single characters"""
+    text = MARKUP_PATTERN.sub(" ", text or "").lower()
+    return [
+        token
+        for token in TOKEN_PATTERN.findall(text)
+        if len(token) > 1 and token not in STOPWORDS
+    ]
+
+
+class _Segment:
+    """A flushed, read-only part of the index"""
+
+    def __init__(self, directory, name):
+        self.name = name
+        prefix = os.path.join(directory, name)
+
+        with open(f"{prefix}.docs.json") as file:
+            self.documents = json.load(file)
+        with open(f"{prefix}.terms.json") as file:
+            self.terms = json.load(file)
+        self.postings = np.load(f"{prefix}.postings.npy", mmap_mode="r")
+
+        self.lengths = np.array(
+            [document["length"] for document in self.documents], dtype=np.float32
+        )
+        self.live = np.ones(len(self.documents), dtype=bool)
+
+    def postings_for(self, term):
+        entry = self.terms.get(term)
+        if entry is None:
+            return None
+        offset, count = entry
+        return self.postings[offset : offset + count]
+
+
+class _Buffer:
+    """Documents added since the last flush"""
+
+    def __init__(self):
+        self.documents = []
+        self.terms = {}
+        self.live = []
+
+    @property
+    def lengths(self):
+        return np.array(
+            [document["length"] for document in self.documents], dtype=np.float32
+        )
+
+    def add(self, document, term_counts):
+        local_id = len(self.documents)
+        self.documents.append(document)
+        self.live.append(True)
+        for term, count in term_counts.items():
+            self.terms.setdefault(term, []).append((local_id, count))
+        return local_id
+
+    def postings_for(self, term):
+        postings = self.terms.get(term)
+        if postings is None:
+            return None
+        return np.array(postings, dtype=np.uint32)
+
+
+def _write_segment(directory, name, documents, term_postings):
+    """
+    Write a segment's files, each under a temporary name first so a crash
+    never leaves a partial segment in the manifest
+
+    Args:
+        term_postings (dict): term -> (document, frequency) array, ordered
+            by document
+    """
+    terms = {}
+    arrays = []
+    offset = 0
+    for term in sorted(term_postings):
+        postings = term_postings[term]
+        terms[term] = (offset, len(postings))
+        arrays.append(postings)
+        offset += len(postings)
+
+    postings = (
+        np.concatenate(arrays).astype(np.uint32)
+        if arrays
+        else np.zeros((0, 2), dtype=np.uint32)
+    )
+    prefix = os.path.join(directory, name)
+
+    for suffix, write in (
+        (".postings.npy", lambda file: np.save(file, postings)),
+        (".terms.json", lambda file: file.write(json.dumps(terms).encode())),
+        (".docs.json", lambda file: file.write(json.dumps(documents).encode())),
+    ):
+        with open(f"{prefix}{suffix}.tmp", "wb") as file:
+            write(file)
+        os.replace(f"{prefix}{suffix}.tmp", f"{prefix}{suffix}")
+
+
+class SearchIndex:
+    """
+    BM25 index over stored articles. Methods are thread-safe and blocking, so
+    async callers run them with asyncio.to_thread.
+    """
+
+    def __init__(self, directory, flush_documents=200, max_segments=8, k1=1.2, b=0.75):
+        self.directory = directory
+        self.flush_documents = flush_documents
+        self.max_segments = max_segments
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.RLock()
+        with self._file_lock():
+            self._load()
+
+    def _file_lock(self):
+        # flock is per open file, so this must not be nested in one process
+        return file_lock(os.path.join(self.directory, LOCK_FILE))
+
+    def _load(self):
+        manifest = {"segments": [], "next_segment": 0}
+        manifest_path = os.path.join(self.directory, MANIFEST_FILE)
+        if os.path.exists(manifest_path):
+            with open(manifest_path) as file:
+                manifest = json.load(file)
+
+        self.next_segment = manifest["next_segment"]
+        self.segments = []
+        self.buffer = _Buffer()
+        # doi -> (segment or buffer, local id) of the document that counts
+        self.latest = {}
+        self.document_count = 0
+        self.total_length = 0
+
+        for name in manifest["segments"]:
+            segment = _Segment(self.directory, name)
+            self.segments.append(segment)
+            for local_id, document in enumerate(segment.documents):
+                self._make_latest(segment, local_id, document)
+
+        pending_path = os.path.join(self.directory, PENDING_FILE)
+        if os.path.exists(pending_path):
+            with open(pending_path) as file:
+                for line in file:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        # The last line of a crashed write
+                        continue
+                    local_id = self.buffer.add(entry["document"], entry["terms"])
+                    self._make_latest(self.buffer, local_id, entry["document"])
+
+    def _make_latest(self, source, local_id, document):
+        previous = self.latest.get(document["doi"])
+        if previous is not None:
+            previous_source, previous_id = previous
+            previous_source.live[previous_id] = False
+            self.document_count -= 1
+            self.total_length -= previous_source.documents[previous_id]["length"]
+
+        self.latest[document["doi"]] = (source, local_id)
+        self.document_count += 1
+        self.total_length += document["length"]
+
+    def get_document(self, doi):
+        with self._lock:
+            entry = self.latest.get(normalize_doi(doi))
+            if entry is None:
+                return None
+            source, local_id = entry
+            return source.documents[local_id]
+
+    def add(self, article, text=None):
+        """
+        Index a stored article's title and abstract, and its extracted text
+        when given. An article that is already indexed is only re-indexed to
+        add text it was indexed without.
+
+        Returns:
+            bool: Whether the article was indexed
+        """
+        doi = normalize_doi(article["doi"])
+        existing = self.get_document(doi)
+        if existing is not None and (text is None or existing["has_text"]):
+            return False
+
+        title = article.get("title") or []
+        if isinstance(title, str):
+            title = [title]
+        term_counts = Counter(
+            tokenize(" ".join([*title, article.get("abstract") or "", text or ""]))
+        )
+        document = {
+            "doi": doi,
+            "title": title,
+            "year_published": article.get("year_published"),
+            "url": article.get("url"),
+            "blob_url": article.get("blob_url"),
+            "chunks_blob_url": article.get("chunks_blob_url"),
+            "has_text": text is not None,
+            "length": sum(term_counts.values()),
+        }
+
+        with self._lock:
+            with self._file_lock():
+                with open(os.path.join(self.directory, PENDING_FILE), "a") as file:
+                    file.write(
+                        json.dumps({"document": document, "terms": term_counts}) + "\n"
+                    )
+
+            local_id = self.buffer.add(document, term_counts)
+            self._make_latest(self.buffer, local_id, document)
+
+            if len(self.buffer.documents) >= self.flush_documents:
+                self.flush()
+
+        return True
+
+    def flush(self):
+        """
+        Write every worker's pending documents to a new segment, merging if
+        there are many
+        """
+        with self._lock, self._file_lock():
+            # Pick up the segments and pending documents of other workers, so
+            # their files are neither overwritten nor dropped
+            self._load()
+            if not self.buffer.documents:
+                return
+
+            name = f"segment-{self.next_segment:06d}"
+            _write_segment(
+                self.directory,
+                name,
+                self.buffer.documents,
+                {
+                    term: np.array(postings, dtype=np.uint32)
+                    for term, postings in self.buffer.terms.items()
+                },
+            )
+            segment = _Segment(self.directory, name)
+            segment.live[:] = self.buffer.live
+            for doi, (source, local_id) in self.latest.items():
+                if source is self.buffer:
+                    self.latest[doi] = (segment, local_id)
+
+            self.segments.append(segment)
+            self.buffer = _Buffer()
+            self.next_segment += 1
+
+            if len(self.segments) > self.max_segments:
+                self._merge()
+            else:
+                self._write_manifest()
+
+            # Buffered documents are now in the manifest's segments
+            os.remove(os.path.join(self.directory, PENDING_FILE))
+
+    def _merge(self):
+        """Rewrite every segment as one, dropping superseded documents"""
+        documents = []
+        remaps = []
+        for segment in self.segments:
+            remap = np.full(len(segment.documents), -1, dtype=np.int64)
+            live_ids = np.flatnonzero(segment.live)
+            remap[live_ids] = np.arange(len(documents), len(documents) + len(live_ids))
+            documents.extend(segment.documents[local_id] for local_id in live_ids)
+            remaps.append(remap)
+
+        term_postings = {}
+        for term in set().union(*(segment.terms for segment in self.segments)):
+            arrays = []
+            for segment, remap in zip(self.segments, remaps):
+                postings = segment.postings_for(term)
+                if postings is None:
+                    continue
+                new_ids = remap[postings[:, 0]]
+                kept = new_ids >= 0
+                if kept.any():
+                    arrays.append(np.column_stack([new_ids[kept], postings[kept, 1]]))
+            if arrays:
+                term_postings[term] = np.concatenate(arrays)
+
+        name = f"segment-{self.next_segment:06d}"
+        _write_segment(self.directory, name, documents, term_postings)
+        merged = _Segment(self.directory, name)
+        old_segments = self.segments
+
+        self.segments = [merged]
+        self.next_segment += 1
+        self.latest = {
+            document["doi"]: (merged, local_id)
+            for local_id, document in enumerate(merged.documents)
+        }
+        self._write_manifest()
+
+        for segment in old_segments:
+            for suffix in (".docs.json", ".terms.json", ".postings.npy"):
+                os.remove(os.path.join(self.directory, segment.name + suffix))
+        logger.info(
+            f"Merged {len(old_segments)} search index segments into {len(documents)} documents"
+        )
+
+    def _write_manifest(self):
+        manifest = {
+            "segments": [segment.name for segment in self.segments],
+            "next_segment": self.next_segment,
+        }
+        path = os.path.join(self.directory, MANIFEST_FILE)
+        with open(f"{path}.tmp", "w") as file:
+            json.dump(manifest, file)
+        os.replace(f"{path}.tmp", path)
+
+    def search(self, query, limit=10):
+        """
+        Rank indexed articles against query with BM25
+
+        Returns:
+            list: Document dicts with a score, best first
+        """
+        terms = set(tokenize(query))
+
+        with self._lock:
+            if not terms or not self.document_count:
+                return []
+
+            average_length = self.total_length / self.document_count or 1.0
+            sources = [*self.segments, self.buffer]
+            postings = {
+                term: [source.postings_for(term) for source in sources]
+                for term in terms
+            }
+
+            idf = {}
+            for term, source_postings in postings.items():
+                frequency = sum(
+                    int(np.count_nonzero(np.asarray(source.live)[found[:, 0]]))
+                    for source, found in zip(sources, source_postings)
+                    if found is not None
+                )
+                idf[term] = math.log(
+                    1 + (self.document_count - frequency + 0.5) / (frequency + 0.5)
+                )
+
+            candidates = []
+            for source_index, source in enumerate(sources):
+                if not source.documents:
+                    continue
+                scores = np.zeros(len(source.documents), dtype=np.float32)
+                norms = self.k1 * (
+                    1 - self.b + self.b * source.lengths / average_length
+                )
+
+                for term in terms:
+                    found = postings[term][source_index]
+                    if found is None:
+                        continue
+                    # A term lists each document once, so this does not collide
+                    ids = found[:, 0].astype(np.int64)
+                    frequencies = found[:, 1].astype(np.float32)
+                    scores[ids] += (
+                        idf[term]
+                        * frequencies
+                        * (self.k1 + 1)
+                        / (frequencies + norms[ids])
+                    )
+
+                scores[~np.asarray(source.live)] = 0
+                matches = np.flatnonzero(scores > 0)
+                if len(matches) > limit:
+                    matches = matches[np.argpartition(-scores[matches], limit)[:limit]]
+                candidates.extend(
+                    (float(scores[local_id]), source.documents[local_id])
+                    for local_id in matches
+                )
+
+        candidates.sort(key=lambda candidate: candidate[0], reverse=True)
+        return [{**document, "score": score} for score, document in candidates[:limit]]
+
+    def stats(self):
+        with self._lock:
+            return {
+                "documents": self.document_count,
+                "segments": len(self.segments),
+                "buffered": len(self.buffer.documents),
+            }
+
+    def close(self):
+        self.flush()
+
+
+def _default_index_path():
+    return os.path.join(os.getenv("JOURNAL_ARTICLE_DIRECTORY", "."), "search_index")
+
+
+# Global index, so every request searches and adds to the same files
+search_index = None
+
+
+def get_search_index():
+    """
+    Returns the process-wide search index, loading it if needed, or None
+    when it is disabled in config.yaml
+    """
+    global search_index
+    if search_index is None:
+        settings = {
+            **DEFAULT_INDEX_SETTINGS,
+            **load_config().get("search_index", {}),
+        }
+        if not settings["enabled"]:
+            return None
+        search_index = SearchIndex(
+            settings["path"] or _default_index_path(),
+            flush_documents=settings["flush_documents"],
+            max_segments=settings["max_segments"],
+            k1=settings["k1"],
+            b=settings["b"],
+        )
+    return search_index
+
+
+def close_search_index():
+    """
+    Writes buffered documents to disk and drops the process-wide index
+    """
+    global search_index
+    if search_index is not None:
+        search_index.close()
+        search_index = None
+        logger.info("Search index flushed")
+
+
+def init_search_index(app: FastAPI):
+    """
+    Load the search index on startup and flush it on shutdown
+    """
+
+    @app.on_event("startup")
+    async def startup_search_index():
+        get_search_index()
+
+    @app.on_event("shutdown")
+    async def shutdown_search_index():
+        close_search_index()
@@ -1,10 +1,36 @@
+import asyncio
+import json
+import logging
 import os
-from azure.storage.blob import BlobServiceClient, ContentSettings
+from azure.core import MatchConditions
+from azure.core.exceptions import (
+    ResourceExistsError,
+    ResourceModifiedError,
+    ResourceNotFoundError,
+)
+from azure.storage.blob import ContentSettings
+from azure.storage.blob.aio import BlobServiceClient as AsyncBlobServiceClient
 from dotenv import load_dotenv
+from fastapi import FastAPI
+from app.v1.utils.config import load_config
 
+logger = logging.getLogger(__name__)
 
-class AzureBlobStorageClient:
-    def __init__(self):
+DEFAULT_STORAGE_SETTINGS = {
+    "max_block_size": 4194304,
+    "max_single_put_size": 8388608,
+    "max_concurrency": 4,
+    "batch_concurrency": 8,
+}
+
+
+class AsyncAzureBlobStorageClient:
+    """
+    Azure Blob Storage client built on the SDK's aio clients, so uploads do
+    not occupy threads from the default pool
+    """
+
+    def __init__(self, storage_config=None):
         load_dotenv()
 
         # Get connection string from environment variable
@@ -17,35 +43,225 @@ class AzureBlobStorageClient:
         self.account_name = os.getenv("STORAGE_ACCOUNT_NAME")
         self.container_name = os.getenv("STORAGE_CONTAINER_NAME")
 
-        # Create the BlobServiceClient
-        self.blob_service_client = BlobServiceClient.from_connection_string(
-            self.connection_string
+        if storage_config is None:
+            storage_config = load_config().get("storage", {})
+        settings = {**DEFAULT_STORAGE_SETTINGS, **storage_config}
+
+        self.max_concurrency = settings["max_concurrency"]
+        self.batch_concurrency = settings["batch_concurrency"]
+
+        # Block sizes are client-level settings in the SDK
+        self.blob_service_client = AsyncBlobServiceClient.from_connection_string(
+            self.connection_string,
+            max_block_size=settings["max_block_size"],
+            max_single_put_size=settings["max_single_put_size"],
         )
         self.container_client = self.blob_service_client.get_container_client(
             self.container_name
         )
 
-    def upload_pdf_from_memory(self, file_content, blob_name):
+    async def get_existing_blob_url(self, blob_name):
         """
-        Uploads a PDF file from memory to Azure Blob Storage
+        Checks whether a blob already exists with a metadata-only request
+
+        Args:
+            blob_name (str): Name of the blob
+
+        Returns:
+            str | None: URL of the blob, or None if it does not exist
+        """
+        blob_client = self.container_client.get_blob_client(blob_name)
+
+        try:
+            await blob_client.get_blob_properties()
+        except ResourceNotFoundError:
+            return None
+
+        return blob_client.url
+
+    async def get_existing_blob_urls(self, blob_names):
+        """
+        Runs get_existing_blob_url for many blobs concurrently
+
+        Returns:
+            list: URL, None or the raised exception for each blob, in input order
+        """
+        semaphore = asyncio.Semaphore(self.batch_concurrency)
+
+        async def check(blob_name):
+            async with semaphore:
+                return await self.get_existing_blob_url(blob_name)
+
+        return await asyncio.gather(
+            *[check(blob_name) for blob_name in blob_names], return_exceptions=True
+        )
+
+    async def upload_pdf_from_memory(
+        self,
+        file_content,
+        blob_name,
+        metadata=None,
+        overwrite=True,
+        max_concurrency=None,
+    ):
+        """
+        Uploads a PDF file from memory to Azure Blob Storage. Content larger
+        than max_single_put_size is split into blocks uploaded in parallel.
 
         Args:
             file_content (bytes): PDF file content
             blob_name (str): Name to use for the blob
+            metadata (dict): Optional blob metadata, e.g. the content hash
+            overwrite (bool): Replace an existing blob with the same name
+            max_concurrency (int): Parallel block uploads for this blob
 
         Returns:
             str: URL of the uploaded blob
         """
-        # Create a blob client
         blob_client = self.container_client.get_blob_client(blob_name)
+        content_settings = ContentSettings(content_type="application/pdf")
+
+        try:
+            await blob_client.upload_blob(
+                file_content,
+                overwrite=overwrite,
+                content_settings=content_settings,
+                metadata=metadata,
+                max_concurrency=max_concurrency or self.max_concurrency,
+            )
+        except ResourceExistsError:
+            pass
+
+        return blob_client.url
+
+    async def upload_pdfs(self, uploads, overwrite=True, max_concurrency=None):
+        """
+        Uploads many PDFs concurrently, at most batch_concurrency at a time
+
+        Args:
+            uploads (list): Dicts with file_content, blob_name and optional metadata
+            overwrite (bool): Replace existing blobs with the same name
+            max_concurrency (int): Parallel block uploads per blob
+
+        Returns:
+            list: URL or the raised exception for each upload, in input order
+        """
+        semaphore = asyncio.Semaphore(self.batch_concurrency)
+
+        async def upload(item):
+            async with semaphore:
+                return await self.upload_pdf_from_memory(
+                    item["file_content"],
+                    item["blob_name"],
+                    metadata=item.get("metadata"),
+                    overwrite=overwrite,
+                    max_concurrency=max_concurrency,
+                )
+
+        return await asyncio.gather(
+            *[upload(item) for item in uploads], return_exceptions=True
+        )
+
+    async def stage_block(self, blob_name, block_id, data):
+        """
+        Stages one block of a blob. Staged blocks stay invisible until they
+        are committed, and uncommitted blocks are discarded by Azure.
+        """
+        blob_client = self.container_client.get_blob_client(blob_name)
+        await blob_client.stage_block(block_id=block_id, data=data)
+
+    async def commit_blocks(self, blob_name, block_ids, metadata=None):
+        """
+        Commits staged blocks as a PDF blob, unless the blob already exists
 
-        # Set content settings for PDF
+        Returns:
+            str: URL of the blob
+        """
+        blob_client = self.container_client.get_blob_client(blob_name)
         content_settings = ContentSettings(content_type="application/pdf")
 
-        # Upload the file from memory
-        blob_client.upload_blob(
-            file_content, overwrite=True, content_settings=content_settings
+        try:
+            await blob_client.commit_block_list(
+                block_ids,
+                content_settings=content_settings,
+                metadata=metadata,
+                match_condition=MatchConditions.IfMissing,
+            )
+        except (ResourceExistsError, ResourceModifiedError):
+            pass
+
+        return blob_client.url
+
+    async def download_blob_to_file(self, blob_name, path):
+        """
+        Streams a blob into a local file, so large PDFs are not held in memory.
+        File calls run in a thread, so a slow disk does not stall the loop.
+        """
+        blob_client = self.container_client.get_blob_client(blob_name)
+        downloader = await blob_client.download_blob(
+            max_concurrency=self.max_concurrency
+        )
+        file = await asyncio.to_thread(open, path, "wb")
+        try:
+            async for chunk in downloader.chunks():
+                await asyncio.to_thread(file.write, chunk)
+        finally:
+            await asyncio.to_thread(file.close)
+
+    async def upload_json(self, data, blob_name, metadata=None, overwrite=True):
+        """
+        Uploads a JSON document, e.g. the extracted text stored beside a PDF
+
+        Returns:
+            str: URL of the uploaded blob
+        """
+        blob_client = self.container_client.get_blob_client(blob_name)
+        content_settings = ContentSettings(content_type="application/json")
+
+        await blob_client.upload_blob(
+            json.dumps(data).encode("utf-8"),
+            overwrite=overwrite,
+            content_settings=content_settings,
+            metadata=metadata,
+            max_concurrency=self.max_concurrency,
         )
 
-        # Return the URL to the blob
         return blob_client.url
+
+    async def close(self):
+        await self.blob_service_client.close()
+
+
+# Global async storage client, so one container client serves the process
+async_storage_client = None
+
+
+def get_async_storage_client():
+    """
+    Returns the process-wide async storage client, creating it if needed
+    """
+    global async_storage_client
+    if async_storage_client is None:
+        async_storage_client = AsyncAzureBlobStorageClient()
+    return async_storage_client
+
+
+async def close_async_storage_client():
+    """
+    Closes the process-wide async storage client
+    """
+    global async_storage_client
+    if async_storage_client is not None:
+        await async_storage_client.close()
+        async_storage_client = None
+        logger.info("Azure Blob Storage client closed")
+
+
+def init_storage(app: FastAPI):
+    """
+    Close the shared storage client's connections on shutdown
+    """
+
+    @app.on_event("shutdown")
+    async def shutdown_storage_client():
+        await close_async_storage_client()
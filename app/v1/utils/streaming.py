@@ -0,0 +1,18 @@
+import json
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+SSE_MEDIA_TYPE = "text/event-stream"
+
+# Stop proxies such as nginx from buffering the stream
+STREAMING_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+def format_ndjson(record):
+    """Serialize a record as one line of newline-delimited JSON"""
+    return json.dumps(record, default=str) + "\n"
+
+
+def format_sse(record, event=None):
+    """Serialize a record as one server-sent event"""
+    message = f"event: {event}\n" if event else ""
+    return message + f"data: {json.dumps(record, default=str)}\n\n"
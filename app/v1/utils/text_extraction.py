@@ -0,0 +1,113 @@
+import asyncio
+import functools
+import logging
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from fastapi import FastAPI
+from app.v1.utils.config import load_config
+from app.v1.utils.pdf_text import process_pdf
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TEXT_SETTINGS = {
+    "enabled": False,
+    # Worker processes; None uses every core
+    "max_workers": None,
+    "chunk_size": 2000,
+    "chunk_overlap": 200,
+}
+
+
+class TextExtractor:
+    """
+    Extracts and chunks PDFs in a pool of worker processes, so CPU-heavy
+    parsing scales with cores and stays off the event loop
+    """
+
+    def __init__(self, text_config=None):
+        if text_config is None:
+            text_config = load_config().get("text_extraction", {})
+        settings = {**DEFAULT_TEXT_SETTINGS, **text_config}
+
+        self.enabled = settings["enabled"]
+        self.max_workers = settings["max_workers"] or multiprocessing.cpu_count()
+        self.chunk_size = settings["chunk_size"]
+        self.chunk_overlap = settings["chunk_overlap"]
+        self.executor = None
+
+    def _get_executor(self):
+        if self.executor is None:
+            # Forking a process that runs the event loop and logging threads
+            # is unsafe, so workers are spawned fresh
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self.executor
+
+    async def process(self, path):
+        """
+        Extract and chunk the PDF at path in a worker process
+
+        Returns:
+            dict: process_pdf's result, with the time spent waiting for a
+            worker added to its timings as queue_seconds
+        """
+        start = time.perf_counter()
+        result = await asyncio.get_running_loop().run_in_executor(
+            self._get_executor(),
+            functools.partial(
+                process_pdf,
+                path,
+                chunk_size=self.chunk_size,
+                chunk_overlap=self.chunk_overlap,
+            ),
+        )
+
+        timings = result["timings"]
+        worker_seconds = timings["extract_seconds"] + timings["chunk_seconds"]
+        timings["queue_seconds"] = max(
+            0.0, time.perf_counter() - start - worker_seconds
+        )
+        return result
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+
+# Global extractor, so one process pool serves every request
+text_extractor = None
+
+
+def get_text_extractor():
+    """
+    Returns the process-wide text extractor, creating it if needed
+    """
+    global text_extractor
+    if text_extractor is None:
+        text_extractor = TextExtractor()
+    return text_extractor
+
+
+def close_text_extractor():
+    """
+    Shuts down the process-wide text extractor's worker processes
+    """
+    global text_extractor
+    if text_extractor is not None:
+        text_extractor.close()
+        text_extractor = None
+        logger.info("Text extraction workers stopped")
+
+
+def init_text_extraction(app: FastAPI):
+    """
+    Stop the text extraction worker processes on shutdown
+    """
+
+    @app.on_event("shutdown")
+    async def shutdown_text_extraction():
+        close_text_extractor()
@@ -1,20 +1,48 @@
 import aiohttp
+import contextlib
+import fcntl
+import hashlib
+import os
+import re
 import ssl
 import string
 
+DOI_PREFIXES = (
+    "https://doi.org/",
+    "http://doi.org/",
+    "https://dx.doi.org/",
+    "http://dx.doi.org/",
+    "doi:",
+)
 
-def create_ssl_context():
+
+def create_ssl_context(**connector_kwargs):
     # Create a custom SSL context that doesn't verify certificates
     ssl_context = ssl.create_default_context()
     ssl_context.check_hostname = False
     ssl_context.verify_mode = ssl.CERT_NONE
 
-    # Configure the client session with the SSL context
-    connector = aiohttp.TCPConnector(ssl=ssl_context)
+    # Configure the client session with the SSL context and any pool settings
+    connector = aiohttp.TCPConnector(ssl=ssl_context, **connector_kwargs)
 
     return connector
 
 
+@contextlib.contextmanager
+def file_lock(path):
+    """
+    Hold an exclusive advisory lock on path, creating it if needed, so files
+    shared by several worker processes are updated one process at a time
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
 def filter_valid_results(results):
     return [
         result for result in results if result and not isinstance(result, Exception)
@@ -28,3 +56,37 @@ def create_file_name(title):
         title.translate(remove_punctuation).lower().replace(" ", "_").lower()[0:40]
         + ".pdf"
     )
+
+
+def normalize_doi(doi):
+    """Lowercase a DOI and strip any resolver URL or doi: prefix"""
+    normalized = doi.strip().lower()
+    for prefix in DOI_PREFIXES:
+        if normalized.startswith(prefix):
+            normalized = normalized[len(prefix) :]
+    return normalized
+
+
+def create_blob_name(doi):
+    """
+    Build a stable blob name from a DOI. The readable part is truncated and
+    made URL-safe, so a short hash of the full DOI keeps names unique.
+    """
+    normalized = normalize_doi(doi)
+    readable = re.sub(r"[^a-z0-9._-]+", "_", normalized)[0:80]
+    doi_hash = hashlib.sha256(normalized.encode("utf-8")).hexdigest()[0:12]
+
+    return f"{readable}-{doi_hash}.pdf"
+
+
+def create_chunks_blob_name(pdf_blob_name):
+    """Name of the JSON blob holding a stored PDF's text chunks"""
+    return pdf_blob_name.removesuffix(".pdf") + ".chunks.json"
+
+
+def hash_content(content):
+    return hashlib.sha256(content).hexdigest()
+
+
+def is_pdf(content):
+    return bytes(content[0:4]) == b"%PDF"
@@ -0,0 +1,366 @@
+"""
+Local stand-ins for every upstream service the API calls, so benchmarks run
+offline with controlled latency, error rates and payload sizes
+"""
+
+import asyncio
+import hashlib
+import json
+import random
+import string
+import time
+from dataclasses import dataclass, field
+from email.utils import formatdate
+from aiohttp import web
+
+UPSTREAMS = ("crossref", "unpaywall", "pdf", "blob", "openai")
+
+# Bytes of the fake PDF body, and of Crossref abstracts and chat completions
+DEFAULT_PAYLOAD_BYTES = {
+    "crossref": 1024,
+    "unpaywall": 0,
+    "pdf": 262144,
+    "blob": 0,
+    "openai": 400,
+}
+
+# Advertised like Crossref's polite pool; the fake does not enforce it
+CROSSREF_RATE_LIMIT = 50
+
+BLOB_ACCOUNT = "devstoreaccount1"
+# Well-known Azurite development key; the fake blob service ignores signatures
+BLOB_ACCOUNT_KEY = (
+    "Eby8vdM02xNOcqFlqUwJPLlmEtlCDXJ1OUzFT50uSRZ6IFsuFq2UVErCz4I6tq/"
+    "K1SZFPTOtr/KBHBeksoGMGw=="
+)
+
+
+@dataclass
+class UpstreamSettings:
+    latency_ms: float = 20
+    error_rate: float = 0.0
+    payload_bytes: int = 0
+
+
+@dataclass
+class FakeUpstreamConfig:
+    upstreams: dict = field(
+        default_factory=lambda: {
+            name: UpstreamSettings(payload_bytes=DEFAULT_PAYLOAD_BYTES[name])
+            for name in UPSTREAMS
+        }
+    )
+    # Articles per Crossref page, each with one PDF location in Unpaywall
+    articles_per_query: int = 5
+    seed: int = 0
+
+    def settings(self, name):
+        return self.upstreams[name]
+
+
+class FakeUpstreams:
+    """
+    Runs one aiohttp server per upstream on 127.0.0.1 and exposes the base
+    URLs and environment variables that point the API at them
+    """
+
+    def __init__(self, config=None):
+        self.config = config or FakeUpstreamConfig()
+        self.random = random.Random(self.config.seed)
+        self.runners = {}
+        self.urls = {}
+        self.requests = {name: 0 for name in UPSTREAMS}
+        self.blobs = {}
+
+    async def start(self):
+        apps = {
+            "crossref": self._crossref_app(),
+            "unpaywall": self._unpaywall_app(),
+            "pdf": self._pdf_app(),
+            "blob": self._blob_app(),
+            "openai": self._openai_app(),
+        }
+
+        for name, app in apps.items():
+            runner = web.AppRunner(app, access_log=None)
+            await runner.setup()
+            site = web.TCPSite(runner, "127.0.0.1", 0)
+            await site.start()
+            port = site._server.sockets[0].getsockname()[1]
+            self.runners[name] = runner
+            self.urls[name] = f"http://127.0.0.1:{port}"
+
+    async def stop(self):
+        for runner in self.runners.values():
+            await runner.cleanup()
+        self.runners = {}
+
+    def environment(self):
+        """Environment variables that send every upstream call to the fakes"""
+        return {
+            "CROSSREF_BASE_URL": f"{self.urls['crossref']}/works",
+            "UNPAYWALL_BASE_URL": f"{self.urls['unpaywall']}/v2",
+            "EMAIL": "benchmark@example.com",
+            "AZURE_STORAGE_CONNECTION_STRING": (
+                "DefaultEndpointsProtocol=http;"
+                f"AccountName={BLOB_ACCOUNT};AccountKey={BLOB_ACCOUNT_KEY};"
+                f"BlobEndpoint={self.urls['blob']}/{BLOB_ACCOUNT};"
+            ),
+            "STORAGE_ACCOUNT_NAME": BLOB_ACCOUNT,
+            "STORAGE_CONTAINER_NAME": "papers",
+            "AZURE_OPENAI_API_KEY": "benchmark-key",
+            "AZURE_OPENAI_ENDPOINT": self.urls["openai"],
+            "AZURE_OPENAI_VERSION": "2024-10-21",
+            "BENCHMARK_PDF_BASE_URL": f"{self.urls['pdf']}/pdf",
+        }
+
+    async def _simulate(self, name):
+        """
+        Apply the configured latency, then return an error response for the
+        configured share of requests
+
+        Returns:
+            web.Response | None: The error response, if this request fails
+        """
+        settings = self.config.settings(name)
+        self.requests[name] += 1
+
+        if settings.latency_ms:
+            await asyncio.sleep(settings.latency_ms / 1000)
+
+        if settings.error_rate and self.random.random() < settings.error_rate:
+            return web.json_response(
+                {"error": {"code": "503", "message": f"Fake {name} failure"}},
+                status=503,
+            )
+        return None
+
+    def _filler(self, size):
+        return ("lorem ipsum " * (size // 12 + 1))[:size]
+
+    def _words(self, seed, size):
+        """
+        Random lowercase words seeded by seed, so every DOI gets its own text
+        and near-duplicate detection keeps each paper
+        """
+        rng = random.Random(seed)
+        words = []
+        length = 0
+        while length < size:
+            word = "".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 9)))
+            words.append(word)
+            length += len(word) + 1
+        return " ".join(words)[:size]
+
+    # Crossref
+
+    def _crossref_app(self):
+        app = web.Application()
+        app.router.add_get("/works", self._crossref_works)
+        return app
+
+    async def _crossref_works(self, request):
+        error = await self._simulate("crossref")
+        if error:
+            return error
+
+        query = request.query.get("query", "")
+        rows = min(int(request.query.get("rows", 10)), self.config.articles_per_query)
+        # DOIs depend on the query, so distinct queries download distinct papers.
+        # Titles and abstracts differ per DOI too, or dedup would merge them
+        prefix = hashlib.sha1(query.encode()).hexdigest()[:12]
+        abstract_bytes = self.config.settings("crossref").payload_bytes
+
+        items = []
+        for i in range(rows):
+            doi = f"10.5555/{prefix}.{i}"
+            items.append(
+                {
+                    "DOI": doi,
+                    "title": [f"Benchmark paper {self._words(f'title {doi}', 40)}"],
+                    "author": [{"given": "Ada", "family": "Lovelace"}],
+                    "published": {"date-parts": [[2024, 1, 1]]},
+                    "URL": f"https://doi.org/{doi}",
+                    "abstract": self._words(doi, abstract_bytes),
+                }
+            )
+
+        return web.json_response(
+            headers={
+                "X-Rate-Limit-Limit": str(CROSSREF_RATE_LIMIT),
+                "X-Rate-Limit-Interval": "1s",
+            },
+            data={
+                "status": "ok",
+                "message-type": "work-list",
+                "message": {
+                    "total-results": len(items),
+                    "items-per-page": rows,
+                    "items": items,
+                },
+            },
+        )
+
+    # Unpaywall
+
+    def _unpaywall_app(self):
+        app = web.Application()
+        app.router.add_get("/v2/{doi:.+}", self._unpaywall_record)
+        return app
+
+    async def _unpaywall_record(self, request):
+        error = await self._simulate("unpaywall")
+        if error:
+            return error
+
+        doi = request.match_info["doi"]
+        location = {"url_for_pdf": f"{self.urls['pdf']}/pdf/{doi}"}
+        return web.json_response(
+            {
+                "doi": doi,
+                "is_oa": True,
+                "best_oa_location": location,
+                "oa_locations": [location],
+            }
+        )
+
+    # PDF hosts
+
+    def _pdf_app(self):
+        app = web.Application()
+        app.router.add_get("/pdf/{doi:.+}", self._pdf)
+        return app
+
+    async def _pdf(self, request):
+        error = await self._simulate("pdf")
+        if error:
+            return error
+
+        size = max(self.config.settings("pdf").payload_bytes, 8)
+        body = b"%PDF-1.4\n" + b"0" * (size - 9)
+        return web.Response(body=body, content_type="application/pdf")
+
+    # Azure Blob Storage
+
+    def _blob_app(self):
+        app = web.Application(client_max_size=1024**3)
+        path = f"/{BLOB_ACCOUNT}/{{container}}/{{blob:.+}}"
+        app.router.add_route("HEAD", path, self._blob_properties)
+        app.router.add_put(path, self._blob_put)
+        return app
+
+    def _blob_headers(self):
+        return {
+            "ETag": f'"0x{time.time_ns():X}"',
+            "Last-Modified": formatdate(usegmt=True),
+            "x-ms-request-id": str(self.requests["blob"]),
+            "x-ms-version": "2025-01-05",
+        }
+
+    def _blob_error(self, status, code):
+        headers = {**self._blob_headers(), "x-ms-error-code": code}
+        return web.Response(status=status, headers=headers)
+
+    async def _blob_properties(self, request):
+        error = await self._simulate("blob")
+        if error:
+            return error
+
+        key = request.path
+        if key not in self.blobs:
+            return self._blob_error(404, "BlobNotFound")
+
+        return web.Response(
+            status=200,
+            headers={
+                **self._blob_headers(),
+                "Content-Length": str(self.blobs[key]),
+                "Content-Type": "application/pdf",
+                "x-ms-blob-type": "BlockBlob",
+            },
+        )
+
+    async def _blob_put(self, request):
+        error = await self._simulate("blob")
+        if error:
+            return error
+
+        key = request.path
+        body = await request.read()
+        comp = request.query.get("comp")
+
+        if comp == "block":
+            return web.Response(status=201, headers=self._blob_headers())
+
+        if request.headers.get("If-None-Match") == "*" and key in self.blobs:
+            return self._blob_error(409, "BlobAlreadyExists")
+
+        # Only sizes are kept, so long runs do not hold every PDF in memory
+        self.blobs[key] = len(body)
+        return web.Response(status=201, headers=self._blob_headers())
+
+    # Azure OpenAI
+
+    def _openai_app(self):
+        app = web.Application()
+        app.router.add_post(
+            "/openai/deployments/{deployment}/chat/completions", self._completion
+        )
+        return app
+
+    async def _completion(self, request):
+        error = await self._simulate("openai")
+        if error:
+            return error
+
+        body = await request.json()
+        content = self._filler(self.config.settings("openai").payload_bytes)
+        usage = {
+            "prompt_tokens": sum(len(m["content"]) for m in body["messages"]) // 4,
+            "completion_tokens": len(content) // 4,
+            "total_tokens": 0,
+        }
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+        completion = {
+            "id": "chatcmpl-benchmark",
+            "created": int(time.time()),
+            "model": request.match_info["deployment"],
+        }
+
+        if not body.get("stream"):
+            return web.json_response(
+                {
+                    **completion,
+                    "object": "chat.completion",
+                    "choices": [
+                        {
+                            "index": 0,
+                            "finish_reason": "stop",
+                            "message": {"role": "assistant", "content": content},
+                        }
+                    ],
+                    "usage": usage,
+                }
+            )
+
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await response.prepare(request)
+
+        words = content.split(" ")
+        for i, word in enumerate(words):
+            delta = word if i == len(words) - 1 else word + " "
+            chunk = {
+                **completion,
+                "object": "chat.completion.chunk",
+                "choices": [{"index": 0, "delta": {"content": delta}}],
+            }
+            await response.write(f"data: {json.dumps(chunk)}\n\n".encode())
+
+        final = {
+            **completion,
+            "object": "chat.completion.chunk",
+            "choices": [],
+            "usage": usage,
+        }
+        await response.write(f"data: {json.dumps(final)}\n\ndata: [DONE]\n\n".encode())
+        return response
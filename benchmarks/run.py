@@ -0,0 +1,356 @@
+"""
+Load-tests the API against local fake upstreams and writes latency
+percentiles, throughput and peak RSS per scenario to a JSON file.
+
+    python -m benchmarks.run --concurrency 1,8,32 --requests 200 \\
+        --latency-ms pdf=100 --error-rate unpaywall=0.05 --output bench.json
+"""
+
+import argparse
+import asyncio
+import copy
+import datetime
+import json
+import os
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import aiohttp
+import yaml
+from benchmarks.fake_upstreams import (
+    UPSTREAMS,
+    FakeUpstreamConfig,
+    FakeUpstreams,
+)
+from app.v1.utils.config import CONFIG_PATH
+
+SCENARIOS = ("search_download", "chat", "chat_stream")
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    index = max(
+        0, min(len(sorted_values) - 1, round(fraction * len(sorted_values)) - 1)
+    )
+    return sorted_values[index]
+
+
+def summarize(scenario, concurrency, latencies, errors, elapsed, peak_rss_bytes):
+    latencies_ms = sorted(latency * 1000 for latency in latencies)
+    completed = len(latencies) + errors
+
+    return {
+        "scenario": scenario,
+        "concurrency": concurrency,
+        "requests": completed,
+        "errors": errors,
+        "error_rate": errors / completed if completed else 0.0,
+        "duration_seconds": elapsed,
+        "requests_per_second": completed / elapsed if elapsed else 0.0,
+        "latency_ms": {
+            "p50": percentile(latencies_ms, 0.50),
+            "p95": percentile(latencies_ms, 0.95),
+            "p99": percentile(latencies_ms, 0.99),
+            "mean": statistics.fmean(latencies_ms) if latencies_ms else None,
+            "max": latencies_ms[-1] if latencies_ms else None,
+        },
+        "peak_rss_bytes": peak_rss_bytes,
+    }
+
+
+def read_peak_rss(pid):
+    """Peak resident set size of a process from /proc (Linux only)"""
+    try:
+        with open(f"/proc/{pid}/status") as file:
+            for line in file:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def reset_peak_rss(pid):
+    """Start a new peak RSS measurement for the process, where supported"""
+    try:
+        with open(f"/proc/{pid}/clear_refs", "w") as file:
+            file.write("5")
+    except OSError:
+        pass
+
+
+def parse_overrides(values, cast):
+    """Parse repeated upstream=value options into a dict"""
+    overrides = {}
+    for value in values or []:
+        name, _, setting = value.partition("=")
+        if name not in UPSTREAMS:
+            raise SystemExit(f"Unknown upstream '{name}', expected one of {UPSTREAMS}")
+        overrides[name] = cast(setting)
+    return overrides
+
+
+def build_fake_config(args):
+    fake_config = FakeUpstreamConfig(
+        articles_per_query=args.articles_per_query, seed=args.seed
+    )
+    for option, attribute, cast in (
+        (args.latency_ms, "latency_ms", float),
+        (args.error_rate, "error_rate", float),
+        (args.payload_bytes, "payload_bytes", int),
+    ):
+        for name, value in parse_overrides(option, cast).items():
+            setattr(fake_config.upstreams[name], attribute, value)
+    return fake_config
+
+
+def write_benchmark_config(path, paced=False):
+    """
+    Copy config.yaml with the persistent cache tier off and the chat rate
+    limit lifted, so results measure the API rather than MongoDB or quota.
+
+    Unless paced, per-host pacing is lifted too: each fake serves from a
+    single host what would really come from many publishers.
+    """
+    with open(CONFIG_PATH) as file:
+        benchmark_config = copy.deepcopy(yaml.safe_load(file))
+
+    if not paced:
+        for settings in benchmark_config.get("http", {}).values():
+            settings.update(rate_per_second=None, max_in_flight=10**6)
+
+    benchmark_config.setdefault("cache", {})["persistent"] = False
+    benchmark_config["openai"]["rate_limit"] = {
+        **benchmark_config["openai"].get("rate_limit", {}),
+        "requests_per_minute": 10**9,
+        "tokens_per_minute": 10**12,
+    }
+
+    with open(path, "w") as file:
+        yaml.safe_dump(benchmark_config, file)
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def make_request(scenario, concurrency, index, args):
+    """Returns (path, JSON body) for the index-th request of a run"""
+    # Payloads are unique across runs unless --reuse-payloads, so the search
+    # and chat caches do not hide upstream work
+    key = "0" if args.reuse_payloads else f"{scenario}-{concurrency}-{index}"
+
+    if scenario == "search_download":
+        return "/api/v1/search_download_articles/", {
+            "query": f"benchmark query {key}",
+            "max_articles": args.articles_per_query,
+        }
+
+    return "/api/v1/chat/", {
+        "system_message": "You triage research abstracts.",
+        "user_message": f"Is abstract {key} relevant to graph neural networks?",
+        "stream": scenario == "chat_stream",
+    }
+
+
+async def run_scenario(session, base_url, scenario, concurrency, args):
+    latencies = []
+    errors = 0
+    next_index = 0
+
+    async def worker():
+        nonlocal errors, next_index
+        while next_index < args.requests:
+            index = next_index
+            next_index += 1
+            path, body = make_request(scenario, concurrency, index, args)
+
+            start = time.perf_counter()
+            try:
+                async with session.post(base_url + path, json=body) as response:
+                    await response.read()
+                    ok = response.status == 200
+            except aiohttp.ClientError:
+                ok = False
+
+            if ok:
+                latencies.append(time.perf_counter() - start)
+            else:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    return latencies, errors, time.perf_counter() - start
+
+
+async def wait_until_ready(session, base_url, server, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError("API server exited during startup")
+        try:
+            async with session.get(f"{base_url}/metrics") as response:
+                if response.status == 200:
+                    return
+        except aiohttp.ClientError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError("API server did not start in time")
+
+
+async def run_benchmarks(args):
+    fakes = FakeUpstreams(build_fake_config(args))
+    await fakes.start()
+
+    work_directory = tempfile.TemporaryDirectory()
+    config_path = os.path.join(work_directory.name, "config.yaml")
+    write_benchmark_config(config_path, paced=args.paced)
+
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    env = {
+        **os.environ,
+        **fakes.environment(),
+        "JOURNAL_ARTICLE_DIRECTORY": work_directory.name,
+    }
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "benchmarks.serve",
+            "--port",
+            str(port),
+            "--config",
+            config_path,
+        ],
+        env=env,
+    )
+
+    results = []
+    connector = aiohttp.TCPConnector(limit=0)
+    timeout = aiohttp.ClientTimeout(total=args.timeout)
+
+    try:
+        async with aiohttp.ClientSession(
+            connector=connector, timeout=timeout
+        ) as session:
+            await wait_until_ready(session, base_url, server)
+
+            for scenario in args.scenarios:
+                for concurrency in args.concurrency:
+                    reset_peak_rss(server.pid)
+                    latencies, errors, elapsed = await run_scenario(
+                        session, base_url, scenario, concurrency, args
+                    )
+                    result = summarize(
+                        scenario,
+                        concurrency,
+                        latencies,
+                        errors,
+                        elapsed,
+                        read_peak_rss(server.pid),
+                    )
+                    results.append(result)
+                    print(
+                        f"{scenario:>16} c={concurrency:<4} "
+                        f"rps={result['requests_per_second']:8.1f} "
+                        f"p50={result['latency_ms']['p50'] or 0:8.1f}ms "
+                        f"p99={result['latency_ms']['p99'] or 0:8.1f}ms "
+                        f"errors={errors}",
+                        file=sys.stderr,
+                    )
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+        await fakes.stop()
+        work_directory.cleanup()
+
+    return {
+        "git_commit": git_commit(),
+        "created_at": datetime.datetime.utcnow().isoformat() + "Z",
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "settings": {
+            "requests_per_level": args.requests,
+            "articles_per_query": args.articles_per_query,
+            "reuse_payloads": args.reuse_payloads,
+            "paced": args.paced,
+            "upstreams": {
+                name: vars(settings)
+                for name, settings in fakes.config.upstreams.items()
+            },
+        },
+        "upstream_requests": fakes.requests,
+        "results": results,
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "--scenarios",
+        type=lambda value: value.split(","),
+        default=list(SCENARIOS),
+        help=f"Comma-separated subset of {','.join(SCENARIOS)}",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=lambda value: [int(level) for level in value.split(",")],
+        default=[1, 8, 32],
+        help="Comma-separated concurrency levels",
+    )
+    parser.add_argument("--requests", type=int, default=100, help="Per level")
+    parser.add_argument("--articles-per-query", type=int, default=5)
+    parser.add_argument("--reuse-payloads", action="store_true")
+    parser.add_argument(
+        "--paced", action="store_true", help="Keep config.yaml's per-host pacing"
+    )
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--latency-ms", action="append", metavar="UPSTREAM=MS", help="Repeatable"
+    )
+    parser.add_argument(
+        "--error-rate", action="append", metavar="UPSTREAM=RATE", help="Repeatable"
+    )
+    parser.add_argument(
+        "--payload-bytes", action="append", metavar="UPSTREAM=BYTES", help="Repeatable"
+    )
+    parser.add_argument("--output", default="bench_output.json")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    for scenario in args.scenarios:
+        if scenario not in SCENARIOS:
+            raise SystemExit(f"Unknown scenario '{scenario}'")
+
+    report = asyncio.run(run_benchmarks(args))
+
+    with open(args.output, "w") as file:
+        json.dump(report, file, indent=2)
+    print(f"Wrote {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
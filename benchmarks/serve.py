@@ -0,0 +1,89 @@
+"""
+Runs the API for benchmarks, with every upstream pointed at the fakes in
+benchmarks/fake_upstreams.py.
+
+MongoDB is not faked, so this app leaves out init_db and the errors router,
+and the benchmark config turns off the persistent cache tier. Everything else
+is wired as in main.py.
+"""
+
+import argparse
+import logging
+import os
+import urllib.request
+import uvicorn
+from fastapi import FastAPI
+from app.v1.utils import config
+
+
+def fake_doi2pdf(doi, output=None, **kwargs):
+    """Stand-in for the doi2pdf fallback that fetches from the fake PDF host"""
+    pdf_base_url = os.environ["BENCHMARK_PDF_BASE_URL"]
+    with urllib.request.urlopen(f"{pdf_base_url}/{doi}") as response:
+        content = response.read()
+    with open(output, "wb") as file:
+        file.write(content)
+
+
+def create_app():
+    from app.v1.client import download_articles as download_articles_client
+    from app.v1.client.openai_chat import init_openai_chat
+    from app.v1.client.search_jobs import init_search_jobs
+    from app.v1.endpoints import (
+        cache,
+        download_articles,
+        metrics,
+        openai_chat,
+        search_jobs,
+        search_local,
+    )
+    from app.v1.utils.http_sessions import init_http_sessions
+    from app.v1.utils.storage import init_storage
+    from app.v1.utils.text_extraction import init_text_extraction
+    from app.v1.utils.search_index import init_search_index
+    from app.v1.utils.dedup import init_dedup
+
+    download_articles_client.doi2pdf = fake_doi2pdf
+
+    app = FastAPI()
+
+    init_http_sessions(app)
+    init_storage(app)
+    init_text_extraction(app)
+    init_search_index(app)
+    init_dedup(app)
+    init_search_jobs(app)
+    init_openai_chat(app)
+
+    app.include_router(openai_chat.router, prefix="/api/v1", tags=["chat"])
+    app.include_router(
+        download_articles.router, prefix="/api/v1", tags=["search_download_articles"]
+    )
+    app.include_router(
+        search_jobs.router, prefix="/api/v1", tags=["search_download_jobs"]
+    )
+    app.include_router(search_local.router, prefix="/api/v1", tags=["search_local"])
+    app.include_router(cache.router, prefix="/api/v1", tags=["cache"])
+    app.include_router(metrics.router, tags=["metrics"])
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--port", type=int, required=True)
+    parser.add_argument("--config", required=True, help="Benchmark config.yaml")
+    args = parser.parse_args()
+
+    # Must be set before anything calls load_config
+    config.CONFIG_PATH = args.config
+
+    app = create_app()
+    # The app logs every upstream call at INFO, which would dominate a run
+    logging.getLogger().setLevel(logging.WARNING)
+
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
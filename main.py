@@ -1,10 +1,32 @@
 from fastapi import FastAPI, APIRouter
-from app.v1.endpoints import openai_chat, download_articles
+from app.v1.endpoints import (
+    openai_chat,
+    download_articles,
+    cache,
+    search_jobs,
+    errors,
+    metrics,
+    search_local,
+)
 from app.v1.db.events import init_db
+from app.v1.utils.http_sessions import init_http_sessions
+from app.v1.utils.storage import init_storage
+from app.v1.utils.text_extraction import init_text_extraction
+from app.v1.utils.search_index import init_search_index
+from app.v1.utils.dedup import init_dedup
+from app.v1.client.search_jobs import init_search_jobs
+from app.v1.client.openai_chat import init_openai_chat
 
 app = FastAPI()
 
 init_db(app)
+init_http_sessions(app)
+init_storage(app)
+init_text_extraction(app)
+init_search_index(app)
+init_dedup(app)
+init_search_jobs(app)
+init_openai_chat(app)
 
 router = APIRouter()
 
@@ -12,3 +34,9 @@ app.include_router(openai_chat.router, prefix="/api/v1", tags=["chat"])
 app.include_router(
     download_articles.router, prefix="/api/v1", tags=["search_download_articles"]
 )
+app.include_router(search_jobs.router, prefix="/api/v1", tags=["search_download_jobs"])
+app.include_router(search_local.router, prefix="/api/v1", tags=["search_local"])
+app.include_router(cache.router, prefix="/api/v1", tags=["cache"])
+app.include_router(errors.router, prefix="/api/v1", tags=["errors"])
+# Served outside /api/v1, where Prometheus scrapers look by default
+app.include_router(metrics.router, tags=["metrics"])
@@ -0,0 +1,100 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import aiohttp
+
+from app.v1.utils.dedup import Deduplicator
+from app.v1.utils.storage import AsyncAzureBlobStorageClient
+from benchmarks.fake_upstreams import FakeUpstreamConfig, FakeUpstreams
+from benchmarks.run import percentile, summarize
+
+
+class TestFakeUpstreams(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        config = FakeUpstreamConfig(articles_per_query=3)
+        for settings in config.upstreams.values():
+            settings.latency_ms = 0
+        self.fakes = FakeUpstreams(config)
+        await self.fakes.start()
+        self.addAsyncCleanup(self.fakes.stop)
+
+    async def test_crossref_and_unpaywall_point_at_pdf_host(self):
+        env = self.fakes.environment()
+        async with aiohttp.ClientSession() as session:
+            async with session.get(
+                env["CROSSREF_BASE_URL"], params={"query": "graphs", "rows": 10}
+            ) as response:
+                items = (await response.json())["message"]["items"]
+            async with session.get(
+                f"{env['UNPAYWALL_BASE_URL']}/{items[0]['DOI']}"
+            ) as response:
+                pdf_url = (await response.json())["best_oa_location"]["url_for_pdf"]
+            async with session.get(pdf_url) as response:
+                body = await response.read()
+
+        self.assertEqual(len(items), 3)
+        self.assertTrue(body.startswith(b"%PDF"))
+
+    async def test_crossref_papers_are_not_near_duplicates(self):
+        env = self.fakes.environment()
+        async with aiohttp.ClientSession() as session:
+            async with session.get(
+                env["CROSSREF_BASE_URL"], params={"query": "graphs", "rows": 10}
+            ) as response:
+                items = (await response.json())["message"]["items"]
+
+        with tempfile.TemporaryDirectory() as directory:
+            kept = (
+                Deduplicator(directory)
+                .session()
+                .deduplicate(
+                    [
+                        {
+                            "doi": item["DOI"],
+                            "title": item["title"],
+                            "abstract": item["abstract"],
+                        }
+                        for item in items
+                    ]
+                )
+            )
+
+        # Otherwise dedup collapses them and the download stage is not measured
+        self.assertEqual(len(kept), 3)
+
+    async def test_error_rate(self):
+        self.fakes.config.settings("pdf").error_rate = 1.0
+        async with aiohttp.ClientSession() as session:
+            async with session.get(f"{self.fakes.urls['pdf']}/pdf/10.1/x") as response:
+                self.assertEqual(response.status, 503)
+
+    async def test_blob_service_works_with_storage_client(self):
+        with patch.dict(os.environ, self.fakes.environment()):
+            storage_client = AsyncAzureBlobStorageClient()
+        self.addAsyncCleanup(storage_client.close)
+
+        self.assertIsNone(await storage_client.get_existing_blob_url("a.pdf"))
+        await storage_client.stage_block("a.pdf", "00000000", b"%PDF-1.4")
+        blob_url = await storage_client.commit_blocks("a.pdf", ["00000000"])
+        # Committing again is a no-op rather than an error
+        await storage_client.commit_blocks("a.pdf", ["00000000"])
+
+        self.assertEqual(await storage_client.get_existing_blob_url("a.pdf"), blob_url)
+
+
+class TestSummarize(unittest.TestCase):
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 0.5), 50)
+        self.assertEqual(percentile(values, 0.99), 99)
+        self.assertIsNone(percentile([], 0.5))
+
+    def test_summarize(self):
+        result = summarize("chat", 4, [0.1, 0.2, 0.3], 1, 2.0, 1024)
+
+        self.assertEqual(result["requests"], 4)
+        self.assertEqual(result["error_rate"], 0.25)
+        self.assertEqual(result["requests_per_second"], 2.0)
+        self.assertAlmostEqual(result["latency_ms"]["max"], 300)
@@ -0,0 +1,154 @@
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, MagicMock
+
+from app.v1.client.abstract_triage import AbstractTriage
+
+
+def make_article(doi, abstract="An abstract about graphs."):
+    return {"doi": doi, "title": [f"Title {doi}"], "abstract": abstract}
+
+
+def make_chat_client(*responses):
+    chat_client = MagicMock()
+    chat_client.achat_batch = AsyncMock(
+        side_effect=[
+            [{"response": response, "error": None} for response in batch]
+            for batch in responses
+        ]
+    )
+    return chat_client
+
+
+class TestAbstractTriage(unittest.IsolatedAsyncioTestCase):
+    def make_triage(self, chat_client=None, **settings):
+        return AbstractTriage(
+            chat_client=chat_client, triage_config={"enabled": True, **settings}
+        )
+
+    def test_pack_respects_article_limit_and_token_budget(self):
+        articles = [make_article(f"10.1/{i}") for i in range(5)]
+
+        by_count = self.make_triage(max_articles_per_prompt=2).pack("graphs", articles)
+        by_tokens = self.make_triage(prompt_token_budget=150).pack(
+            "graphs", [make_article(f"10.1/{i}", "x " * 200) for i in range(3)]
+        )
+
+        self.assertEqual([len(pack) for pack in by_count], [2, 2, 1])
+        self.assertEqual([len(pack) for pack in by_tokens], [1, 1, 1])
+
+    def test_format_article_strips_markup_and_truncates(self):
+        triage = self.make_triage(max_abstract_characters=10)
+
+        text = triage.format_article(
+            3, make_article("10.1/a", "<jats:p>Graph  theory</jats:p>")
+        )
+
+        self.assertEqual(text, "[3] Title 10.1/a\nGraph theo")
+
+    def test_parse_scores(self):
+        scores = AbstractTriage.parse_scores('Sure: {"1": 10, "3": 4, "x": 2}', 3)
+
+        self.assertEqual(scores, [1.0, None, 0.4])
+        with self.assertRaises(ValueError):
+            AbstractTriage.parse_scores("no scores", 1)
+
+    async def test_triage_keeps_relevant_articles(self):
+        chat_client = make_chat_client(['{"1": 8, "2": 2, "3": 5}'])
+        triage = self.make_triage(chat_client)
+        articles = [make_article(f"10.1/{i}") for i in range(3)]
+
+        relevant = await triage.triage("graphs", articles)
+
+        self.assertEqual([article["doi"] for article in relevant], ["10.1/0", "10.1/2"])
+        self.assertEqual(articles[1]["relevance_score"], 0.2)
+        self.assertIn(
+            "Query: graphs", chat_client.achat_batch.call_args.args[0][0].user_message
+        )
+
+    async def test_triage_sends_all_prompts_in_one_batch(self):
+        chat_client = make_chat_client(['{"1": 9}', '{"1": 9}', '{"1": 9}'])
+        triage = self.make_triage(chat_client, max_articles_per_prompt=1)
+
+        relevant = await triage.triage(
+            "graphs", [make_article(f"10.1/{i}") for i in range(3)]
+        )
+
+        self.assertEqual(len(relevant), 3)
+        self.assertEqual(
+            [len(call.args[0]) for call in chat_client.achat_batch.call_args_list],
+            [3],
+        )
+
+    async def test_triage_keeps_articles_when_prompt_fails(self):
+        chat_client = MagicMock()
+        chat_client.achat_batch = AsyncMock(
+            return_value=[{"response": None, "error": "rate limited"}]
+        )
+        triage = self.make_triage(chat_client)
+        articles = [make_article("10.1/a")]
+
+        relevant = await triage.triage("graphs", articles)
+
+        self.assertEqual(relevant, articles)
+        self.assertEqual(articles[0]["triage_error"], "rate limited")
+
+    async def test_batcher_packs_concurrent_articles_into_one_prompt(self):
+        chat_client = make_chat_client(['{"1": 7, "2": 3}'])
+        batcher = self.make_triage(chat_client, linger_seconds=0.01).batcher("graphs")
+        self.addCleanup(batcher.close)
+
+        articles = await asyncio.gather(
+            batcher.score(make_article("10.1/a")), batcher.score(make_article("10.1/b"))
+        )
+
+        self.assertEqual(
+            [article["relevance_score"] for article in articles], [0.7, 0.3]
+        )
+        chat_client.achat_batch.assert_awaited_once()
+
+    async def test_batcher_flushes_full_prompts(self):
+        chat_client = make_chat_client(['{"1": 7}'], ['{"1": 3}'])
+        batcher = self.make_triage(
+            chat_client, max_articles_per_prompt=1, linger_seconds=10
+        ).batcher("graphs")
+        self.addCleanup(batcher.close)
+
+        first = asyncio.create_task(batcher.score(make_article("10.1/a")))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(batcher.score(make_article("10.1/b")))
+        await asyncio.sleep(0)
+        # The second article pushed the first out; only it is still lingering
+        self.assertEqual((await first)["relevance_score"], 0.7)
+        batcher.flush()
+        self.assertEqual((await second)["relevance_score"], 0.3)
+
+    async def test_batcher_packs_like_pack(self):
+        triage = self.make_triage(make_chat_client(), prompt_token_budget=150)
+        articles = [make_article(f"10.1/{i}", "x " * 80) for i in range(4)]
+        prompts = []
+
+        async def score(query, pack):
+            prompts.append(len(pack))
+
+        triage.score = score
+        batcher = triage.batcher("graphs")
+        self.addCleanup(batcher.close)
+        tasks = [asyncio.create_task(batcher.score(article)) for article in articles]
+        await asyncio.sleep(0)
+        batcher.flush()
+        await asyncio.gather(*tasks)
+
+        self.assertEqual(
+            prompts, [len(pack) for pack in triage.pack("graphs", articles)]
+        )
+
+    def test_disabled_by_default(self):
+        triage = AbstractTriage(triage_config={})
+
+        self.assertFalse(triage.enabled)
+        self.assertTrue(triage.is_relevant(make_article("10.1/a")))
+
+
+if __name__ == "__main__":
+    unittest.main()
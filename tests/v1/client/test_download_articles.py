@@ -0,0 +1,947 @@
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch, AsyncMock, MagicMock
+
+from app.v1.client.abstract_triage import AbstractTriage
+from app.v1.client.download_articles import ExtractResearchArticles
+from app.v1.schemas.download_articles import ArticleInput
+from app.v1.utils.cache import TwoTierCache
+from app.v1.utils.constants import CROSSREF_SELECT
+from app.v1.utils.crossref_parser import CrossrefItemsParser
+from app.v1.utils.http_sessions import HTTPSessionPool
+from app.v1.utils.search_index import SearchIndex
+from app.v1.utils.dedup import Deduplicator
+from app.v1.utils import metrics
+
+path = ExtractResearchArticles.__module__
+
+TEST_ENV = {
+    "CROSSREF_BASE_URL": "https://api.crossref.org/works",
+    "EMAIL": "test@example.com",
+    "JOURNAL_ARTICLE_DIRECTORY": "/tmp/articles",
+    "UNPAYWALL_BASE_URL": "https://api.unpaywall.org/v2",
+}
+
+
+def make_article(doi):
+    return {
+        "doi": doi,
+        "title": [f"Title {doi}"],
+        "author": [],
+        "year_published": 2024,
+        "url": f"https://doi.org/{doi}",
+        "abstract": None,
+        "file_name": None,
+    }
+
+
+def make_crossref_item(doi):
+    return {
+        "DOI": doi,
+        "title": [f"Title {doi}"],
+        "author": [],
+        "published": {"date-parts": [[2024, 1, 1]]},
+        "URL": f"https://doi.org/{doi}",
+    }
+
+
+def feed_message(parser, message):
+    """Give a parser the envelope of a Crossref page, without any items"""
+    body = {"status": "ok", "message": {**message, "items": []}}
+    parser.feed(json.dumps(body).encode())
+
+
+def make_access_record(is_oa, pdf_urls=None):
+    return {"is_oa": is_oa, "pdf_urls": pdf_urls or []}
+
+
+class FakeStreamingResponse:
+    def __init__(self, chunks, status=200):
+        self.chunks = chunks
+        self.status = status
+        self.headers = {}
+        self.content = self
+
+    def __await__(self):
+        yield from asyncio.sleep(0).__await__()
+        return self
+
+    def release(self):
+        pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+    async def iter_chunked(self, size):
+        for chunk in self.chunks:
+            yield chunk
+
+    async def iter_any(self):
+        for chunk in self.chunks:
+            yield chunk
+
+
+class TestExtractResearchArticles(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        env_patcher = patch.dict(os.environ, TEST_ENV)
+        env_patcher.start()
+        self.addCleanup(env_patcher.stop)
+
+        self.azure_client = AsyncMock()
+        self.azure_client.get_existing_blob_urls.side_effect = lambda blob_names: [
+            None for _ in blob_names
+        ]
+        self.azure_client.upload_pdfs.side_effect = lambda uploads, **kwargs: [
+            f"https://blob/{upload['blob_name']}" for upload in uploads
+        ]
+
+        index_directory = tempfile.TemporaryDirectory()
+        self.addCleanup(index_directory.cleanup)
+        self.search_index = SearchIndex(os.path.join(index_directory.name, "index"))
+        self.deduplicator = Deduplicator(os.path.join(index_directory.name, "dedup"))
+
+        self.http_session_pool = HTTPSessionPool(pool_config={})
+        self.http_session_pool.get_session = MagicMock()
+        self.extract_cls = ExtractResearchArticles(
+            http_session_pool=self.http_session_pool,
+            azure_client=self.azure_client,
+            search_index=self.search_index,
+            deduplicator=self.deduplicator,
+            crossref_cache=TwoTierCache("crossref", ttl_seconds=60, persistent=False),
+            unpaywall_cache=TwoTierCache("unpaywall", ttl_seconds=60, persistent=False),
+        )
+
+    def test_missing_environment_variables(self):
+        with patch.dict(os.environ, {"EMAIL": ""}):
+            with self.assertRaises(Exception):
+                ExtractResearchArticles(azure_client=self.azure_client)
+
+    async def test_get_dois_from_crossref_single_page(self):
+        calls = []
+
+        async def fake_page(params, parser):
+            calls.append(dict(params))
+            feed_message(parser, {"next-cursor": "x"})
+            yield [make_article("10.1/a")]
+
+        with patch.object(self.extract_cls, "_iter_crossref_page", fake_page):
+            result = await self.extract_cls.get_dois_from_crossref("graphs", 10)
+            cached = await self.extract_cls.get_dois_from_crossref("graphs", 10)
+
+        self.assertEqual([article["doi"] for article in result], ["10.1/a"])
+        self.assertEqual(cached, result)
+        self.assertEqual(len(calls), 1)
+        params = calls[0]
+        self.assertEqual(params["rows"], 10)
+        self.assertEqual(params["select"], CROSSREF_SELECT)
+        self.assertNotIn("cursor", params)
+
+    async def test_get_dois_from_crossref_deep_pages_with_cursor(self):
+        pages = {
+            "*": (
+                [make_article(f"10.1/{i}") for i in range(1000)],
+                {"next-cursor": "page-2"},
+            ),
+            "page-2": (
+                [make_article(f"10.2/{i}") for i in range(1000)],
+                {"next-cursor": "page-3"},
+            ),
+        }
+        cursors = []
+
+        async def fake_page(params, parser):
+            cursors.append(params["cursor"])
+            articles, message = pages[params["cursor"]]
+            feed_message(parser, message)
+            yield articles
+
+        with patch.object(self.extract_cls, "_iter_crossref_page", fake_page):
+            result = await self.extract_cls.get_dois_from_crossref("graphs", 1500)
+
+        self.assertEqual(cursors, ["*", "page-2"])
+        self.assertEqual(len(result), 1500)
+        self.assertEqual(result[-1]["doi"], "10.2/499")
+
+    async def test_iter_crossref_page_parses_streamed_body(self):
+        body = json.dumps(
+            {
+                "status": "ok",
+                "message": {
+                    "next-cursor": "page-2",
+                    "items": [
+                        make_crossref_item("10.1/a"),
+                        make_crossref_item("10.1/b"),
+                    ],
+                },
+            }
+        ).encode()
+        chunks = [body[i : i + 16] for i in range(0, len(body), 16)]
+        session = MagicMock()
+        session.get.return_value = FakeStreamingResponse(chunks)
+        self.http_session_pool.get_session.return_value = session
+
+        downloaded_before = metrics.BYTES_DOWNLOADED.get(upstream="crossref")
+
+        parser = CrossrefItemsParser()
+        batches = []
+        async for batch in self.extract_cls._iter_crossref_page(
+            {"query": "graphs", "select": CROSSREF_SELECT}, parser
+        ):
+            # The response is closed before anything is handed on
+            self.assertEqual(metrics.UPSTREAM_IN_FLIGHT.get(upstream="crossref"), 0)
+            batches.append(batch)
+        article_list = [article for batch in batches for article in batch]
+        message = parser.close()
+
+        # Items are parsed as their bytes arrive, not from one json.loads
+        self.assertEqual(len(batches), 2)
+        self.assertEqual([a["doi"] for a in article_list], ["10.1/a", "10.1/b"])
+        self.assertEqual(article_list[0]["year_published"], 2024)
+        self.assertEqual(message["next-cursor"], "page-2")
+        self.assertEqual(
+            metrics.BYTES_DOWNLOADED.get(upstream="crossref") - downloaded_before,
+            len(body),
+        )
+
+    async def test_search_and_download_batch_dedups_dois_across_queries(self):
+        crossref_results = {
+            "graphs": [make_article("10.1/a"), make_article("10.1/b")],
+            "networks": [make_article("10.1/A"), make_article("10.1/c")],
+            "broken": Exception("Crossref unavailable"),
+        }
+
+        async def fake_crossref(query, max_articles, use_cache=True):
+            if isinstance(crossref_results[query], Exception):
+                raise crossref_results[query]
+            return crossref_results[query]
+
+        async def fake_download(article_list):
+            for article in article_list:
+                article["blob_url"] = f"https://blob/{article['doi']}"
+            return article_list
+
+        mock_open_access = AsyncMock(side_effect=lambda articles, use_cache: articles)
+
+        with (
+            patch.object(
+                self.extract_cls, "get_dois_from_crossref", side_effect=fake_crossref
+            ),
+            patch.object(self.extract_cls, "check_for_open_access", mock_open_access),
+            patch.object(
+                self.extract_cls, "download_papers", side_effect=fake_download
+            ),
+        ):
+            results = await self.extract_cls.search_and_download_batch(
+                [
+                    ArticleInput(query="graphs"),
+                    ArticleInput(query="networks"),
+                    ArticleInput(query="broken"),
+                ]
+            )
+
+        checked_dois = [
+            article["doi"] for article in mock_open_access.call_args.args[0]
+        ]
+        self.assertEqual(checked_dois, ["10.1/a", "10.1/b", "10.1/c"])
+        self.assertEqual(
+            [[article["doi"] for article in result["articles"]] for result in results],
+            [["10.1/a", "10.1/b"], ["10.1/a", "10.1/c"], []],
+        )
+        self.assertIn("Crossref unavailable", results[2]["error"])
+
+    async def test_check_for_open_access_filters_closed_articles(self):
+        articles = [make_article("10.1/a"), make_article("10.1/b")]
+
+        async def fake_access(url):
+            return make_access_record(
+                url.startswith(f"{TEST_ENV['UNPAYWALL_BASE_URL']}/10.1/a")
+            )
+
+        with patch.object(
+            self.extract_cls, "check_article_access", side_effect=fake_access
+        ):
+            result = await self.extract_cls.check_for_open_access(articles)
+
+        self.assertEqual([article["doi"] for article in result], ["10.1/a"])
+
+    async def test_check_for_open_access_records_per_article_failures(self):
+        articles = [make_article("10.1/a"), make_article("10.1/b")]
+
+        async def fake_access(url):
+            if "10.1/b" in url:
+                raise Exception("Unpaywall unavailable")
+            return make_access_record(True)
+
+        with patch.object(
+            self.extract_cls, "check_article_access", side_effect=fake_access
+        ):
+            result = await self.extract_cls.check_for_open_access(articles)
+
+        self.assertEqual([article["doi"] for article in result], ["10.1/a"])
+        self.assertFalse(articles[1]["is_open_access"])
+        self.assertIn("Unpaywall unavailable", articles[1]["open_access_error"])
+
+    async def test_search_timing_leaves_out_consumer_time(self):
+        metrics.registry.clear()
+
+        async def fake_page(params, parser):
+            feed_message(parser, {})
+            yield [make_article("10.1/a"), make_article("10.1/b")]
+
+        with patch.object(self.extract_cls, "_iter_crossref_page", fake_page):
+            async for _ in self.extract_cls.iter_crossref_articles(
+                "graphs", 2, use_cache=False
+            ):
+                # A slow consumer, e.g. downloads further down the pipeline
+                await asyncio.sleep(0.05)
+
+        self.assertLess(
+            metrics.STAGE_DURATION.get_sum(stage="search", outcome="success"), 0.05
+        )
+
+    async def test_crossref_latency_leaves_out_consumer_time(self):
+        metrics.registry.clear()
+        body = json.dumps(
+            {
+                "status": "ok",
+                "message": {
+                    "items": [
+                        make_crossref_item("10.1/a"),
+                        make_crossref_item("10.1/b"),
+                    ]
+                },
+            }
+        ).encode()
+        session = MagicMock()
+        session.get.return_value = FakeStreamingResponse(
+            [body[i : i + 16] for i in range(0, len(body), 16)]
+        )
+        self.http_session_pool.get_session.return_value = session
+
+        async for _ in self.extract_cls.iter_crossref_articles(
+            "graphs", 2, use_cache=False
+        ):
+            # A slow consumer, which then stops reading early
+            await asyncio.sleep(0.05)
+            break
+
+        self.assertLess(metrics.UPSTREAM_DURATION.get_sum(upstream="crossref"), 0.05)
+        self.assertEqual(
+            metrics.UPSTREAM_REQUESTS.get(upstream="crossref", outcome="success"), 1
+        )
+        self.assertEqual(
+            metrics.UPSTREAM_REQUESTS.get(upstream="crossref", outcome="failure"), 0
+        )
+
+    async def test_check_for_open_access_times_each_article(self):
+        metrics.registry.clear()
+        articles = [make_article(f"10.1/{i}") for i in range(3)]
+
+        with patch.object(
+            self.extract_cls,
+            "check_article_access",
+            AsyncMock(return_value=make_access_record(True)),
+        ):
+            await self.extract_cls.check_for_open_access(articles)
+
+        # The same per-article observations as the pipeline's stage
+        self.assertEqual(
+            metrics.STAGE_DURATION.get_count(stage="open_access", outcome="success"),
+            3,
+        )
+
+    async def test_check_for_open_access_respects_concurrency_cap(self):
+        self.extract_cls.open_access_concurrency = 2
+        articles = [make_article(f"10.1/{i}") for i in range(6)]
+        in_flight = 0
+        peak = 0
+
+        async def fake_access(url):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return make_access_record(True)
+
+        with patch.object(
+            self.extract_cls, "check_article_access", side_effect=fake_access
+        ):
+            result = await self.extract_cls.check_for_open_access(articles)
+
+        self.assertEqual(len(result), 6)
+        self.assertEqual(peak, 2)
+
+    async def test_check_for_open_access_uses_cache(self):
+        mock_access = AsyncMock(return_value=make_access_record(True))
+
+        with patch.object(self.extract_cls, "check_article_access", mock_access):
+            await self.extract_cls.check_for_open_access([make_article("10.1/a")])
+            result = await self.extract_cls.check_for_open_access(
+                [make_article("10.1/A")]
+            )
+
+        self.assertEqual(len(result), 1)
+        mock_access.assert_called_once()
+        self.assertEqual(self.extract_cls.unpaywall_cache.hits, 1)
+
+    async def test_check_for_open_access_bypasses_cache(self):
+        mock_access = AsyncMock(return_value=make_access_record(True))
+
+        with patch.object(self.extract_cls, "check_article_access", mock_access):
+            await self.extract_cls.check_for_open_access([make_article("10.1/a")])
+            await self.extract_cls.check_for_open_access(
+                [make_article("10.1/a")], use_cache=False
+            )
+
+        self.assertEqual(mock_access.call_count, 2)
+
+    def test_extract_access_record_orders_pdf_urls(self):
+        data = {
+            "is_oa": True,
+            "best_oa_location": {"url_for_pdf": "https://host/b.pdf"},
+            "oa_locations": [
+                {"url_for_pdf": "https://host/a.pdf"},
+                {"url_for_pdf": None},
+                {"url_for_pdf": "https://host/b.pdf"},
+            ],
+        }
+
+        self.assertEqual(
+            self.extract_cls.extract_access_record(data),
+            make_access_record(True, ["https://host/b.pdf", "https://host/a.pdf"]),
+        )
+
+    async def test_check_for_open_access_no_results(self):
+        articles = [make_article("10.1/a")]
+
+        with patch.object(
+            self.extract_cls,
+            "check_article_access",
+            AsyncMock(return_value=make_access_record(False)),
+        ):
+            with self.assertRaises(Exception):
+                await self.extract_cls.check_for_open_access(articles)
+
+    async def test_download_papers_skips_stored_articles(self):
+        self.azure_client.get_existing_blob_urls.side_effect = None
+        self.azure_client.get_existing_blob_urls.return_value = ["https://blob/a.pdf"]
+        mock_get_pdf = AsyncMock()
+
+        with patch.object(self.extract_cls, "get_pdf_content", mock_get_pdf):
+            result = await self.extract_cls.download_papers([make_article("10.1/a")])
+
+        self.assertEqual(result[0]["blob_url"], "https://blob/a.pdf")
+        mock_get_pdf.assert_not_called()
+        self.azure_client.upload_pdfs.assert_not_called()
+
+    async def test_download_papers_batch_uploads_with_content_hash(self):
+        with patch.object(
+            self.extract_cls, "get_pdf_content", AsyncMock(return_value=b"%PDF-1.4")
+        ):
+            result = await self.extract_cls.download_papers(
+                [make_article("10.1/A"), make_article("10.1/B")]
+            )
+
+        self.assertEqual(len(result), 2)
+        self.assertTrue(result[0]["blob_url"].startswith("https://blob/10.1_a-"))
+        self.azure_client.upload_pdfs.assert_called_once()
+        uploads, kwargs = self.azure_client.upload_pdfs.call_args
+        self.assertEqual(uploads[0][0]["metadata"]["doi"], "10.1/a")
+        self.assertEqual(len(uploads[0][0]["metadata"]["content_sha256"]), 64)
+        self.assertFalse(kwargs["overwrite"])
+
+    async def test_download_papers_ignores_failed_articles(self):
+        self.azure_client.get_existing_blob_urls.side_effect = None
+        self.azure_client.get_existing_blob_urls.return_value = [
+            "https://blob/a.pdf",
+            Exception("Storage unavailable"),
+        ]
+
+        result = await self.extract_cls.download_papers(
+            [make_article("10.1/a"), make_article("10.1/b")]
+        )
+
+        self.assertEqual([article["doi"] for article in result], ["10.1/a"])
+
+    async def test_download_and_upload_paper_skips_stored_article(self):
+        self.azure_client.get_existing_blob_url.return_value = "https://blob/a.pdf"
+        article = make_article("10.1/a")
+        article["file_name"] = "a.pdf"
+
+        with patch.object(self.extract_cls, "download_paper") as mock_download:
+            result = await self.extract_cls.download_and_upload_paper(article)
+
+        self.assertEqual(result["blob_url"], "https://blob/a.pdf")
+        mock_download.assert_not_called()
+
+    async def test_stream_pdf_to_azure_stages_blocks(self):
+        self.extract_cls.upload_block_size = 8
+        self.http_session_pool.get_session.return_value.get.return_value = (
+            FakeStreamingResponse([b"%PDF-1.", b"4 body ", b"content"])
+        )
+        self.azure_client.commit_blocks.return_value = "https://blob/a.pdf"
+        article = make_article("10.1/a")
+        article["file_name"] = "a.pdf"
+
+        blob_url = await self.extract_cls.stream_pdf_to_azure(
+            article, "https://host/a.pdf"
+        )
+
+        self.assertEqual(blob_url, "https://blob/a.pdf")
+        staged = [call.args for call in self.azure_client.stage_block.call_args_list]
+        self.assertEqual(
+            staged,
+            [
+                ("a.pdf", "00000000", b"%PDF-1.4 body "),
+                ("a.pdf", "00000001", b"content"),
+            ],
+        )
+        args, kwargs = self.azure_client.commit_blocks.call_args
+        self.assertEqual(args, ("a.pdf", ["00000000", "00000001"]))
+        self.assertEqual(len(kwargs["metadata"]["content_sha256"]), 64)
+
+    async def test_stream_pdf_to_azure_rejects_html(self):
+        self.http_session_pool.get_session.return_value.get.return_value = (
+            FakeStreamingResponse([b"<html>landing page</html>"])
+        )
+        article = make_article("10.1/a")
+        article["file_name"] = "a.pdf"
+
+        blob_url = await self.extract_cls.stream_pdf_to_azure(
+            article, "https://host/a.pdf"
+        )
+
+        self.assertIsNone(blob_url)
+        self.azure_client.stage_block.assert_not_called()
+        self.azure_client.commit_blocks.assert_not_called()
+
+    async def test_download_papers_falls_back_to_doi2pdf(self):
+        article = make_article("10.1/a")
+        article["pdf_urls"] = ["https://host/a.pdf"]
+
+        with (
+            patch.object(
+                self.extract_cls, "stream_pdf_to_azure", AsyncMock(return_value=None)
+            ),
+            patch.object(
+                self.extract_cls,
+                "get_pdf_content",
+                AsyncMock(return_value=b"%PDF-1.4"),
+            ) as mock_get_pdf,
+        ):
+            result = await self.extract_cls.download_papers([article])
+
+        self.assertEqual(len(result), 1)
+        mock_get_pdf.assert_called_once_with("10.1/a")
+        self.azure_client.upload_pdfs.assert_called_once()
+
+    async def test_download_paper_hedges_slow_pdf_location(self):
+        self.extract_cls.pdf_hedge_delay = 0.01
+        article = make_article("10.1/a")
+        article["pdf_urls"] = ["https://slow/a.pdf", "https://fast/a.pdf"]
+        attempts = []
+
+        async def fake_stream(article, pdf_url, attempt):
+            attempts.append(attempt)
+            if "slow" in pdf_url:
+                await asyncio.sleep(10)
+            return f"https://blob/{attempt}"
+
+        with patch.object(self.extract_cls, "stream_pdf_to_azure", fake_stream):
+            result = await asyncio.wait_for(
+                self.extract_cls.download_paper(article), timeout=1
+            )
+
+        self.assertEqual(result, (article, None))
+        self.assertEqual(article["blob_url"], "https://blob/1")
+        self.assertEqual(attempts, [0, 1])
+
+    async def test_download_papers_streamed_articles_skip_batch_upload(self):
+        article = make_article("10.1/a")
+        article["pdf_urls"] = ["https://host/a.pdf"]
+
+        with patch.object(
+            self.extract_cls,
+            "stream_pdf_to_azure",
+            AsyncMock(return_value="https://blob/a.pdf"),
+        ):
+            result = await self.extract_cls.download_papers([article])
+
+        self.assertEqual(result[0]["blob_url"], "https://blob/a.pdf")
+        self.azure_client.upload_pdfs.assert_not_called()
+
+    def _patch_search(self, articles, error=None):
+        async def fake_search(query, max_articles, use_cache=True):
+            for article in articles:
+                yield article
+            if error:
+                raise error
+
+        return patch.object(self.extract_cls, "iter_crossref_articles", fake_search)
+
+    def _patch_open_access(self, access, delays=None):
+        async def fake_check(semaphore, article, use_cache=True):
+            await asyncio.sleep((delays or {}).get(article["doi"], 0))
+            if isinstance(access[article["doi"]], Exception):
+                article["is_open_access"] = False
+                article["open_access_error"] = str(access[article["doi"]])
+            else:
+                article["is_open_access"] = access[article["doi"]]
+            return article
+
+        return patch.object(
+            self.extract_cls, "_check_open_access_for_article", fake_check
+        )
+
+    async def test_search_and_download_pipelines_stages(self):
+        articles = [make_article(f"10.1/{i}") for i in range(3)]
+        events = []
+        search_done = asyncio.Event()
+
+        async def fake_search(query, max_articles, use_cache=True):
+            for article in articles:
+                events.append(("found", article["doi"]))
+                yield article
+                await asyncio.sleep(0.01)
+            search_done.set()
+
+        async def fake_download(article):
+            events.append(("download", article["doi"]))
+            # The first paper finishes last, yet results keep search order
+            await asyncio.sleep(0.05 if article["doi"] == "10.1/0" else 0)
+            article["blob_url"] = f"https://blob/{article['doi']}"
+            return article
+
+        with (
+            patch.object(self.extract_cls, "iter_crossref_articles", fake_search),
+            self._patch_open_access({article["doi"]: True for article in articles}),
+            patch.object(
+                self.extract_cls, "download_and_upload_paper", side_effect=fake_download
+            ),
+        ):
+            result = await self.extract_cls.search_and_download_open_papers(
+                ArticleInput(query="graphs")
+            )
+
+        self.assertEqual(
+            [article["doi"] for article in result], ["10.1/0", "10.1/1", "10.1/2"]
+        )
+        # The first download starts before the search has finished
+        self.assertLess(
+            events.index(("download", "10.1/0")), events.index(("found", "10.1/2"))
+        )
+
+    async def test_search_and_download_raises_without_open_access(self):
+        articles = [make_article("10.1/a")]
+
+        with (
+            self._patch_search(articles),
+            self._patch_open_access({"10.1/a": False}),
+        ):
+            with self.assertRaises(Exception) as context:
+                await self.extract_cls.search_and_download_open_papers(
+                    ArticleInput(query="graphs")
+                )
+
+        self.assertIn("No open-access articles found", str(context.exception))
+
+    async def test_stream_open_papers_yields_in_completion_order(self):
+        articles = [make_article("10.1/slow"), make_article("10.1/fast")]
+        articles.append(make_article("10.1/closed"))
+        delays = {"10.1/slow": 0.05, "10.1/fast": 0.0}
+
+        async def fake_download(article):
+            await asyncio.sleep(delays[article["doi"]])
+            article["blob_url"] = f"https://blob/{article['doi']}"
+            return article
+
+        with (
+            self._patch_search(articles),
+            self._patch_open_access(
+                {
+                    "10.1/slow": True,
+                    "10.1/fast": True,
+                    "10.1/closed": Exception("Unpaywall unavailable"),
+                }
+            ),
+            patch.object(
+                self.extract_cls, "download_and_upload_paper", side_effect=fake_download
+            ),
+        ):
+            records = [
+                record
+                async for record in self.extract_cls.stream_open_papers(
+                    ArticleInput(query="graphs")
+                )
+            ]
+
+        self.assertEqual(
+            [record["article"]["DOI"] for record in records[:-1]],
+            ["10.1/fast", "10.1/slow"],
+        )
+        self.assertEqual(records[-1]["type"], "summary")
+        self.assertEqual(records[-1]["articles_found"], 3)
+        self.assertEqual(records[-1]["open_access"], 2)
+        self.assertEqual(records[-1]["downloaded"], 2)
+        self.assertEqual(
+            records[-1]["failures"],
+            [{"doi": "10.1/closed", "error": "Unpaywall unavailable"}],
+        )
+
+    async def test_stream_open_papers_reports_search_failure(self):
+        with self._patch_search([], error=Exception("Crossref unavailable")):
+            records = [
+                record
+                async for record in self.extract_cls.stream_open_papers(
+                    ArticleInput(query="graphs")
+                )
+            ]
+
+        self.assertEqual(len(records), 1)
+        self.assertEqual(records[0]["failures"][0]["doi"], None)
+        self.assertIn("Crossref unavailable", records[0]["failures"][0]["error"])
+
+    def _enable_text_extraction(self):
+        text_extractor = MagicMock(
+            enabled=True, max_workers=2, chunk_size=100, chunk_overlap=10
+        )
+        text_extractor.process = AsyncMock(
+            return_value={
+                "text": "Graph paper",
+                "page_count": 1,
+                "characters": 11,
+                "sections": [],
+                "chunks": [{"index": 0, "text": "Graph paper"}],
+                "timings": {"extract_seconds": 0.1, "chunk_seconds": 0.0},
+            }
+        )
+        self.extract_cls.text_extractor = text_extractor
+        self.azure_client.get_existing_blob_url.return_value = None
+        self.azure_client.upload_json.side_effect = lambda data, blob_name, **kwargs: (
+            f"https://blob/{blob_name}"
+        )
+        return text_extractor
+
+    async def test_extract_article_text_stores_chunks_beside_pdf(self):
+        text_extractor = self._enable_text_extraction()
+        article = make_article("10.1/a")
+        article["file_name"] = "a.pdf"
+        article["blob_url"] = "https://blob/a.pdf"
+
+        result = await self.extract_cls.extract_article_text(article)
+
+        self.assertEqual(result["chunks_blob_url"], "https://blob/a.chunks.json")
+        self.assertEqual(result["chunk_count"], 1)
+        self.assertNotIn("text_error", result)
+        self.assertTrue(self.search_index.get_document("10.1/a")["has_text"])
+        blob_name, path = self.azure_client.download_blob_to_file.call_args.args
+        self.assertEqual(blob_name, "a.pdf")
+        text_extractor.process.assert_awaited_once_with(path)
+        # The temporary copy of the PDF is removed once it has been parsed
+        self.assertFalse(os.path.exists(path))
+
+        document = self.azure_client.upload_json.call_args.args[0]
+        self.assertEqual(document["chunks"], [{"index": 0, "text": "Graph paper"}])
+        self.assertEqual(
+            set(document["timings"]),
+            {"download_seconds", "extract_seconds", "chunk_seconds", "total_seconds"},
+        )
+
+    async def test_extract_article_text_skips_stored_chunks(self):
+        text_extractor = self._enable_text_extraction()
+        self.azure_client.get_existing_blob_url.return_value = "https://blob/a.json"
+        article = make_article("10.1/a")
+        article["file_name"] = "a.pdf"
+
+        result = await self.extract_cls.extract_article_text(article)
+
+        self.assertEqual(result["chunks_blob_url"], "https://blob/a.json")
+        text_extractor.process.assert_not_called()
+
+    async def test_extract_article_text_records_failures(self):
+        text_extractor = self._enable_text_extraction()
+        text_extractor.process.side_effect = ValueError("not a PDF")
+        article = make_article("10.1/a")
+        article["file_name"] = "a.pdf"
+
+        result = await self.extract_cls.extract_article_text(article)
+
+        self.assertEqual(result["text_error"], "not a PDF")
+        self.assertNotIn("chunks_blob_url", result)
+
+    async def test_search_and_download_extracts_text_when_enabled(self):
+        self._enable_text_extraction()
+        articles = [make_article("10.1/a"), make_article("10.1/b")]
+
+        async def fake_download(article):
+            article["blob_url"] = f"https://blob/{article['file_name']}"
+            return article
+
+        with (
+            self._patch_search(articles),
+            self._patch_open_access({"10.1/a": True, "10.1/b": False}),
+            patch.object(
+                self.extract_cls, "download_and_upload_paper", side_effect=fake_download
+            ),
+        ):
+            result = await self.extract_cls.search_and_download_open_papers(
+                ArticleInput(query="graphs")
+            )
+
+        self.assertEqual([article["doi"] for article in result], ["10.1/a"])
+        self.assertEqual(result[0]["chunk_count"], 1)
+        self.assertNotIn("chunks_blob_url", articles[1])
+
+    async def test_search_drops_near_duplicates_before_open_access(self):
+        abstract = (
+            "We study message passing neural networks on large sparse graphs and "
+            "show that sampling neighbourhoods keeps memory flat during training."
+        )
+        preprint = make_article("10.48550/arxiv.1")
+        published = make_article("10.1/journal")
+        for article in (preprint, published):
+            article["title"] = ["Scalable graph neural networks"]
+            article["abstract"] = abstract
+        checked = []
+
+        async def fake_check(semaphore, article, use_cache=True):
+            checked.append(article["doi"])
+            article["is_open_access"] = True
+            return article
+
+        async def fake_download(article):
+            article["blob_url"] = f"https://blob/{article['file_name']}"
+            return article
+
+        async def fake_page(params, parser):
+            feed_message(parser, {})
+            yield [preprint, published]
+
+        with (
+            patch.object(self.extract_cls, "_iter_crossref_page", fake_page),
+            patch.object(
+                self.extract_cls, "_check_open_access_for_article", fake_check
+            ),
+            patch.object(
+                self.extract_cls, "download_and_upload_paper", side_effect=fake_download
+            ),
+        ):
+            result = await self.extract_cls.search_and_download_open_papers(
+                ArticleInput(query="graphs")
+            )
+
+        self.assertEqual(checked, ["10.1/journal"])
+        self.assertEqual(result[0]["duplicate_dois"], ["10.48550/arxiv.1"])
+        self.assertEqual(self.deduplicator.stored_dois, {"10.1/journal"})
+
+    async def test_search_and_download_skips_articles_triaged_irrelevant(self):
+        articles = [make_article("10.1/graphs"), make_article("10.1/cooking")]
+        chat_client = MagicMock()
+        chat_client.achat_batch = AsyncMock(
+            return_value=[{"response": '{"1": 9, "2": 1}', "error": None}]
+        )
+        self.extract_cls.triage = AbstractTriage(
+            chat_client=chat_client,
+            triage_config={"enabled": True, "linger_seconds": 0.01},
+        )
+
+        async def fake_download(article):
+            article["blob_url"] = f"https://blob/{article['doi']}"
+            return article
+
+        with (
+            self._patch_search(articles),
+            self._patch_open_access({article["doi"]: True for article in articles}),
+            patch.object(
+                self.extract_cls, "download_and_upload_paper", side_effect=fake_download
+            ) as download,
+        ):
+            result = await self.extract_cls.search_and_download_open_papers(
+                ArticleInput(query="graphs")
+            )
+
+        self.assertEqual([article["doi"] for article in result], ["10.1/graphs"])
+        self.assertEqual(result[0]["relevance_score"], 0.9)
+        download.assert_called_once()
+        # Both abstracts went out in a single prompt
+        chat_client.achat_batch.assert_awaited_once()
+        self.assertEqual(len(chat_client.achat_batch.call_args.args[0]), 1)
+
+    async def test_triage_prompts_fill_past_the_download_workers(self):
+        articles = [make_article(f"10.1/{i}") for i in range(6)]
+        self.extract_cls.download_concurrency = 2
+        chat_client = MagicMock()
+        chat_client.achat_batch = AsyncMock(
+            return_value=[
+                {
+                    "response": json.dumps({str(i): 9 for i in range(1, 7)}),
+                    "error": None,
+                }
+            ]
+        )
+        self.extract_cls.triage = AbstractTriage(
+            chat_client=chat_client,
+            triage_config={"enabled": True, "linger_seconds": 0.05},
+        )
+
+        async def fake_download(article):
+            article["blob_url"] = f"https://blob/{article['doi']}"
+            return article
+
+        with (
+            self._patch_search(articles),
+            self._patch_open_access({article["doi"]: True for article in articles}),
+            patch.object(
+                self.extract_cls, "download_and_upload_paper", side_effect=fake_download
+            ),
+        ):
+            result = await self.extract_cls.search_and_download_open_papers(
+                ArticleInput(query="graphs")
+            )
+
+        self.assertEqual(len(result), 6)
+        # All six abstracts waited in one prompt, not two per download worker
+        chat_client.achat_batch.assert_awaited_once()
+        self.assertIn("[6]", chat_client.achat_batch.call_args.args[0][0].user_message)
+
+    async def test_download_papers_as_completed_caps_concurrency(self):
+        self.extract_cls.download_concurrency = 2
+        active = 0
+        peak = 0
+
+        async def fake_download(article):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+            article["blob_url"] = f"https://blob/{article['doi']}"
+            return article
+
+        articles = [make_article(f"10.1/{i}") for i in range(6)]
+        with patch.object(
+            self.extract_cls, "download_and_upload_paper", side_effect=fake_download
+        ):
+            results = [
+                result
+                async for result in self.extract_cls.download_papers_as_completed(
+                    articles
+                )
+            ]
+
+        self.assertEqual(len(results), 6)
+        self.assertEqual(peak, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,8 +1,15 @@
+import asyncio
+import json
 import unittest
 from unittest.mock import patch, MagicMock
 import os
 
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
 from app.v1.client.openai_chat import OpenAIChat
+from app.v1.schemas.openai_chat import ChatRequest
+from app.v1.utils.cache import TwoTierCache
 
 path = OpenAIChat.__module__
 
@@ -103,5 +110,300 @@ class TestOpenAIChat(unittest.TestCase):
             self.chat_cls.chat(system_message, user_message)
 
 
+class TestOpenAIChatAsync(unittest.IsolatedAsyncioTestCase):
+    """Runs the async client against a local fake Azure OpenAI endpoint"""
+
+    async def asyncSetUp(self):
+        self.requests = []
+        self.status = 200
+        self.stream_tokens = ["I ", "am ", "good."]
+        self.endless_stream = False
+        self.rate_limited_responses = 0
+        self.stream_disconnected = asyncio.Event()
+
+        async def completions(request):
+            body = await request.json()
+            self.requests.append((request, body))
+            if self.status != 200:
+                return web.json_response(
+                    {"error": {"message": "Something went wrong."}},
+                    status=self.status,
+                )
+
+            if self.rate_limited_responses:
+                self.rate_limited_responses -= 1
+                return web.json_response(
+                    {"error": {"code": "429", "message": "Rate limit reached."}},
+                    status=429,
+                    headers={"retry-after-ms": "50"},
+                )
+
+            if body.get("stream"):
+                return await stream_completion(request)
+
+            return web.json_response(
+                {
+                    "id": f"chatcmpl-{len(self.requests)}",
+                    "object": "chat.completion",
+                    "created": 0,
+                    "model": "gpt-4.1-mini",
+                    "choices": [
+                        {
+                            "index": 0,
+                            "finish_reason": "stop",
+                            "message": {
+                                "role": "assistant",
+                                "content": f"Re: {body['messages'][1]['content']}"
+                                if body["messages"][1]["content"].startswith("Q")
+                                else "I am good.",
+                            },
+                        }
+                    ],
+                }
+            )
+
+        def chunk(choices, usage=None):
+            data = {
+                "id": "chatcmpl-1",
+                "object": "chat.completion.chunk",
+                "created": 0,
+                "model": "gpt-4.1-mini",
+                "choices": choices,
+                "usage": usage,
+            }
+            return f"data: {json.dumps(data)}\n\n".encode()
+
+        async def stream_completion(request):
+            response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+            await response.prepare(request)
+
+            try:
+                for token in self.stream_tokens:
+                    await response.write(
+                        chunk([{"index": 0, "delta": {"content": token}}])
+                    )
+
+                while self.endless_stream:
+                    await asyncio.sleep(0.01)
+                    await response.write(
+                        chunk([{"index": 0, "delta": {"content": "..."}}])
+                    )
+
+                usage = {"prompt_tokens": 5, "completion_tokens": 3, "total_tokens": 8}
+                await response.write(chunk([], usage))
+                await response.write(b"data: [DONE]\n\n")
+            except (ConnectionResetError, asyncio.CancelledError):
+                self.stream_disconnected.set()
+                raise
+
+            return response
+
+        fake_app = web.Application()
+        fake_app.router.add_post(
+            "/openai/deployments/{deployment}/chat/completions", completions
+        )
+        self.server = TestServer(fake_app)
+        await self.server.start_server()
+        self.addAsyncCleanup(self.server.close)
+
+        env = {
+            "AZURE_OPENAI_API_KEY": "test-key",
+            "AZURE_OPENAI_ENDPOINT": str(self.server.make_url("/")),
+            "AZURE_OPENAI_VERSION": "2024-10-21",
+        }
+        with patch.dict(os.environ, env):
+            self.chat_cls = OpenAIChat(
+                openai_config={
+                    "model_name": "gpt-4.1-mini",
+                    "max_tokens": 100,
+                    "temperature": 0.01,
+                    "http": {"max_retries": 0},
+                },
+                response_cache=TwoTierCache("openai", 60, persistent=False),
+            )
+        self.addAsyncCleanup(self.chat_cls.close)
+
+    async def test_achat_normal(self):
+        result = await self.chat_cls.achat("Hello", "How are you?")
+
+        self.assertEqual(result, "I am good.")
+        request, body = self.requests[0]
+        self.assertEqual(request.match_info["deployment"], "gpt-4.1-mini")
+        self.assertEqual(request.headers["api-key"], "test-key")
+        self.assertEqual(body["max_completion_tokens"], 100)
+        self.assertEqual(
+            body["messages"],
+            [
+                {"role": "system", "content": "Hello"},
+                {"role": "user", "content": "How are you?"},
+            ],
+        )
+
+    async def test_achat_reuses_client(self):
+        client = self.chat_cls.get_async_client()
+
+        await self.chat_cls.achat("Hello", "How are you?")
+        await self.chat_cls.achat("Hello", "And now?")
+
+        self.assertIs(self.chat_cls.get_async_client(), client)
+        self.assertEqual(len(self.requests), 2)
+
+    async def test_achat_with_api_error(self):
+        self.status = 400
+
+        with self.assertRaises(Exception) as context:
+            await self.chat_cls.achat("Hello", "How are you?")
+
+        self.assertIn("OpenAI API Error", str(context.exception))
+
+    async def test_achat_caches_normalized_prompt(self):
+        first = await self.chat_cls.achat("Hello", "How are you?")
+        second = await self.chat_cls.achat("Hello\r\n", "  How are you?")
+
+        self.assertEqual(first, second)
+        self.assertEqual(len(self.requests), 1)
+        self.assertEqual(self.chat_cls.response_cache.hits, 1)
+
+        await self.chat_cls.achat("Hello", "Something else?")
+        self.assertEqual(len(self.requests), 2)
+
+    async def test_achat_cache_bypass_refreshes_entry(self):
+        await self.chat_cls.achat("Hello", "How are you?")
+        await self.chat_cls.achat("Hello", "How are you?", use_cache=False)
+        await self.chat_cls.achat("Hello", "How are you?")
+
+        self.assertEqual(len(self.requests), 2)
+
+    async def test_achat_skips_cache_above_max_temperature(self):
+        self.chat_cls.temperature = 0.7
+
+        await self.chat_cls.achat("Hello", "How are you?")
+        await self.chat_cls.achat("Hello", "How are you?")
+
+        self.assertEqual(len(self.requests), 2)
+        self.assertEqual(self.chat_cls.response_cache.stats()["memory_entries"], 0)
+
+    def test_cache_key_includes_model_settings(self):
+        model_input = self.chat_cls.construct_model_input("Hello", "Hi?")
+        key = self.chat_cls._get_cache_key(model_input)
+
+        self.chat_cls.max_tokens = 200
+
+        self.assertNotEqual(self.chat_cls._get_cache_key(model_input), key)
+
+    async def test_achat_stream_serves_and_fills_cache(self):
+        streamed = [
+            record async for record in self.chat_cls.achat_stream("Hello", "Hi?")
+        ]
+        cached = [record async for record in self.chat_cls.achat_stream("Hello", "Hi?")]
+
+        self.assertEqual(len(self.requests), 1)
+        self.assertEqual(
+            cached,
+            [
+                {"type": "token", "content": "I am good."},
+                {"type": "usage", "usage": None},
+            ],
+        )
+        self.assertEqual(await self.chat_cls.achat("Hello", "Hi?"), "I am good.")
+        self.assertEqual(len(streamed), 4)
+
+    async def test_achat_batch_returns_results_in_input_order(self):
+        chat_requests = [
+            ChatRequest(system_message="Hello", user_message=f"Q{i}") for i in range(5)
+        ]
+        chat_requests.insert(2, ChatRequest(system_message="Hello", user_message=""))
+
+        results = await self.chat_cls.achat_batch(chat_requests)
+
+        self.assertEqual(
+            [result["response"] for result in results],
+            ["Re: Q0", "Re: Q1", None, "Re: Q2", "Re: Q3", "Re: Q4"],
+        )
+        self.assertIn("cannot be empty", results[2]["error"])
+
+    async def test_achat_batch_backs_off_on_429(self):
+        self.rate_limited_responses = 2
+        chat_requests = [
+            ChatRequest(system_message="Hello", user_message=f"Q{i}") for i in range(3)
+        ]
+
+        results = await self.chat_cls.achat_batch(chat_requests)
+
+        self.assertEqual(
+            [result["response"] for result in results], ["Re: Q0", "Re: Q1", "Re: Q2"]
+        )
+        self.assertEqual(len(self.requests), 5)
+        self.assertEqual(self.chat_cls.concurrency_limiter.rate_limited, 2)
+        self.assertLess(
+            self.chat_cls.concurrency_limiter.limit,
+            self.chat_cls.concurrency_limiter.max_concurrency,
+        )
+
+    async def test_achat_batch_gives_up_after_max_retries(self):
+        self.rate_limited_responses = 10
+        self.chat_cls.rate_limit_retries = 1
+
+        results = await self.chat_cls.achat_batch(
+            [ChatRequest(system_message="Hello", user_message="Q0")]
+        )
+
+        self.assertIsNone(results[0]["response"])
+        self.assertIn("Rate limit reached", results[0]["error"])
+        self.assertEqual(len(self.requests), 2)
+
+    def test_estimate_tokens(self):
+        model_input = self.chat_cls.construct_model_input("a" * 40, "b" * 400)
+
+        self.assertEqual(self.chat_cls.estimate_tokens(model_input), 10 + 100 + 8 + 100)
+
+    async def test_achat_stream_yields_tokens_then_usage(self):
+        records = [
+            record async for record in self.chat_cls.achat_stream("Hello", "Hi?")
+        ]
+
+        self.assertEqual(
+            [record["content"] for record in records[:-1]], self.stream_tokens
+        )
+        self.assertEqual(
+            records[-1],
+            {
+                "type": "usage",
+                "usage": {
+                    "prompt_tokens": 5,
+                    "completion_tokens": 3,
+                    "total_tokens": 8,
+                },
+            },
+        )
+        body = self.requests[0][1]
+        self.assertTrue(body["stream"])
+        self.assertEqual(body["stream_options"], {"include_usage": True})
+
+    async def test_achat_stream_close_cancels_upstream(self):
+        self.endless_stream = True
+        records = self.chat_cls.achat_stream("Hello", "Hi?")
+
+        first_record = await anext(records)
+        await records.aclose()
+
+        self.assertEqual(first_record, {"type": "token", "content": "I "})
+        await asyncio.wait_for(self.stream_disconnected.wait(), timeout=5)
+
+    async def test_achat_stream_with_api_error(self):
+        self.status = 500
+
+        with self.assertRaises(Exception) as context:
+            await anext(self.chat_cls.achat_stream("Hello", "Hi?"))
+
+        self.assertIn("OpenAI API Error", str(context.exception))
+
+    async def test_achat_invalid_inputs(self):
+        with self.assertRaises(Exception):
+            await self.chat_cls.achat("", "How are you?")
+
+        self.assertEqual(self.requests, [])
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,154 @@
+import asyncio
+import time
+import unittest
+from unittest.mock import AsyncMock, MagicMock
+
+from app.v1.client.search_jobs import (
+    JobQueueFullError,
+    SearchJobManager,
+    SearchJobStore,
+)
+from app.v1.schemas.download_articles import ArticleInput
+
+
+def make_article(doi):
+    return {
+        "doi": doi,
+        "title": [f"Title {doi}"],
+        "author": [],
+        "year_published": 2024,
+        "url": f"https://doi.org/{doi}",
+        "abstract": None,
+    }
+
+
+class FakeExtractClient:
+    def __init__(self, articles, failed_dois=()):
+        self.articles = articles
+        self.failed_dois = failed_dois
+        self.get_dois_from_crossref = AsyncMock(return_value=articles)
+        self.check_for_open_access = AsyncMock(return_value=articles)
+        self.triage = MagicMock(enabled=False)
+        self.triage_articles = AsyncMock(side_effect=lambda query, articles: articles)
+
+    async def download_papers_as_completed(self, open_article_list):
+        for article in reversed(open_article_list):
+            await asyncio.sleep(0)
+            if article["doi"] in self.failed_dois:
+                yield article, "download failed"
+            else:
+                article["blob_url"] = f"https://blob/{article['doi']}"
+                yield article, None
+
+
+class TestSearchJobManager(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.collection = MagicMock()
+        self.job_store = SearchJobStore(collection_getter=lambda: self.collection)
+        self.extract_client = FakeExtractClient(
+            [make_article("10.1/a"), make_article("10.1/b")], failed_dois=("10.1/b",)
+        )
+        self.manager = SearchJobManager(
+            extract_client_factory=lambda: self.extract_client,
+            job_store=self.job_store,
+            jobs_config={"max_workers": 1, "max_queued": 1},
+        )
+
+    async def asyncTearDown(self):
+        await self.manager.stop()
+
+    async def test_run_job_records_progress_per_article(self):
+        job = await self.job_store.create(ArticleInput(query="graphs"))
+
+        await self.manager.run_job(job["_id"], ArticleInput(query="graphs"))
+
+        self.assertEqual(job["status"], "completed")
+        self.assertEqual(
+            job["progress"],
+            {"articles_found": 2, "open_access": 2, "downloaded": 1, "failed": 1},
+        )
+        self.assertEqual(
+            [article["status"] for article in job["articles"]],
+            ["downloaded", "failed"],
+        )
+        self.assertEqual([result["doi"] for result in job["results"]], ["10.1/a"])
+        self.collection.insert_one.assert_called_once()
+        self.assertTrue(self.collection.update_one.called)
+
+    async def test_run_job_records_failure(self):
+        self.extract_client.get_dois_from_crossref.side_effect = Exception(
+            "Crossref unavailable"
+        )
+        job = await self.job_store.create(ArticleInput(query="graphs"))
+
+        await self.manager.run_job(job["_id"], ArticleInput(query="graphs"))
+
+        self.assertEqual(job["status"], "failed")
+        self.assertIn("Crossref unavailable", job["error"])
+
+    async def test_submit_runs_job_in_background(self):
+        job = await self.manager.submit(ArticleInput(query="graphs"))
+        await asyncio.wait_for(self.manager.queue.join(), timeout=1)
+
+        self.assertEqual(job["status"], "completed")
+
+    async def test_submit_rejects_when_queue_is_full(self):
+        self.manager.start()
+        self.manager.queue.put_nowait(("queued-job", ArticleInput(query="a")))
+
+        with self.assertRaises(JobQueueFullError):
+            await self.manager.submit(ArticleInput(query="graphs"))
+
+    async def test_stop_marks_running_and_queued_jobs_interrupted(self):
+        started = asyncio.Event()
+
+        async def never_finishes(*args, **kwargs):
+            started.set()
+            await asyncio.Event().wait()
+
+        self.extract_client.get_dois_from_crossref = never_finishes
+        running = await self.manager.submit(ArticleInput(query="a"))
+        await asyncio.wait_for(started.wait(), timeout=1)
+        queued = await self.manager.submit(ArticleInput(query="b"))
+
+        await self.manager.stop()
+
+        for job in (running, queued):
+            self.assertEqual(job["status"], "failed")
+            self.assertEqual(job["error"], "interrupted")
+            self.collection.update_one.assert_any_call(
+                {"_id": job["_id"]},
+                {
+                    "$set": {
+                        "status": "failed",
+                        "stage": None,
+                        "error": "interrupted",
+                        "updated_at": job["updated_at"],
+                    }
+                },
+            )
+
+    async def test_concurrent_submits_cannot_overfill_queue(self):
+        # Slow job creation gives the second submit a chance to race the first
+        self.collection.insert_one.side_effect = lambda document: time.sleep(0.05)
+
+        results = await asyncio.gather(
+            self.manager.submit(ArticleInput(query="a")),
+            self.manager.submit(ArticleInput(query="b")),
+            return_exceptions=True,
+        )
+
+        self.assertIsInstance(results[0], dict)
+        self.assertIsInstance(results[1], JobQueueFullError)
+        self.assertEqual(list(self.job_store.jobs), [results[0]["_id"]])
+
+    async def test_store_keeps_job_when_mongo_is_unavailable(self):
+        self.collection.insert_one.side_effect = Exception("MongoDB unavailable")
+
+        job = await self.job_store.create(ArticleInput(query="graphs"))
+
+        self.assertIs(await self.job_store.get(job["_id"]), job)
+
+
+if __name__ == "__main__":
+    unittest.main()
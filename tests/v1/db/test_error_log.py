@@ -0,0 +1,175 @@
+import datetime
+import unittest
+from unittest.mock import MagicMock
+
+from bson import ObjectId
+
+from app.v1.db.error_log import (
+    ERROR_SORT,
+    build_error_filter,
+    decode_cursor,
+    encode_cursor,
+    find_errors,
+    init_error_collection,
+)
+
+
+def make_document(minute, func_name="download_paper"):
+    return {
+        "_id": ObjectId(),
+        "timestamp": datetime.datetime(2026, 1, 1, 12, minute),
+        "level": "ERROR",
+        "message": f"failure {minute}",
+        "funcName": func_name,
+        "doi": "10.1/a",
+    }
+
+
+class TestErrorLog(unittest.TestCase):
+    def setUp(self):
+        self.collection = MagicMock()
+        self.collection.aggregate.return_value = [
+            {"_id": "download_paper", "count": 7},
+            {"_id": "check_article_access", "count": 2},
+        ]
+
+    def set_documents(self, documents):
+        self.collection.find.return_value.sort.return_value.limit.return_value = (
+            documents
+        )
+
+    def test_cursor_round_trip(self):
+        document = make_document(5)
+
+        timestamp, object_id = decode_cursor(encode_cursor(document))
+
+        self.assertEqual(timestamp, document["timestamp"])
+        self.assertEqual(object_id, document["_id"])
+
+    def test_decode_invalid_cursor(self):
+        with self.assertRaises(ValueError):
+            decode_cursor("not-a-cursor")
+
+    def test_build_error_filter(self):
+        start = datetime.datetime(2026, 1, 1)
+
+        query = build_error_filter(
+            start=start, level="error", doi="https://doi.org/10.1/A"
+        )
+
+        self.assertEqual(
+            query,
+            {"timestamp": {"$gte": start}, "level": "ERROR", "doi": "10.1/a"},
+        )
+
+    def test_find_errors_first_page(self):
+        documents = [make_document(minute) for minute in (30, 20, 10)]
+        self.set_documents(documents)
+
+        page = find_errors(
+            level="ERROR", limit=2, collection_getter=lambda: self.collection
+        )
+
+        self.assertEqual(
+            [item["message"] for item in page["items"]], ["failure 30", "failure 20"]
+        )
+        self.assertEqual(page["items"][0]["id"], str(documents[0]["_id"]))
+        self.assertEqual(decode_cursor(page["next_cursor"])[1], documents[1]["_id"])
+        self.assertEqual(
+            page["func_name_counts"][0], {"func_name": "download_paper", "count": 7}
+        )
+        self.collection.find.assert_called_once_with({"level": "ERROR"})
+        self.collection.find.return_value.sort.return_value.limit.assert_called_once_with(
+            3
+        )
+        match = self.collection.aggregate.call_args.args[0][0]
+        self.assertEqual(match, {"$match": {"level": "ERROR"}})
+
+    def test_find_errors_continues_after_cursor(self):
+        last_seen = make_document(20)
+        self.set_documents([make_document(10)])
+
+        page = find_errors(
+            level="ERROR",
+            cursor=encode_cursor(last_seen),
+            limit=2,
+            collection_getter=lambda: self.collection,
+        )
+
+        self.assertIsNone(page["next_cursor"])
+        query = self.collection.find.call_args.args[0]
+        self.assertEqual(query["$and"][0], {"level": "ERROR"})
+        self.assertEqual(
+            query["$and"][1]["$or"],
+            [
+                {"timestamp": {"$lt": last_seen["timestamp"]}},
+                {"timestamp": last_seen["timestamp"], "_id": {"$lt": last_seen["_id"]}},
+            ],
+        )
+        # Counts cover every matching record, not just the remaining pages
+        match = self.collection.aggregate.call_args.args[0][0]
+        self.assertEqual(match, {"$match": {"level": "ERROR"}})
+
+    def test_init_error_collection_ttl(self):
+        database = MagicMock()
+        collection = database.__getitem__.return_value
+        collection.index_information.return_value = {}
+
+        init_error_collection({"retention_days": 7}, database_getter=lambda: database)
+
+        database.create_collection.assert_not_called()
+        collection.create_index.assert_any_call(
+            "timestamp", expireAfterSeconds=7 * 86400, name="timestamp_ttl"
+        )
+        keys = [call.args[0] for call in collection.create_index.call_args_list]
+        # Every page query, filtered or not, has an index in ERROR_SORT order
+        self.assertIn(ERROR_SORT, keys)
+        for field in ("level", "module", "doi"):
+            self.assertIn([(field, 1), *ERROR_SORT], keys)
+
+    def test_init_error_collection_changes_retention_in_place(self):
+        database = MagicMock()
+        collection = database.__getitem__.return_value
+        collection.index_information.return_value = {
+            "timestamp_ttl": {"key": [("timestamp", 1)], "expireAfterSeconds": 86400}
+        }
+
+        init_error_collection({"retention_days": 7}, database_getter=lambda: database)
+
+        database.command.assert_called_once_with(
+            "collMod",
+            "error-collection",
+            index={"name": "timestamp_ttl", "expireAfterSeconds": 7 * 86400},
+        )
+        for call in collection.create_index.call_args_list:
+            self.assertNotIn("expireAfterSeconds", call.kwargs)
+
+    def test_init_error_collection_creates_query_indexes_if_ttl_fails(self):
+        database = MagicMock()
+        collection = database.__getitem__.return_value
+        collection.index_information.side_effect = Exception("not authorized")
+
+        init_error_collection({"retention_days": 7}, database_getter=lambda: database)
+
+        keys = [call.args[0] for call in collection.create_index.call_args_list]
+        self.assertIn([("doi", 1), *ERROR_SORT], keys)
+
+    def test_init_error_collection_capped(self):
+        database = MagicMock()
+        database.list_collection_names.return_value = []
+        collection = database.__getitem__.return_value
+
+        init_error_collection(
+            {"capped_size_bytes": 1048576}, database_getter=lambda: database
+        )
+
+        database.create_collection.assert_called_once_with(
+            "error-collection", capped=True, size=1048576
+        )
+        for call in collection.create_index.call_args_list:
+            self.assertNotIn("expireAfterSeconds", call.kwargs)
+        collection.create_index.assert_any_call(ERROR_SORT)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,183 @@
+import json
+import logging
+import os
+import tempfile
+import threading
+import unittest
+from unittest.mock import MagicMock
+
+from pymongo.errors import BulkWriteError
+
+from app.v1.db.mongo_logger import MongoDBHandler, extract_doi
+
+
+def make_record(message, level=logging.WARNING):
+    return logging.LogRecord("test", level, __file__, 1, message, None, None)
+
+
+class TestExtractDoi(unittest.TestCase):
+    def test_extracts_doi_from_message(self):
+        record = make_record("Error downloading paper with doi 10.1000/ABC.1: timeout")
+
+        self.assertEqual(extract_doi(record), "10.1000/abc.1")
+
+    def test_prefers_doi_extra(self):
+        record = make_record("Failed for 10.1000/other")
+        record.doi = "https://doi.org/10.1000/XYZ"
+
+        self.assertEqual(extract_doi(record), "10.1000/xyz")
+
+    def test_no_doi(self):
+        self.assertIsNone(extract_doi(make_record("No open-access articles found.")))
+
+
+class TestMongoDBHandler(unittest.TestCase):
+    def setUp(self):
+        self.collection = MagicMock()
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.fallback_path = os.path.join(self.directory.name, "logs", "fallback.log")
+
+    def make_handler(self, **logging_config):
+        handler = MongoDBHandler(
+            logging_config={
+                "batch_size": 3,
+                "flush_interval": 0.05,
+                "fallback_path": self.fallback_path,
+                **logging_config,
+            },
+            collection_getter=lambda: self.collection,
+        )
+        self.addCleanup(handler.close)
+        return handler
+
+    def written_messages(self):
+        return [
+            document["message"]
+            for call in self.collection.insert_many.call_args_list
+            for document in call.args[0]
+        ]
+
+    def test_emit_does_not_write_on_calling_thread(self):
+        calling_threads = []
+        self.collection.insert_many.side_effect = lambda *args, **kwargs: (
+            calling_threads.append(threading.current_thread())
+        )
+        handler = self.make_handler()
+
+        handler.handle(make_record("first"))
+        handler.flush()
+
+        self.assertEqual(self.written_messages(), ["first"])
+        self.assertNotIn(threading.current_thread(), calling_threads)
+
+    def test_writes_in_batches(self):
+        handler = self.make_handler()
+
+        for i in range(7):
+            handler.handle(make_record(f"message {i}"))
+        handler.flush()
+
+        self.assertEqual(self.written_messages(), [f"message {i}" for i in range(7)])
+        for call in self.collection.insert_many.call_args_list:
+            self.assertLessEqual(len(call.args[0]), 3)
+        self.assertEqual(handler.stats()["written"], 7)
+
+    def test_ignores_records_below_warning(self):
+        handler = self.make_handler()
+
+        handler.handle(make_record("debug", level=logging.INFO))
+        handler.flush()
+
+        self.collection.insert_many.assert_not_called()
+
+    def test_drop_newest_when_queue_full(self):
+        blocked = threading.Event()
+        self.collection.insert_many.side_effect = lambda *args, **kwargs: blocked.wait(
+            5
+        )
+        handler = self.make_handler(max_queued=2, batch_size=1)
+
+        handler.handle(make_record("in flight"))
+        while handler.queue.qsize():
+            pass
+        for i in range(4):
+            handler.handle(make_record(f"queued {i}"))
+        blocked.set()
+        handler.flush()
+
+        self.assertEqual(handler.dropped, 2)
+        self.assertEqual(self.written_messages(), ["in flight", "queued 0", "queued 1"])
+
+    def test_drop_oldest_when_queue_full(self):
+        blocked = threading.Event()
+        self.collection.insert_many.side_effect = lambda *args, **kwargs: blocked.wait(
+            5
+        )
+        handler = self.make_handler(
+            max_queued=2, batch_size=1, overflow_policy="drop_oldest"
+        )
+
+        handler.handle(make_record("in flight"))
+        while handler.queue.qsize():
+            pass
+        for i in range(4):
+            handler.handle(make_record(f"queued {i}"))
+        blocked.set()
+        handler.flush()
+
+        self.assertEqual(handler.dropped, 2)
+        self.assertEqual(self.written_messages(), ["in flight", "queued 2", "queued 3"])
+
+    def test_falls_back_to_file_when_mongo_unreachable(self):
+        self.collection.insert_many.side_effect = Exception("connection refused")
+        handler = self.make_handler()
+
+        handler.handle(make_record("first"))
+        handler.flush()
+        handler.handle(make_record("second"))
+        handler.flush()
+
+        with open(self.fallback_path) as file:
+            entries = [json.loads(line) for line in file]
+
+        self.assertEqual([entry["message"] for entry in entries], ["first", "second"])
+        # MongoDB is not retried until retry_seconds have passed
+        self.collection.insert_many.assert_called_once()
+        self.assertEqual(handler.stats()["fallback_written"], 2)
+
+    def test_partial_bulk_write_falls_back_for_rejected_records_only(self):
+        self.collection.insert_many.side_effect = [
+            BulkWriteError(
+                {"writeErrors": [{"index": 1, "code": 11000, "errmsg": "duplicate"}]}
+            ),
+            None,
+        ]
+        handler = self.make_handler()
+
+        for message in ("first", "second", "third"):
+            handler.handle(make_record(message))
+        handler.flush()
+        handler.handle(make_record("fourth"))
+        handler.flush()
+
+        with open(self.fallback_path) as file:
+            entries = [json.loads(line) for line in file]
+
+        self.assertEqual([entry["message"] for entry in entries], ["second"])
+        # The server answered, so MongoDB stays in use
+        self.assertEqual(self.collection.insert_many.call_count, 2)
+        self.assertEqual(handler.stats()["fallback_written"], 1)
+        self.assertEqual(handler.written, 3)
+
+    def test_close_writes_queued_records(self):
+        handler = self.make_handler(flush_interval=10)
+
+        handler.handle(make_record("queued"))
+        handler.close()
+
+        self.assertEqual(self.written_messages(), ["queued"])
+
+
+if __name__ == "__main__":
+    unittest.main()
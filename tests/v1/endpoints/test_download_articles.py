@@ -0,0 +1,113 @@
+from fastapi.testclient import TestClient
+from main import app
+from unittest.mock import AsyncMock, MagicMock
+from app.v1.endpoints.download_articles import get_extract_client
+import json
+import pytest
+
+client = TestClient(app)
+
+ARTICLE = {
+    "doi": "10.1/a",
+    "title": ["A"],
+    "author": [],
+    "year_published": 2024,
+    "url": "https://doi.org/10.1/a",
+    "blob_url": "https://blob/a.pdf",
+}
+
+SUMMARY = {
+    "type": "summary",
+    "articles_found": 2,
+    "open_access": 2,
+    "downloaded": 1,
+    "failures": [{"doi": "10.1/b", "error": "No PDF content found"}],
+}
+
+
+@pytest.fixture
+def extract_cls():
+    mock_extract_cls = MagicMock()
+    app.dependency_overrides[get_extract_client] = lambda: mock_extract_cls
+    yield mock_extract_cls
+    app.dependency_overrides.clear()
+
+
+def test_retrieve_articles_success(extract_cls):
+    extract_cls.search_and_download_open_papers = AsyncMock(return_value=[ARTICLE])
+
+    response = client.post("/api/v1/search_download_articles/", json={"query": "a"})
+
+    assert response.status_code == 200
+    assert response.json()[0]["blob_url"] == "https://blob/a.pdf"
+
+
+def test_retrieve_articles_error(extract_cls):
+    extract_cls.search_and_download_open_papers = AsyncMock(
+        side_effect=Exception("No open-access articles found.")
+    )
+
+    response = client.post("/api/v1/search_download_articles/", json={"query": "a"})
+
+    assert response.status_code == 500
+    assert (
+        response.json()["detail"]
+        == "Error searching and downloading articles: No open-access articles found."
+    )
+
+
+def test_retrieve_articles_batch(extract_cls):
+    extract_cls.search_and_download_batch = AsyncMock(
+        return_value=[
+            {"query": "a", "articles": [ARTICLE], "error": None},
+            {"query": "b", "articles": [], "error": "No articles downloaded."},
+        ]
+    )
+
+    response = client.post(
+        "/api/v1/search_download_articles/batch/",
+        json={"queries": [{"query": "a"}, {"query": "b", "max_articles": 5}]},
+    )
+
+    assert response.status_code == 200
+    assert response.json()[0]["articles"][0]["DOI"] == "10.1/a"
+    assert response.json()[1]["error"] == "No articles downloaded."
+    queries = extract_cls.search_and_download_batch.call_args.args[0]
+    assert [query.max_articles for query in queries] == [10, 5]
+
+
+def _stream_records(*args, **kwargs):
+    async def records():
+        yield {"type": "article", "article": ARTICLE}
+        yield SUMMARY
+
+    return records()
+
+
+def test_stream_articles_ndjson(extract_cls):
+    extract_cls.stream_open_papers = _stream_records
+
+    response = client.post(
+        "/api/v1/search_download_articles/stream/", json={"query": "a"}
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert records[0]["article"]["doi"] == "10.1/a"
+    assert records[1] == SUMMARY
+
+
+def test_stream_articles_sse(extract_cls):
+    extract_cls.stream_open_papers = _stream_records
+
+    response = client.post(
+        "/api/v1/search_download_articles/stream/?format=sse", json={"query": "a"}
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = response.text.strip().split("\n\n")
+    assert events[0].startswith("event: article\ndata: ")
+    assert events[1].startswith("event: summary\ndata: ")
+    assert json.loads(events[1].split("data: ", 1)[1]) == SUMMARY
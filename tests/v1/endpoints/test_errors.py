@@ -0,0 +1,51 @@
+from fastapi.testclient import TestClient
+from main import app
+from unittest.mock import patch
+
+client = TestClient(app)
+
+PAGE = {
+    "items": [
+        {
+            "id": "65a000000000000000000000",
+            "timestamp": "2026-01-01T12:00:00",
+            "level": "ERROR",
+            "message": "Error downloading paper with doi 10.1/a",
+            "module": "download_articles",
+            "funcName": "download_paper",
+            "lineno": 411,
+            "pathname": "app/v1/client/download_articles.py",
+            "doi": "10.1/a",
+        }
+    ],
+    "next_cursor": "abc",
+    "func_name_counts": [{"func_name": "download_paper", "count": 1}],
+}
+
+
+def test_list_errors():
+    with patch("app.v1.endpoints.errors.find_errors", return_value=PAGE) as mock_find:
+        response = client.get(
+            "/api/v1/errors/",
+            params={"level": "ERROR", "doi": "10.1/a", "start": "2026-01-01T00:00:00"},
+        )
+
+    assert response.status_code == 200
+    assert response.json()["items"][0]["doi"] == "10.1/a"
+    assert response.json()["next_cursor"] == "abc"
+    assert response.json()["func_name_counts"][0]["count"] == 1
+    kwargs = mock_find.call_args.kwargs
+    assert kwargs["level"] == "ERROR"
+    assert kwargs["start"].year == 2026
+    assert kwargs["limit"] == 50
+
+
+def test_list_errors_invalid_cursor():
+    with patch(
+        "app.v1.endpoints.errors.find_errors",
+        side_effect=ValueError("Invalid cursor: x"),
+    ):
+        response = client.get("/api/v1/errors/", params={"cursor": "x"})
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor: x"
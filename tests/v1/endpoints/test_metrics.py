@@ -0,0 +1,20 @@
+from fastapi.testclient import TestClient
+from main import app
+from app.v1.utils import metrics
+
+client = TestClient(app)
+
+
+def test_metrics():
+    metrics.registry.clear()
+    metrics.UPSTREAM_REQUESTS.inc(upstream="crossref", outcome="success")
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert (
+        'research_agent_upstream_requests_total{upstream="crossref",outcome="success"} 1'
+        in response.text.splitlines()
+    )
+    assert "# TYPE research_agent_stage_duration_seconds histogram" in response.text
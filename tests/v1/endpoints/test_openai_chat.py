@@ -1,6 +1,7 @@
 from fastapi.testclient import TestClient
 from main import app
-from unittest.mock import patch
+from unittest.mock import AsyncMock, patch
+import json
 
 client = TestClient(app)
 
@@ -10,7 +11,9 @@ def test_post_chat_success():
     user_message = "How are you?"
     expected_response = "I am good."
 
-    with patch("app.v1.client.openai_chat.OpenAIChat.chat") as mock_chat:
+    with patch(
+        "app.v1.client.openai_chat.OpenAIChat.achat", new_callable=AsyncMock
+    ) as mock_chat:
         mock_chat.return_value = expected_response
 
         response = client.post(
@@ -22,7 +25,7 @@ def test_post_chat_success():
         assert response.json()["response"] == expected_response
         assert "request_id" in response.json()
         assert "timestamp" in response.json()
-        mock_chat.assert_called_once_with(system_message, user_message)
+        mock_chat.assert_called_once_with(system_message, user_message, use_cache=True)
 
 
 def test_post_chat_error():
@@ -31,7 +34,9 @@ def test_post_chat_error():
     expected_response = "I am good."
     error_message = "OpenAI API Error: Something went wrong."
 
-    with patch("app.v1.client.openai_chat.OpenAIChat.chat") as mock_chat:
+    with patch(
+        "app.v1.client.openai_chat.OpenAIChat.achat", new_callable=AsyncMock
+    ) as mock_chat:
         mock_chat.return_value = expected_response
 
         mock_chat.side_effect = Exception(error_message)
@@ -46,13 +51,126 @@ def test_post_chat_error():
             response.json()["detail"]
             == f"Error processing chat request: {error_message}"
         )
-        mock_chat.assert_called_once_with(system_message, user_message)
+        mock_chat.assert_called_once_with(system_message, user_message, use_cache=True)
 
 
 def test_post_chat_missing_parameter():
     system_message = "Hello."
 
-    with patch("app.v1.client.openai_chat.OpenAIChat.chat"):
+    with patch("app.v1.client.openai_chat.OpenAIChat.achat", new_callable=AsyncMock):
         response = client.post("/api/v1/chat/", json={"system_message": system_message})
 
         assert response.status_code == 422
+
+
+def _stream_records(*records, error=None):
+    async def achat_stream(self, system_message, user_message, use_cache=True):
+        for record in records:
+            yield record
+        if error:
+            raise error
+
+    return achat_stream
+
+
+def _parse_events(body):
+    events = []
+    for block in body.strip().split("\n\n"):
+        event, data = block.split("\n")
+        events.append((event[len("event: ") :], json.loads(data[len("data: ") :])))
+    return events
+
+
+def test_post_chat_stream():
+    usage = {"prompt_tokens": 5, "completion_tokens": 2, "total_tokens": 7}
+    achat_stream = _stream_records(
+        {"type": "token", "content": "I am "},
+        {"type": "token", "content": "good."},
+        {"type": "usage", "usage": usage},
+    )
+
+    with patch("app.v1.client.openai_chat.OpenAIChat.achat_stream", achat_stream):
+        response = client.post(
+            "/api/v1/chat/",
+            json={"system_message": "Hello.", "user_message": "Hi?", "stream": True},
+        )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = _parse_events(response.text)
+    assert events[:2] == [
+        ("token", {"content": "I am "}),
+        ("token", {"content": "good."}),
+    ]
+    event, done = events[2]
+    assert event == "done"
+    assert done["response"] == "I am good."
+    assert done["usage"] == usage
+    assert "request_id" in done
+    assert "timestamp" in done
+
+
+def test_post_chat_stream_upstream_error_before_first_token():
+    achat_stream = _stream_records(error=Exception("OpenAI API Error: Unauthorized"))
+
+    with patch("app.v1.client.openai_chat.OpenAIChat.achat_stream", achat_stream):
+        response = client.post(
+            "/api/v1/chat/",
+            json={"system_message": "Hello.", "user_message": "Hi?", "stream": True},
+        )
+
+    assert response.status_code == 500
+    assert response.json()["detail"] == (
+        "Error processing chat request: OpenAI API Error: Unauthorized"
+    )
+
+
+def test_post_chat_stream_error_after_first_token():
+    achat_stream = _stream_records(
+        {"type": "token", "content": "I am "},
+        error=Exception("OpenAI API Error: Connection reset"),
+    )
+
+    with patch("app.v1.client.openai_chat.OpenAIChat.achat_stream", achat_stream):
+        response = client.post(
+            "/api/v1/chat/",
+            json={"system_message": "Hello.", "user_message": "Hi?", "stream": True},
+        )
+
+    assert response.status_code == 200
+    events = _parse_events(response.text)
+    assert events[0] == ("token", {"content": "I am "})
+    assert events[1][0] == "error"
+
+
+def test_post_chat_batch():
+    results = [
+        {"response": "I am good.", "error": None},
+        {"response": None, "error": "OpenAI API Error: Rate limit reached."},
+    ]
+
+    with patch(
+        "app.v1.client.openai_chat.OpenAIChat.achat_batch",
+        new_callable=AsyncMock,
+        return_value=results,
+    ) as mock_batch:
+        response = client.post(
+            "/api/v1/chat/batch/",
+            json={
+                "requests": [
+                    {"system_message": "Hello.", "user_message": "How are you?"},
+                    {"system_message": "Hello.", "user_message": "And now?"},
+                ]
+            },
+        )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [item["response"] for item in body] == ["I am good.", None]
+    assert body[1]["error"] == "OpenAI API Error: Rate limit reached."
+    assert all("request_id" in item for item in body)
+    chat_requests = mock_batch.call_args.args[0]
+    assert [request.user_message for request in chat_requests] == [
+        "How are you?",
+        "And now?",
+    ]
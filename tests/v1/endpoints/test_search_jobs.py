@@ -0,0 +1,92 @@
+from fastapi.testclient import TestClient
+from main import app
+from unittest.mock import patch, AsyncMock, MagicMock
+from app.v1.client.search_jobs import JobQueueFullError
+import datetime
+
+client = TestClient(app)
+
+path = "app.v1.endpoints.search_jobs.get_search_job_manager"
+
+
+def make_job(status="running"):
+    now = datetime.datetime.utcnow()
+    return {
+        "_id": "job-1",
+        "status": status,
+        "stage": "download",
+        "query": "graphs",
+        "max_articles": 10,
+        "progress": {
+            "articles_found": 2,
+            "open_access": 2,
+            "downloaded": 1,
+            "failed": 0,
+        },
+        "articles": [
+            {"doi": "10.1/a", "title": ["A"], "status": "downloaded"},
+            {"doi": "10.1/b", "title": ["B"], "status": "pending"},
+        ],
+        "results": [
+            {
+                "doi": "10.1/a",
+                "title": ["A"],
+                "author": [],
+                "year_published": 2024,
+                "url": "https://doi.org/10.1/a",
+                "blob_url": "https://blob/a.pdf",
+            }
+        ],
+        "error": None,
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+def test_submit_search_job():
+    manager = MagicMock()
+    manager.submit = AsyncMock(return_value=make_job(status="queued"))
+
+    with patch(path, return_value=manager):
+        response = client.post(
+            "/api/v1/search_download_jobs/", json={"query": "graphs"}
+        )
+
+    assert response.status_code == 202
+    assert response.json() == {"job_id": "job-1", "status": "queued"}
+
+
+def test_submit_search_job_queue_full():
+    manager = MagicMock()
+    manager.submit = AsyncMock(side_effect=JobQueueFullError("Too many jobs"))
+
+    with patch(path, return_value=manager):
+        response = client.post(
+            "/api/v1/search_download_jobs/", json={"query": "graphs"}
+        )
+
+    assert response.status_code == 503
+
+
+def test_get_search_job_status_and_results():
+    manager = MagicMock()
+    manager.job_store.get = AsyncMock(return_value=make_job())
+
+    with patch(path, return_value=manager):
+        status_response = client.get("/api/v1/search_download_jobs/job-1")
+        results_response = client.get("/api/v1/search_download_jobs/job-1/results")
+
+    assert status_response.status_code == 200
+    assert status_response.json()["progress"]["downloaded"] == 1
+    assert status_response.json()["articles"][1]["status"] == "pending"
+    assert results_response.json()[0]["blob_url"] == "https://blob/a.pdf"
+
+
+def test_get_search_job_not_found():
+    manager = MagicMock()
+    manager.job_store.get = AsyncMock(return_value=None)
+
+    with patch(path, return_value=manager):
+        response = client.get("/api/v1/search_download_jobs/missing")
+
+    assert response.status_code == 404
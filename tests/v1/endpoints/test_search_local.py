@@ -0,0 +1,42 @@
+import tempfile
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+from main import app
+from app.v1.utils.search_index import SearchIndex
+
+client = TestClient(app)
+
+
+def test_search_local():
+    with tempfile.TemporaryDirectory() as directory:
+        search_index = SearchIndex(directory)
+        search_index.add(
+            {
+                "doi": "10.1/GNN",
+                "title": ["Graph neural networks"],
+                "abstract": "Message passing.",
+                "blob_url": "https://blob/gnn.pdf",
+            }
+        )
+
+        with patch(
+            "app.v1.endpoints.search_local.get_search_index",
+            return_value=search_index,
+        ):
+            response = client.post(
+                "/api/v1/search_local/", json={"query": "graph", "limit": 5}
+            )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["total_documents"] == 1
+    assert body["results"][0]["doi"] == "10.1/gnn"
+    assert body["results"][0]["blob_url"] == "https://blob/gnn.pdf"
+
+
+def test_search_local_disabled():
+    with patch("app.v1.endpoints.search_local.get_search_index", return_value=None):
+        response = client.post("/api/v1/search_local/", json={"query": "graph"})
+
+    assert response.status_code == 503
@@ -0,0 +1,97 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+from app.v1.utils.cache import CACHE_MISS, TwoTierCache
+
+path = TwoTierCache.__module__
+
+
+class TestTwoTierCache(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.collection = MagicMock()
+        self.collection.find_one.return_value = None
+        self.cache = TwoTierCache(
+            "test",
+            ttl_seconds=60,
+            max_entries=2,
+            collection_getter=lambda: self.collection,
+        )
+
+    async def test_get_and_set(self):
+        await self.cache.set("a", {"is_oa": False})
+
+        self.assertEqual(await self.cache.get("a"), {"is_oa": False})
+        self.assertIs(await self.cache.get("b"), CACHE_MISS)
+        self.assertEqual(self.cache.hits, 1)
+        self.assertEqual(self.cache.misses, 1)
+        self.collection.replace_one.assert_called_once()
+
+    async def test_get_returns_copy(self):
+        await self.cache.set("a", [{"doi": "10.1/a"}])
+
+        value = await self.cache.get("a")
+        value[0]["doi"] = "changed"
+
+        self.assertEqual(await self.cache.get("a"), [{"doi": "10.1/a"}])
+
+    async def test_lru_eviction(self):
+        self.cache.persistent = False
+        await self.cache.set("a", 1)
+        await self.cache.set("b", 2)
+        await self.cache.get("a")
+        await self.cache.set("c", 3)
+
+        self.assertEqual(await self.cache.get("a"), 1)
+        self.assertIs(await self.cache.get("b"), CACHE_MISS)
+
+    async def test_expired_entries_are_misses(self):
+        self.cache.persistent = False
+
+        with patch(path + ".time.time", return_value=1000.0):
+            await self.cache.set("a", 1)
+
+        with patch(path + ".time.time", return_value=1061.0):
+            self.assertIs(await self.cache.get("a"), CACHE_MISS)
+
+    async def test_persistent_hit_populates_memory(self):
+        self.collection.find_one.return_value = {"_id": "a", "value": True}
+
+        self.assertTrue(await self.cache.get("a"))
+        self.assertTrue(await self.cache.get("a"))
+        self.assertEqual(self.cache.persistent_hits, 1)
+        self.collection.find_one.assert_called_once()
+
+    async def test_persistent_failure_falls_back_to_memory(self):
+        self.collection.find_one.side_effect = Exception("MongoDB unavailable")
+
+        self.assertIs(await self.cache.get("a"), CACHE_MISS)
+        self.assertIs(await self.cache.get("a"), CACHE_MISS)
+        self.assertEqual(self.cache.persistent_errors, 1)
+
+    async def test_persistent_operations_run_under_timeout(self):
+        cache = TwoTierCache(
+            "test",
+            ttl_seconds=60,
+            collection_getter=lambda: self.collection,
+            timeout_seconds=0.5,
+        )
+
+        with patch(f"{path}.pymongo.timeout") as timeout:
+            await cache.get("a")
+            await cache.set("a", True)
+
+        self.assertEqual([call.args for call in timeout.call_args_list], [(0.5,)] * 2)
+
+    def test_make_key_is_stable(self):
+        self.assertEqual(
+            TwoTierCache.make_key("query", "filter", 10),
+            TwoTierCache.make_key("query", "filter", 10),
+        )
+        self.assertNotEqual(
+            TwoTierCache.make_key("query", "filter", 10),
+            TwoTierCache.make_key("query", "filter", 20),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
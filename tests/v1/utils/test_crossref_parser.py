@@ -0,0 +1,73 @@
+import json
+import unittest
+
+from app.v1.utils.crossref_parser import CrossrefItemsParser
+
+RESPONSE = {
+    "status": "ok",
+    "message-type": "work-list",
+    "message": {
+        "facets": {},
+        "query": {"search-terms": 'items: "[x]"', "start-index": 0},
+        "next-cursor": "cursor-2",
+        "total-results": 3,
+        "items": [
+            {"DOI": "10.1/a", "title": ["Graph ] neural {nets}"], "author": []},
+            {"DOI": "10.1/b", "title": ['Réseaux "neuronaux"'], "author": []},
+            {"DOI": "10.1/c", "title": ["グラフ"], "author": [], "items": [1]},
+        ],
+        "items-per-page": 3,
+    },
+}
+
+
+def parse_in_chunks(body, chunk_size):
+    parser = CrossrefItemsParser()
+    items = []
+    for start in range(0, len(body), chunk_size):
+        items.extend(parser.feed(body[start : start + chunk_size]))
+    return items, parser.close()
+
+
+class TestCrossrefItemsParser(unittest.TestCase):
+    def test_parses_items_and_envelope(self):
+        body = json.dumps(RESPONSE, ensure_ascii=False).encode("utf-8")
+
+        for chunk_size in (1, 7, 64, len(body)):
+            items, message = parse_in_chunks(body, chunk_size)
+
+            self.assertEqual(items, RESPONSE["message"]["items"])
+            self.assertEqual(message["next-cursor"], "cursor-2")
+            self.assertEqual(message["items-per-page"], 3)
+            self.assertEqual(message["items"], [])
+
+    def test_items_are_returned_as_they_complete(self):
+        body = json.dumps(RESPONSE).encode("utf-8")
+        second_item_start = body.index(b'{"DOI": "10.1/b"')
+        parser = CrossrefItemsParser()
+
+        first_items = parser.feed(body[:second_item_start])
+        rest_items = parser.feed(body[second_item_start:])
+
+        self.assertEqual([item["DOI"] for item in first_items], ["10.1/a"])
+        self.assertEqual([item["DOI"] for item in rest_items], ["10.1/b", "10.1/c"])
+
+    def test_empty_items(self):
+        body = json.dumps({"message": {"items": [], "total-results": 0}}).encode()
+
+        items, message = parse_in_chunks(body, 5)
+
+        self.assertEqual(items, [])
+        self.assertEqual(message["total-results"], 0)
+
+    def test_truncated_body_raises(self):
+        body = json.dumps(RESPONSE).encode("utf-8")
+        parser = CrossrefItemsParser()
+        parser.feed(body[: len(body) // 2])
+
+        with self.assertRaises(ValueError):
+            parser.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
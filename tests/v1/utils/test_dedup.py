@@ -0,0 +1,173 @@
+import os
+import tempfile
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from app.v1.utils.dedup import (
+    ARTICLES_FILE,
+    SIGNATURES_FILE,
+    Deduplicator,
+    MinHasher,
+    article_text,
+    normalize_text,
+)
+
+ABSTRACT = (
+    "We study message passing neural networks on large sparse graphs and show "
+    "that sampling neighbourhoods during training keeps memory flat while "
+    "matching the accuracy of full-batch training on node classification."
+)
+
+
+def make_article(doi, title, abstract=ABSTRACT, year=2024):
+    return {
+        "doi": doi,
+        "title": [title],
+        "abstract": abstract,
+        "year_published": year,
+        "author": [],
+        "url": f"https://doi.org/{doi}",
+    }
+
+
+PREPRINT = make_article(
+    "10.48550/arxiv.2401.1", "Scalable graph neural networks", year=2023
+)
+PUBLISHED = make_article(
+    "10.1/journal.1", "Scalable Graph Neural Networks.", ABSTRACT + " Revised."
+)
+UNRELATED = make_article(
+    "10.1/other",
+    "Reinforcement learning for robots",
+    "Agents learn to grasp objects from pixels with a reward for each success, "
+    "using a replay buffer shared across a fleet of robot arms.",
+)
+
+
+class TestMinHash(unittest.TestCase):
+    def test_normalize_text(self):
+        self.assertEqual(
+            normalize_text("<jats:p>Graph-Neural  Networks!</jats:p>"),
+            "graph neural networks",
+        )
+
+    def test_similarity_estimates_jaccard(self):
+        hasher = MinHasher()
+        signatures = hasher.signatures(
+            [
+                normalize_text(PREPRINT["title"][0] + " " + PREPRINT["abstract"]),
+                normalize_text(PUBLISHED["title"][0] + " " + PUBLISHED["abstract"]),
+                normalize_text(UNRELATED["title"][0] + " " + UNRELATED["abstract"]),
+            ]
+        )
+
+        self.assertEqual(signatures.shape, (3, 128))
+        self.assertEqual(signatures.dtype, np.uint32)
+        self.assertGreater(np.mean(signatures[0] == signatures[1]), 0.8)
+        self.assertLess(np.mean(signatures[0] == signatures[2]), 0.2)
+
+
+def remember_in_worker(directory, worker):
+    """Store papers from a separate process, like one uvicorn worker"""
+    deduplicator = Deduplicator(directory)
+    for number in range(25):
+        deduplicator.remember(
+            [
+                make_article(
+                    f"10.1/{worker}.{number}",
+                    f"Paper {number} from worker {worker}",
+                    f"{ABSTRACT} Worker {worker} wrote paper {number}.",
+                )
+            ]
+        )
+
+
+class TestDeduplicator(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.deduplicator = Deduplicator(self.directory)
+
+    def test_keeps_published_version_of_cluster(self):
+        kept = self.deduplicator.session().deduplicate(
+            [dict(PREPRINT), dict(UNRELATED), dict(PUBLISHED)]
+        )
+
+        self.assertEqual(
+            [article["doi"] for article in kept], ["10.1/journal.1", "10.1/other"]
+        )
+        self.assertEqual(kept[0]["duplicate_dois"], ["10.48550/arxiv.2401.1"])
+
+    def test_drops_copies_of_articles_from_earlier_batches(self):
+        session = self.deduplicator.session()
+
+        first = session.deduplicate([dict(PUBLISHED)])
+        second = session.deduplicate([dict(PREPRINT), dict(UNRELATED)])
+
+        self.assertEqual([article["doi"] for article in second], ["10.1/other"])
+        self.assertEqual(first[0]["duplicate_dois"], ["10.48550/arxiv.2401.1"])
+
+    def test_short_texts_are_never_duplicates(self):
+        articles = [
+            make_article("10.1/a", "Title 10.1/a", abstract=None),
+            make_article("10.1/b", "Title 10.1/b", abstract=None),
+        ]
+
+        kept = self.deduplicator.session().deduplicate(articles)
+
+        self.assertEqual(len(kept), 2)
+
+    def test_stored_version_stands_in_for_new_copies(self):
+        self.assertEqual(self.deduplicator.remember([dict(PREPRINT)]), 1)
+        self.assertEqual(self.deduplicator.remember([dict(PREPRINT)]), 0)
+
+        reloaded = Deduplicator(self.directory)
+        kept = reloaded.session().deduplicate([dict(PUBLISHED), dict(UNRELATED)])
+
+        self.assertEqual(
+            [article["doi"] for article in kept],
+            ["10.48550/arxiv.2401.1", "10.1/other"],
+        )
+        self.assertEqual(kept[0]["duplicate_dois"], ["10.1/journal.1"])
+        self.assertEqual(kept[0]["title"], PREPRINT["title"])
+
+    def test_load_cuts_off_a_partial_append(self):
+        self.deduplicator.remember([dict(PREPRINT), dict(UNRELATED)])
+        with open(os.path.join(self.directory, ARTICLES_FILE)) as file:
+            first_line = file.readline()
+        with open(os.path.join(self.directory, ARTICLES_FILE), "w") as file:
+            file.write(first_line)
+
+        reloaded = Deduplicator(self.directory)
+
+        self.assertEqual(len(reloaded.stored_articles), 1)
+        self.assertEqual(
+            os.path.getsize(os.path.join(self.directory, SIGNATURES_FILE)), 128 * 4
+        )
+        reloaded.remember([dict(UNRELATED)])
+        self.assertEqual(len(Deduplicator(self.directory).stored_articles), 2)
+
+    def test_appends_from_several_processes_stay_aligned(self):
+        with ProcessPoolExecutor(max_workers=4) as executor:
+            for result in [
+                executor.submit(remember_in_worker, self.directory, worker)
+                for worker in range(4)
+            ]:
+                result.result()
+
+        reloaded = Deduplicator(self.directory)
+
+        self.assertEqual(len(reloaded.stored_articles), 100)
+        np.testing.assert_array_equal(
+            reloaded.stored_signatures,
+            reloaded.hasher.signatures(
+                [article_text(article) for article in reloaded.stored_articles]
+            ),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,192 @@
+import asyncio
+import unittest
+
+import aiohttp
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from app.v1.utils.http_sessions import HTTPSessionPool
+from app.v1.utils.resilience import CircuitOpenError
+
+
+class TestHTTPSessionPool(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.pool = HTTPSessionPool(
+            pool_config={
+                "default": {"limit_per_host": 5},
+                "crossref": {"limit_per_host": 2},
+            }
+        )
+
+    async def asyncTearDown(self):
+        await self.pool.close()
+
+    async def test_get_session_reuses_session(self):
+        first = self.pool.get_session("crossref")
+        second = self.pool.get_session("crossref")
+
+        self.assertIs(first, second)
+        self.assertIsNot(first, self.pool.get_session("unpaywall"))
+
+    async def test_per_host_settings_override_defaults(self):
+        crossref = self.pool.get_session("crossref")
+        unpaywall = self.pool.get_session("unpaywall")
+
+        self.assertEqual(crossref.connector.limit_per_host, 2)
+        self.assertEqual(unpaywall.connector.limit_per_host, 5)
+
+    async def test_closed_session_is_recreated(self):
+        first = self.pool.get_session("crossref")
+        await first.close()
+
+        self.assertIsNot(first, self.pool.get_session("crossref"))
+
+
+class TestResilientRequests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.statuses = []
+        self.calls = 0
+
+        async def handler(request):
+            self.calls += 1
+            status = self.statuses.pop(0) if self.statuses else 200
+            headers = {"Retry-After": "0.05"} if status == 429 else {}
+            return web.Response(status=status, text="body", headers=headers)
+
+        async def hang(request):
+            await asyncio.sleep(5)
+            return web.Response(text="late")
+
+        app = web.Application()
+        app.router.add_get("/", handler)
+        app.router.add_post("/", handler)
+        app.router.add_get("/hang", hang)
+        self.server = TestServer(app)
+        await self.server.start_server()
+        self.addAsyncCleanup(self.server.close)
+
+        self.pool = HTTPSessionPool(
+            pool_config={
+                "default": {
+                    "max_retries": 2,
+                    "backoff_base": 0.001,
+                    "breaker_failure_threshold": 3,
+                    "timeout_total": 0.2,
+                }
+            }
+        )
+        self.addAsyncCleanup(self.pool.close)
+        self.url = str(self.server.make_url("/"))
+
+    async def test_retries_transient_statuses(self):
+        self.statuses = [503, 502]
+
+        async with self.pool.request("crossref", "GET", self.url) as response:
+            body = await response.text()
+
+        self.assertEqual(body, "body")
+        self.assertEqual(self.calls, 3)
+
+    async def test_does_not_retry_client_errors(self):
+        self.statuses = [404]
+
+        with self.assertRaises(aiohttp.ClientResponseError):
+            async with self.pool.request("crossref", "GET", self.url):
+                pass
+
+        self.assertEqual(self.calls, 1)
+
+    async def test_status_errors_can_be_left_to_the_caller(self):
+        self.statuses = [404]
+
+        async with self.pool.request(
+            "unpaywall", "GET", self.url, raise_for_status=False
+        ) as response:
+            self.assertEqual(response.status, 404)
+
+    async def test_non_idempotent_methods_are_not_retried(self):
+        self.statuses = [503]
+
+        with self.assertRaises(aiohttp.ClientResponseError):
+            async with self.pool.request("crossref", "POST", self.url):
+                pass
+
+        self.assertEqual(self.calls, 1)
+
+    async def test_timeout(self):
+        with self.assertRaises(asyncio.TimeoutError):
+            async with self.pool.request(
+                "pdf", "GET", str(self.server.make_url("/hang"))
+            ):
+                pass
+
+    async def test_circuit_opens_and_fails_fast(self):
+        self.statuses = [503] * 3
+
+        with self.assertRaises(aiohttp.ClientResponseError):
+            async with self.pool.request("pdf", "GET", self.url):
+                pass
+        with self.assertRaises(CircuitOpenError):
+            async with self.pool.request("pdf", "GET", self.url):
+                pass
+
+        self.assertEqual(self.calls, 3)
+        # Breakers are per upstream and host
+        async with self.pool.request("crossref", "GET", self.url) as response:
+            self.assertEqual(response.status, 200)
+
+    async def test_rate_limited_host_is_paused_then_retried(self):
+        self.statuses = [429]
+
+        start = asyncio.get_running_loop().time()
+        async with self.pool.request("crossref", "GET", self.url) as response:
+            self.assertEqual(response.status, 200)
+
+        self.assertGreaterEqual(asyncio.get_running_loop().time() - start, 0.04)
+        limiter = self.pool.get_host_limiter(
+            "crossref", self.server.make_url("/").authority
+        )
+        self.assertEqual(limiter.rate_limited, 1)
+        self.assertEqual(limiter.in_flight, 0)
+        # Rate limiting does not count against the circuit breaker
+        self.assertEqual(
+            self.pool.get_breaker(
+                "crossref", self.server.make_url("/").authority
+            ).failures,
+            0,
+        )
+
+    async def test_in_flight_requests_per_host_are_capped(self):
+        self.pool.pool_config["default"]["max_in_flight"] = 2
+        in_flight = 0
+        peak = 0
+
+        async def fetch():
+            nonlocal in_flight, peak
+            async with self.pool.request("pdf", "GET", self.url) as response:
+                in_flight += 1
+                peak = max(peak, in_flight)
+                await asyncio.sleep(0.01)
+                await response.read()
+                in_flight -= 1
+
+        await asyncio.gather(*[fetch() for _ in range(6)])
+
+        self.assertEqual(peak, 2)
+
+    async def test_cancelled_request_frees_its_slot(self):
+        task = asyncio.create_task(self._hang())
+        await asyncio.sleep(0.02)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+        limiter = self.pool.get_host_limiter("pdf", self.server.make_url("/").authority)
+        self.assertEqual(limiter.in_flight, 0)
+
+    async def _hang(self):
+        async with self.pool.request("pdf", "GET", str(self.server.make_url("/hang"))):
+            pass
+
+
+if __name__ == "__main__":
+    unittest.main()
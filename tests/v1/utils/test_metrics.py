@@ -0,0 +1,102 @@
+import time
+import unittest
+
+from app.v1.utils.metrics import MetricsRegistry, track_stage, track_upstream
+from app.v1.utils import metrics
+
+
+class TestMetricsRegistry(unittest.TestCase):
+    def setUp(self):
+        self.registry = MetricsRegistry()
+
+    def test_counter_and_gauge(self):
+        counter = self.registry.counter("requests_total", "Requests", ["upstream"])
+        gauge = self.registry.gauge("in_flight", "In flight")
+
+        counter.inc(upstream="crossref")
+        counter.inc(2, upstream="crossref")
+        gauge.inc()
+        gauge.inc()
+        gauge.dec()
+
+        self.assertEqual(counter.get(upstream="crossref"), 3)
+        self.assertEqual(
+            self.registry.render(),
+            "# HELP requests_total Requests\n"
+            "# TYPE requests_total counter\n"
+            'requests_total{upstream="crossref"} 3\n'
+            "# HELP in_flight In flight\n"
+            "# TYPE in_flight gauge\n"
+            "in_flight 1\n",
+        )
+
+    def test_histogram_buckets_are_cumulative(self):
+        histogram = self.registry.histogram(
+            "latency_seconds", "Latency", ["stage"], buckets=(0.1, 1)
+        )
+
+        histogram.observe(0.05, stage="search")
+        histogram.observe(0.1, stage="search")
+        histogram.observe(5, stage="search")
+
+        lines = self.registry.render().splitlines()
+        self.assertIn('latency_seconds_bucket{stage="search",le="0.1"} 2', lines)
+        self.assertIn('latency_seconds_bucket{stage="search",le="1.0"} 2', lines)
+        self.assertIn('latency_seconds_bucket{stage="search",le="+Inf"} 3', lines)
+        self.assertIn('latency_seconds_sum{stage="search"} 5.15', lines)
+        self.assertIn('latency_seconds_count{stage="search"} 3', lines)
+
+    def test_label_values_are_escaped(self):
+        counter = self.registry.counter("errors_total", "Errors", ["message"])
+
+        counter.inc(message='bad "quote"\n')
+
+        self.assertIn(
+            'errors_total{message="bad \\"quote\\"\\n"} 1', self.registry.render()
+        )
+
+
+class TestTracking(unittest.TestCase):
+    def setUp(self):
+        metrics.registry.clear()
+
+    def test_track_stage_records_outcome(self):
+        with track_stage("search"):
+            pass
+
+        with self.assertRaises(ValueError):
+            with track_stage("search"):
+                raise ValueError("failed")
+
+        self.assertEqual(
+            metrics.STAGE_DURATION.get_count(stage="search", outcome="success"), 1
+        )
+        self.assertEqual(
+            metrics.STAGE_DURATION.get_count(stage="search", outcome="failure"), 1
+        )
+        self.assertEqual(metrics.STAGE_IN_FLIGHT.get(stage="search"), 0)
+
+    def test_track_stage_leaves_out_paused_time(self):
+        with track_stage("search") as timer:
+            with timer.paused():
+                self.assertEqual(metrics.STAGE_IN_FLIGHT.get(stage="search"), 0)
+                time.sleep(0.05)
+
+        self.assertLess(
+            metrics.STAGE_DURATION.get_sum(stage="search", outcome="success"), 0.05
+        )
+        self.assertEqual(metrics.STAGE_IN_FLIGHT.get(stage="search"), 0)
+
+    def test_track_upstream_counts_requests(self):
+        with track_upstream("unpaywall"):
+            self.assertEqual(metrics.UPSTREAM_IN_FLIGHT.get(upstream="unpaywall"), 1)
+
+        self.assertEqual(
+            metrics.UPSTREAM_REQUESTS.get(upstream="unpaywall", outcome="success"), 1
+        )
+        self.assertEqual(metrics.UPSTREAM_DURATION.get_count(upstream="unpaywall"), 1)
+        self.assertEqual(metrics.UPSTREAM_IN_FLIGHT.get(upstream="unpaywall"), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,152 @@
+import os
+import tempfile
+import unittest
+
+from app.v1.utils.pdf_text import chunk_text, extract_pdf_text, process_pdf
+from app.v1.utils.text_extraction import TextExtractor
+
+
+def make_pdf(pages):
+    """A minimal PDF with one line of Helvetica text per string on each page"""
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    kids = []
+    for lines in pages:
+        stream = (
+            b"BT /F1 12 Tf 72 720 Td 14 TL "
+            + b" ".join(b"(" + line.encode() + b") Tj T*" for line in lines)
+            + b" ET"
+        )
+        objects.append(
+            b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream"
+        )
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % len(objects)
+        )
+        kids.append(len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+        b" ".join(b"%d 0 R" % kid for kid in kids),
+        len(kids),
+    )
+
+    body = b"%PDF-1.4\n"
+    offsets = []
+    for number, obj in enumerate(objects, 1):
+        offsets.append(len(body))
+        body += b"%d 0 obj\n" % number + obj + b"\nendobj\n"
+    xref = len(body)
+    body += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    body += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    body += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1,
+        xref,
+    )
+    return body
+
+
+class TestChunkText(unittest.TestCase):
+    def test_chunks_overlap_and_cover_text(self):
+        text = " ".join(f"word{i:03d}" for i in range(300))
+
+        chunks = chunk_text(text, chunk_size=200, chunk_overlap=50)
+
+        self.assertEqual(chunks[0]["start"], 0)
+        self.assertEqual(chunks[-1]["end"], len(text))
+        for previous, chunk in zip(chunks, chunks[1:]):
+            self.assertEqual(chunk["start"], previous["end"] - 50)
+            self.assertEqual(chunk["index"], previous["index"] + 1)
+        for chunk in chunks:
+            self.assertLessEqual(chunk["end"] - chunk["start"], 200)
+
+    def test_chunks_end_on_whitespace(self):
+        text = " ".join(f"word{i:03d}" for i in range(300))
+
+        chunks = chunk_text(text, chunk_size=200, chunk_overlap=0)
+
+        for chunk in chunks[:-1]:
+            self.assertTrue(text[chunk["end"]].isspace())
+        self.assertEqual(
+            " ".join(chunk["text"] for chunk in chunks).split(), text.split()
+        )
+
+    def test_chunks_are_tagged_with_their_section(self):
+        text = "Introduction\n" + "a " * 100 + "\nMethods\n" + "b " * 100
+        sections = [
+            {"title": "Introduction", "start": 0},
+            {"title": "Methods", "start": text.index("Methods")},
+        ]
+
+        chunks = chunk_text(text, chunk_size=100, chunk_overlap=10, sections=sections)
+
+        self.assertEqual(chunks[0]["section"], "Introduction")
+        self.assertEqual(chunks[-1]["section"], "Methods")
+
+    def test_empty_text_has_no_chunks(self):
+        self.assertEqual(chunk_text(""), [])
+
+    def test_overlap_must_be_smaller_than_size(self):
+        with self.assertRaises(ValueError):
+            chunk_text("text", chunk_size=100, chunk_overlap=100)
+
+
+class TestExtractPdfText(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "paper.pdf")
+        with open(self.path, "wb") as file:
+            file.write(
+                make_pdf(
+                    [
+                        ["1. Introduction", "Graphs are everywhere."],
+                        ["2. Methods", "We count the edges."],
+                    ]
+                )
+            )
+
+    def test_extracts_pages_and_heading_sections(self):
+        extracted = extract_pdf_text(self.path)
+
+        self.assertEqual(extracted["page_count"], 2)
+        self.assertIn("Graphs are everywhere.", extracted["text"])
+        self.assertEqual(
+            [(section["title"], section["page"]) for section in extracted["sections"]],
+            [("1. Introduction", 1), ("2. Methods", 2)],
+        )
+
+    def test_process_pdf_returns_chunks_and_timings(self):
+        result = process_pdf(self.path, chunk_size=30, chunk_overlap=5)
+
+        self.assertEqual(result["page_count"], 2)
+        self.assertGreater(len(result["chunks"]), 1)
+        self.assertEqual(result["chunks"][0]["section"], "1. Introduction")
+        self.assertEqual(result["chunks"][-1]["section"], "2. Methods")
+        self.assertEqual(set(result["timings"]), {"extract_seconds", "chunk_seconds"})
+
+
+class TestTextExtractor(unittest.IsolatedAsyncioTestCase):
+    async def test_process_runs_in_worker_process(self):
+        with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as file:
+            file.write(make_pdf([["Abstract", "Short paper."]]))
+        self.addCleanup(os.unlink, file.name)
+
+        extractor = TextExtractor(
+            {"max_workers": 1, "chunk_size": 100, "chunk_overlap": 10}
+        )
+        self.addCleanup(extractor.close)
+
+        result = await extractor.process(file.name)
+
+        self.assertEqual(result["page_count"], 1)
+        self.assertEqual(result["chunks"][0]["section"], "Abstract")
+        self.assertIn("queue_seconds", result["timings"])
+
+    def test_disabled_by_default(self):
+        extractor = TextExtractor({})
+
+        self.assertFalse(extractor.enabled)
+        self.assertGreaterEqual(extractor.max_workers, 1)
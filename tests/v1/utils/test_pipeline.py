@@ -0,0 +1,87 @@
+import asyncio
+import unittest
+
+from app.v1.utils.pipeline import run_pipeline
+
+
+async def iterate(items, started=None):
+    for item in items:
+        if started is not None:
+            started.append(item)
+        yield item
+
+
+class TestRunPipeline(unittest.IsolatedAsyncioTestCase):
+    async def test_items_pass_through_every_stage(self):
+        async def double(item):
+            return item * 2
+
+        async def increment(item):
+            return item + 1
+
+        results = [
+            result
+            async for result in run_pipeline(
+                iterate(range(10)), [(double, 3), (increment, 2)]
+            )
+        ]
+
+        self.assertEqual(sorted(results), [i * 2 + 1 for i in range(10)])
+
+    async def test_items_move_on_without_waiting_for_slower_ones(self):
+        async def wait(item):
+            await asyncio.sleep(item)
+            return item
+
+        results = [
+            result async for result in run_pipeline(iterate([0.05, 0.0]), [(wait, 2)])
+        ]
+
+        self.assertEqual(results, [0.0, 0.05])
+
+    async def test_full_queues_stop_the_source(self):
+        started = []
+        release = asyncio.Event()
+
+        async def blocked(item):
+            await release.wait()
+            return item
+
+        pipeline = run_pipeline(
+            iterate(range(100), started), [(blocked, 1)], queue_size=2
+        )
+        consumer = asyncio.create_task(pipeline.__anext__())
+        await asyncio.sleep(0.01)
+
+        # One item in the worker, two queued, and one waiting to be queued
+        self.assertEqual(len(started), 4)
+
+        release.set()
+        self.assertEqual(await consumer, 0)
+        await pipeline.aclose()
+
+    async def test_handler_error_stops_the_pipeline(self):
+        async def fail(item):
+            if item == 3:
+                raise ValueError("bad item")
+            return item
+
+        with self.assertRaises(ValueError):
+            async for _ in run_pipeline(iterate(range(10)), [(fail, 2)]):
+                pass
+
+    async def test_source_error_is_raised(self):
+        async def broken_source():
+            yield 1
+            raise RuntimeError("search failed")
+
+        async def identity(item):
+            return item
+
+        with self.assertRaises(RuntimeError):
+            async for _ in run_pipeline(broken_source(), [(identity, 1)]):
+                pass
+
+
+if __name__ == "__main__":
+    unittest.main()
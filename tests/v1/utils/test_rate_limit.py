@@ -0,0 +1,157 @@
+import asyncio
+import time
+import unittest
+
+from app.v1.utils.rate_limit import (
+    AdaptiveConcurrencyLimiter,
+    HostRateLimiter,
+    RateLimiter,
+    TokenBucket,
+    parse_interval,
+    parse_retry_after,
+)
+
+
+class TestTokenBucket(unittest.IsolatedAsyncioTestCase):
+    async def test_acquire_within_capacity_does_not_wait(self):
+        bucket = TokenBucket(capacity=10, period_seconds=60)
+
+        start = time.monotonic()
+        for _ in range(10):
+            await bucket.acquire(1)
+
+        self.assertLess(time.monotonic() - start, 0.05)
+
+    async def test_acquire_waits_for_refill(self):
+        bucket = TokenBucket(capacity=10, period_seconds=1)
+        await bucket.acquire(10)
+
+        start = time.monotonic()
+        await bucket.acquire(2)
+
+        self.assertGreaterEqual(time.monotonic() - start, 0.15)
+
+    async def test_rate_limiter_limits_tokens(self):
+        limiter = RateLimiter(requests_per_minute=6000, tokens_per_minute=600)
+
+        start = time.monotonic()
+        await limiter.acquire(600)
+        await limiter.acquire(2)
+
+        self.assertGreaterEqual(time.monotonic() - start, 0.15)
+
+
+class TestAdaptiveConcurrencyLimiter(unittest.IsolatedAsyncioTestCase):
+    async def test_limits_concurrency(self):
+        limiter = AdaptiveConcurrencyLimiter(max_concurrency=2)
+        running = []
+        peak = 0
+
+        async def work():
+            nonlocal peak
+            async with limiter.slot():
+                running.append(1)
+                peak = max(peak, len(running))
+                await asyncio.sleep(0.01)
+                running.pop()
+
+        await asyncio.gather(*[work() for _ in range(6)])
+
+        self.assertEqual(peak, 2)
+        self.assertEqual(limiter.in_flight, 0)
+
+    async def test_rate_limited_halves_limit_and_pauses(self):
+        limiter = AdaptiveConcurrencyLimiter(max_concurrency=8, min_concurrency=1)
+
+        limiter.on_rate_limited(0.1)
+        start = time.monotonic()
+        await limiter.acquire()
+
+        self.assertEqual(limiter.limit, 4)
+        self.assertGreaterEqual(time.monotonic() - start, 0.09)
+
+        for _ in range(5):
+            limiter.on_rate_limited(0)
+        self.assertEqual(limiter.limit, 1)
+
+    def test_success_grows_limit_back_to_max(self):
+        limiter = AdaptiveConcurrencyLimiter(max_concurrency=4)
+        limiter.on_rate_limited(0)
+
+        for _ in range(100):
+            limiter.on_success()
+
+        self.assertEqual(limiter.limit, 4)
+
+
+class TestHostRateLimiter(unittest.IsolatedAsyncioTestCase):
+    def test_parse_interval(self):
+        self.assertEqual(parse_interval("1s"), 1)
+        self.assertEqual(parse_interval("500ms"), 0.5)
+        self.assertEqual(parse_interval("2m"), 120)
+        self.assertEqual(parse_interval("10"), 10)
+        self.assertIsNone(parse_interval("soon"))
+        self.assertIsNone(parse_interval(None))
+
+    def test_parse_retry_after(self):
+        self.assertEqual(parse_retry_after("3"), 3)
+        self.assertEqual(parse_retry_after(None, default=2), 2)
+        self.assertEqual(parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT"), 0)
+
+    async def test_paces_to_rate_after_burst(self):
+        limiter = HostRateLimiter(rate_per_second=20, burst=2)
+
+        start = time.monotonic()
+        for _ in range(4):
+            await limiter.acquire()
+            limiter.release()
+
+        # Two tokens up front, then one every 50 ms
+        self.assertGreaterEqual(time.monotonic() - start, 0.09)
+
+    async def test_reports_wait(self):
+        limiter = HostRateLimiter(rate_per_second=10, burst=1)
+
+        self.assertLess(await limiter.acquire(), 0.01)
+        limiter.release()
+        self.assertGreaterEqual(await limiter.acquire(), 0.09)
+
+    def test_adopts_advertised_limits(self):
+        limiter = HostRateLimiter(rate_per_second=10, burst=10, max_in_flight=5)
+
+        limiter.update_from_headers(
+            {
+                "X-Rate-Limit-Limit": "50",
+                "X-Rate-Limit-Interval": "1s",
+                "X-Concurrency-Limit": "3",
+            }
+        )
+
+        self.assertEqual(limiter.bucket.rate, 50)
+        self.assertEqual(limiter.bucket.capacity, 10)
+        self.assertEqual(limiter.max_concurrency, 3)
+        self.assertEqual(limiter.limit, 3)
+
+    def test_unpaced_host_starts_pacing_when_advertised(self):
+        limiter = HostRateLimiter(burst=5)
+        self.assertIsNone(limiter.bucket)
+
+        limiter.update_from_headers(
+            {"X-Rate-Limit-Limit": "2", "X-Rate-Limit-Interval": "1s"}
+        )
+
+        self.assertEqual(limiter.bucket.rate, 2)
+        self.assertEqual(limiter.bucket.capacity, 2)
+
+    def test_ignores_malformed_headers(self):
+        limiter = HostRateLimiter(rate_per_second=10, burst=10)
+
+        limiter.update_from_headers(
+            {"X-Rate-Limit-Limit": "many", "X-Rate-Limit-Interval": "1s"}
+        )
+
+        self.assertEqual(limiter.bucket.rate, 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
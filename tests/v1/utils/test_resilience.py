@@ -0,0 +1,126 @@
+import asyncio
+import unittest
+from unittest.mock import patch
+
+import aiohttp
+
+from app.v1.utils.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    backoff_delay,
+    first_success,
+    is_transient_error,
+)
+
+
+def response_error(status):
+    return aiohttp.ClientResponseError(None, (), status=status)
+
+
+class TestTransientErrors(unittest.TestCase):
+    def test_classification(self):
+        self.assertTrue(is_transient_error(asyncio.TimeoutError()))
+        self.assertTrue(is_transient_error(aiohttp.ServerDisconnectedError()))
+        self.assertTrue(is_transient_error(response_error(503)))
+        self.assertFalse(is_transient_error(response_error(404)))
+        self.assertFalse(is_transient_error(ValueError("bad body")))
+
+    def test_backoff_is_capped_and_jittered(self):
+        delays = [backoff_delay(10, base=0.2, maximum=5.0) for _ in range(100)]
+
+        self.assertTrue(all(0 <= delay <= 5.0 for delay in delays))
+        self.assertGreater(len(set(delays)), 1)
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    def test_opens_after_consecutive_failures(self):
+        breaker = CircuitBreaker(failure_threshold=2, reset_seconds=30)
+
+        breaker.record_failure()
+        breaker.check()
+        breaker.record_failure()
+
+        self.assertEqual(breaker.state, "open")
+        with self.assertRaises(CircuitOpenError):
+            breaker.check("host")
+
+    def test_success_resets_failure_count(self):
+        breaker = CircuitBreaker(failure_threshold=2)
+
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+
+        self.assertEqual(breaker.state, "closed")
+
+    def test_half_open_failure_reopens(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_seconds=30)
+
+        with patch("app.v1.utils.resilience.time.monotonic", return_value=100):
+            breaker.record_failure()
+        with patch("app.v1.utils.resilience.time.monotonic", return_value=131):
+            self.assertEqual(breaker.state, "half_open")
+            breaker.check()
+            breaker.record_failure()
+            self.assertEqual(breaker.state, "open")
+
+
+class TestFirstSuccess(unittest.IsolatedAsyncioTestCase):
+    async def test_falls_through_failed_attempts(self):
+        async def fails():
+            raise ValueError("down")
+
+        async def empty():
+            return None
+
+        async def works():
+            return "ok"
+
+        self.assertEqual(await first_success([fails, empty, works]), "ok")
+
+    async def test_raises_last_error_when_all_fail(self):
+        async def fails():
+            raise ValueError("down")
+
+        with self.assertRaises(ValueError):
+            await first_success([fails])
+        self.assertIsNone(await first_success([]))
+
+    async def test_hedges_a_slow_attempt_and_cancels_it(self):
+        cancelled = asyncio.Event()
+
+        async def slow():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        async def fast():
+            return "hedged"
+
+        result = await asyncio.wait_for(
+            first_success([slow, fast], hedge_delay=0.01), timeout=1
+        )
+
+        self.assertEqual(result, "hedged")
+        self.assertTrue(cancelled.is_set())
+
+    async def test_without_hedge_delay_attempts_run_one_at_a_time(self):
+        started = []
+
+        async def attempt(name, result):
+            started.append(name)
+            await asyncio.sleep(0.01)
+            return result
+
+        result = await first_success(
+            [lambda: attempt("a", "first"), lambda: attempt("b", "second")]
+        )
+
+        self.assertEqual(result, "first")
+        self.assertEqual(started, ["a"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,132 @@
+import os
+import tempfile
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from app.v1.utils.search_index import SearchIndex, tokenize
+
+
+def make_article(doi, title, abstract=None):
+    return {
+        "doi": doi,
+        "title": [title],
+        "abstract": abstract,
+        "year_published": 2024,
+        "url": f"https://doi.org/{doi}",
+        "blob_url": f"https://blob/{doi}.pdf",
+    }
+
+
+ARTICLES = [
+    make_article("10.1/gnn", "Graph neural networks", "Message passing on graphs."),
+    make_article("10.1/cnn", "Convolutional networks", "Image classification."),
+    make_article("10.1/rl", "Reinforcement learning", "Agents and rewards."),
+]
+
+
+def add_in_worker(directory, worker):
+    """Index papers from a separate process, like one uvicorn worker"""
+    index = SearchIndex(directory, flush_documents=7, max_segments=3)
+    for number in range(30):
+        index.add(make_article(f"10.1/{worker}.{number}", f"Worker{worker} paper"))
+    index.close()
+
+
+class TestSearchIndex(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def test_tokenize_drops_markup_and_stopwords(self):
+        self.assertEqual(
+            tokenize("<jats:p>The Graph of a GNN</jats:p>"), ["graph", "gnn"]
+        )
+
+    def test_search_ranks_with_bm25(self):
+        index = SearchIndex(self.directory)
+        for article in ARTICLES:
+            index.add(article)
+        index.add(make_article("10.1/graphs", "Graphs", "Graph graph graph theory."))
+
+        results = index.search("graph networks")
+
+        self.assertEqual(results[0]["doi"], "10.1/gnn")
+        self.assertEqual(
+            {result["doi"] for result in results},
+            {"10.1/gnn", "10.1/graphs", "10.1/cnn"},
+        )
+        self.assertGreater(results[0]["score"], results[-1]["score"])
+        self.assertEqual(index.search("unrelated words"), [])
+
+    def test_buffered_documents_survive_a_restart(self):
+        index = SearchIndex(self.directory)
+        index.add(ARTICLES[0])
+
+        reopened = SearchIndex(self.directory)
+
+        self.assertEqual(reopened.search("graph")[0]["doi"], "10.1/gnn")
+
+    def test_flush_writes_memory_mapped_segment(self):
+        index = SearchIndex(self.directory, flush_documents=2)
+        for article in ARTICLES:
+            index.add(article)
+
+        self.assertEqual(index.stats(), {"documents": 3, "segments": 1, "buffered": 1})
+        reopened = SearchIndex(self.directory)
+        self.assertIsInstance(reopened.segments[0].postings, np.memmap)
+        self.assertEqual(reopened.search("rewards")[0]["doi"], "10.1/rl")
+        self.assertEqual(reopened.search("image")[0]["doi"], "10.1/cnn")
+
+    def test_text_supersedes_metadata_only_document(self):
+        index = SearchIndex(self.directory, flush_documents=1)
+        index.add(ARTICLES[0])
+
+        self.assertFalse(index.add(ARTICLES[0]))
+        self.assertTrue(index.add(ARTICLES[0], text="Spectral convolutions."))
+        self.assertFalse(index.add(ARTICLES[0], text="Spectral convolutions."))
+
+        results = index.search("spectral graph")
+        self.assertEqual(len(results), 1)
+        self.assertTrue(results[0]["has_text"])
+        self.assertEqual(index.stats()["documents"], 1)
+
+    def test_merge_drops_superseded_documents(self):
+        index = SearchIndex(self.directory, flush_documents=1, max_segments=3)
+        for article in ARTICLES:
+            index.add(article)
+        index.add(ARTICLES[0], text="Spectral convolutions.")
+
+        self.assertEqual(len(index.segments), 1)
+        self.assertEqual(len(index.segments[0].documents), 3)
+        self.assertEqual(
+            sorted(name for name in os.listdir(self.directory) if "segment" in name),
+            [
+                "segment-000004.docs.json",
+                "segment-000004.postings.npy",
+                "segment-000004.terms.json",
+            ],
+        )
+        reopened = SearchIndex(self.directory)
+        self.assertEqual(reopened.search("spectral")[0]["doi"], "10.1/gnn")
+        self.assertEqual(reopened.search("rewards")[0]["doi"], "10.1/rl")
+
+    def test_workers_sharing_a_directory_keep_every_document(self):
+        with ProcessPoolExecutor(max_workers=4) as executor:
+            for result in [
+                executor.submit(add_in_worker, self.directory, worker)
+                for worker in range(4)
+            ]:
+                result.result()
+
+        reopened = SearchIndex(self.directory)
+
+        self.assertEqual(reopened.document_count, 120)
+        for worker in range(4):
+            self.assertEqual(len(reopened.search(f"worker{worker}", limit=100)), 30)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,146 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from azure.core.exceptions import ResourceNotFoundError
+
+from app.v1.utils.storage import AsyncAzureBlobStorageClient
+from benchmarks.fake_upstreams import FakeUpstreamConfig, FakeUpstreams
+
+TEST_CONNECTION_STRING = (
+    "DefaultEndpointsProtocol=http;AccountName=devstoreaccount1;"
+    "AccountKey=a2V5;BlobEndpoint=http://127.0.0.1:10000/devstoreaccount1;"
+)
+
+
+class TestAsyncAzureBlobStorageClient(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        env_patcher = patch.dict(
+            os.environ,
+            {
+                "AZURE_STORAGE_CONNECTION_STRING": TEST_CONNECTION_STRING,
+                "STORAGE_CONTAINER_NAME": "papers",
+            },
+        )
+        env_patcher.start()
+        self.addCleanup(env_patcher.stop)
+
+        self.storage_client = AsyncAzureBlobStorageClient(
+            storage_config={"max_block_size": 1024, "batch_concurrency": 2}
+        )
+        self.blob_clients = {}
+        self.storage_client.container_client = MagicMock()
+        self.storage_client.container_client.get_blob_client.side_effect = (
+            self._get_blob_client
+        )
+
+    async def asyncTearDown(self):
+        await self.storage_client.close()
+
+    def _get_blob_client(self, blob_name):
+        if blob_name not in self.blob_clients:
+            blob_client = AsyncMock()
+            blob_client.url = f"https://blob/{blob_name}"
+            self.blob_clients[blob_name] = blob_client
+        return self.blob_clients[blob_name]
+
+    def test_missing_connection_string(self):
+        with patch.dict(os.environ, {"AZURE_STORAGE_CONNECTION_STRING": ""}):
+            with self.assertRaises(ValueError):
+                AsyncAzureBlobStorageClient()
+
+    def test_block_size_is_configured(self):
+        self.assertEqual(
+            self.storage_client.blob_service_client._config.max_block_size, 1024
+        )
+
+    async def test_get_existing_blob_urls(self):
+        self._get_blob_client(
+            "b.pdf"
+        ).get_blob_properties.side_effect = ResourceNotFoundError("missing")
+
+        result = await self.storage_client.get_existing_blob_urls(["a.pdf", "b.pdf"])
+
+        self.assertEqual(result, ["https://blob/a.pdf", None])
+
+    async def test_upload_pdfs_returns_results_in_order(self):
+        self._get_blob_client("b.pdf").upload_blob.side_effect = Exception("failed")
+
+        result = await self.storage_client.upload_pdfs(
+            [
+                {"file_content": b"%PDF-a", "blob_name": "a.pdf"},
+                {"file_content": b"%PDF-b", "blob_name": "b.pdf"},
+            ],
+            overwrite=False,
+            max_concurrency=3,
+        )
+
+        self.assertEqual(result[0], "https://blob/a.pdf")
+        self.assertIsInstance(result[1], Exception)
+        _, kwargs = self.blob_clients["a.pdf"].upload_blob.call_args
+        self.assertEqual(kwargs["max_concurrency"], 3)
+        self.assertFalse(kwargs["overwrite"])
+
+    async def test_upload_json_sets_content_type(self):
+        url = await self.storage_client.upload_json(
+            {"chunks": []}, "a.chunks.json", metadata={"doi": "10.1/a"}
+        )
+
+        self.assertEqual(url, "https://blob/a.chunks.json")
+        upload = self.blob_clients["a.chunks.json"].upload_blob
+        self.assertEqual(json.loads(upload.call_args.args[0]), {"chunks": []})
+        self.assertEqual(
+            upload.call_args.kwargs["content_settings"].content_type,
+            "application/json",
+        )
+
+    async def test_download_blob_to_file_writes_every_chunk(self):
+        async def chunks():
+            for chunk in (b"%PDF-", b"body"):
+                yield chunk
+
+        downloader = MagicMock()
+        downloader.chunks.side_effect = chunks
+        self._get_blob_client("a.pdf").download_blob.return_value = downloader
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "a.pdf")
+            await self.storage_client.download_blob_to_file("a.pdf", path)
+            with open(path, "rb") as file:
+                self.assertEqual(file.read(), b"%PDF-body")
+
+
+class TestAsyncAzureBlobStorageClientWithSDK(unittest.IsolatedAsyncioTestCase):
+    """Runs the real Azure SDK against the benchmark's fake blob service"""
+
+    async def asyncSetUp(self):
+        config = FakeUpstreamConfig()
+        config.settings("blob").latency_ms = 0
+        self.fakes = FakeUpstreams(config)
+        await self.fakes.start()
+        self.addAsyncCleanup(self.fakes.stop)
+
+        with patch.dict(os.environ, self.fakes.environment()):
+            self.storage_client = AsyncAzureBlobStorageClient()
+        self.addAsyncCleanup(self.storage_client.close)
+
+    async def test_commit_blocks_creates_blob_once(self):
+        await self.storage_client.stage_block("a.pdf", "00000000", b"%PDF-1.4")
+        await self.storage_client.stage_block("a.pdf", "00000001", b"%%EOF")
+
+        blob_url = await self.storage_client.commit_blocks("a.pdf", ["00000000"])
+        (key,) = self.fakes.blobs
+        size = self.fakes.blobs[key]
+        # A second commit must not replace the blob another request stored
+        await self.storage_client.commit_blocks("a.pdf", ["00000000", "00000001"])
+
+        self.assertEqual(self.fakes.blobs, {key: size})
+        self.assertEqual(
+            await self.storage_client.get_existing_blob_url("a.pdf"), blob_url
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,35 @@
+import unittest
+
+from app.v1.utils.utils import create_blob_name, normalize_doi
+
+
+class TestUtils(unittest.TestCase):
+    def test_normalize_doi(self):
+        for doi in [
+            "10.1000/ABC.123",
+            "https://doi.org/10.1000/abc.123",
+            "doi:10.1000/abc.123",
+            " http://dx.doi.org/10.1000/ABC.123 ",
+        ]:
+            self.assertEqual(normalize_doi(doi), "10.1000/abc.123")
+
+    def test_create_blob_name_is_stable_per_doi(self):
+        self.assertEqual(
+            create_blob_name("10.1000/ABC.123"),
+            create_blob_name("https://doi.org/10.1000/abc.123"),
+        )
+
+    def test_create_blob_name_separates_similar_dois(self):
+        self.assertNotEqual(
+            create_blob_name("10.1000/abc/123"), create_blob_name("10.1000/abc_123")
+        )
+
+    def test_create_blob_name_is_url_safe(self):
+        blob_name = create_blob_name("10.1000/(SICI)1097-4571<123::AID>")
+
+        self.assertTrue(blob_name.endswith(".pdf"))
+        self.assertRegex(blob_name, r"^[a-z0-9._-]+$")
+
+
+if __name__ == "__main__":
+    unittest.main()